@@ -1,11 +1,25 @@
+import errno
+import functools
 import hashlib
+import heapq
+import hmac
 import json
+import os
 import random
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
 
+import httpx
 import streamlit as st
 import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from supabase import create_client, Client
 
+import backends
+
 st.set_page_config(page_title="Serve & Smash | Pickleball",page_icon="🏓",layout="wide",initial_sidebar_state="expanded")
 
 st.markdown("""
@@ -109,11 +123,471 @@ div[data-testid="stDecoration"]{display:none;}
 </style>
 """, unsafe_allow_html=True)
 
-# ─── DB — fresh client each call prevents HTTP/2 stale socket (Errno 11) ──────
-def get_db() -> Client:
-    return create_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+# ─── DB — pooled clients, recycled before the HTTP/2 socket goes stale (Errno 11)
+DB_POOL_SIZE  = 4     # clients shared by every session in this process
+DB_MAX_IDLE_S = 45    # rebuild a client idle longer than this (server drops the socket)
+DB_RETRIES    = 3
+DB_BACKOFF_S  = 0.15  # 0.15s, 0.3s … between retries
+
+class _ClientPool:
+    """Round-robin pool of Supabase clients shared across sessions.
+    Health check = idle age: a client unused for DB_MAX_IDLE_S is rebuilt on checkout.
+    reset() drops every client after a stale-socket error so the retry reconnects.
+    observer(table, rows, bytes) hears every PostgREST response (see Profiling)."""
+    def __init__(self, url, key, size):
+        self.url=url; self.key=key; self.size=max(1,size); self.observer=None
+        self.lock=threading.Lock(); self.slots=[None]*self.size; self.i=0
+    def acquire(self) -> Client:
+        with self.lock:
+            slot=self.i%self.size; self.i+=1
+            now=time.monotonic(); ent=self.slots[slot]
+            if ent is None or now-ent[1]>DB_MAX_IDLE_S:
+                ent=[create_client(self.url,self.key),now]; self.slots[slot]=ent
+            ent[1]=now
+        hooks=ent[0].postgrest.session.event_hooks["response"]   # postgrest is rebuilt on auth changes
+        if self._seen not in hooks: hooks.append(self._seen)
+        return ent[0]
+    def reset(self):
+        with self.lock: self.slots=[None]*self.size
+    def _seen(self, r):
+        if self.observer is None: return
+        r.read()
+        a,_,_=r.headers.get("content-range","").partition("/")   # "0-24/*" on reads
+        if "-" in a: s,e=a.split("-"); rows=int(e)-int(s)+1
+        else:
+            try: d=r.json(); rows=len(d) if isinstance(d,list) else int(d is not None)
+            except ValueError: rows=0
+        self.observer(r.request.url.path.rsplit("/",1)[-1],rows,len(r.content))
+
+def _config(key, default=None):
+    """Setting from the environment, then .streamlit/secrets.toml, then default."""
+    if key in os.environ: return os.environ[key]
+    try: return st.secrets.get(key,default)
+    except FileNotFoundError: return default   # no secrets.toml at all
+
+@st.cache_resource
+def _db_pool():
+    """DB_BACKEND: "supabase" (default), "memory" or "sqlite[:path]" (see backends.py).
+    A local backend is one shared in-process store with the same acquire()/reset()."""
+    kind=_config("DB_BACKEND","supabase")
+    pool=backends.open_backend(kind) if kind!="supabase" else \
+        _ClientPool(_config("SUPABASE_URL"),_config("SUPABASE_KEY"),int(_config("SUPABASE_POOL_SIZE",DB_POOL_SIZE)))
+    pool.observer=profiler().observe
+    return pool
 
-def hp(pw): return hashlib.sha256(pw.encode()).hexdigest()
+def get_db() -> Client:
+    _RUN["queries"]+=1
+    return _db_pool().acquire()
+
+def _is_stale(e):
+    """Dead keep-alive socket: Errno 11 (EAGAIN) or an httpx transport/protocol error."""
+    if isinstance(e,(httpx.TransportError,httpx.RemoteProtocolError)): return True
+    if isinstance(e,OSError) and e.errno in (errno.EAGAIN,errno.ECONNRESET,errno.EPIPE): return True
+    return "Errno 11" in str(e) or "Resource temporarily unavailable" in str(e)
+
+def _is_unsent(e):
+    """Failed before the request left: no connection, no pool slot, or the send itself
+    failed (EAGAIN/EPIPE on a dead socket surfaces as WriteError). A read timeout or a
+    dropped response may come after the server committed, so those don't count."""
+    return isinstance(e,(httpx.ConnectError,httpx.ConnectTimeout,httpx.PoolTimeout,
+                         httpx.WriteError,httpx.WriteTimeout,ConnectionRefusedError))
+
+_PGRST_UNAVAILABLE = ("PGRST000","PGRST001","PGRST002","PGRST003")   # database/pool/schema cache not reachable
+_TRANSIENT_SQLSTATE = ("08","40","53","57","58","XX")   # connection, rollback, resources, shutdown, system
+
+def _is_definitive(e):
+    """The server understood the request and refused it (4xx, a constraint or logic
+    SQLSTATE), or our own code failed: replaying won't change the answer. 5xx, gateway,
+    unavailable-database and transport errors are not — those are worth waiting out."""
+    if _is_stale(e) or _is_unsent(e) or isinstance(e,(OSError,httpx.HTTPError)): return False
+    status=getattr(getattr(e,"response",None),"status_code",None)
+    code=str(status or getattr(e,"code",None) or "")
+    if code.isdigit() and len(code)==3: return code<"500"   # HTTP status (non-JSON gateway reply)
+    if code.startswith("PGRST"): return code not in _PGRST_UNAVAILABLE
+    if code: return not code.startswith(_TRANSIENT_SQLSTATE)
+    return not hasattr(e,"code")   # a codeless API error (gateway JSON) may be an outage; a Python error is ours
+
+def _with_retry(call, write=False):
+    """Run call(); on a stale-socket error reset the pool and retry with backoff.
+    write=True: only retry when the request provably never reached the server."""
+    for attempt in range(DB_RETRIES):
+        try: return call()
+        except Exception as e:
+            if attempt==DB_RETRIES-1 or not (_is_unsent(e) if write else _is_stale(e)): raise
+            _db_pool().reset(); time.sleep(DB_BACKOFF_S*(2**attempt))
+
+def db_retry(fn):
+    """Reads and idempotent updates: retry any stale-socket error."""
+    @functools.wraps(fn)
+    def wrapper(*a,**kw): return _with_retry(lambda: fn(*a,**kw))
+    return wrapper
+
+def db_write(fn):
+    """Non-idempotent writes (inserts, RPCs that bump state): retry only unsent requests,
+    so a lost response never applies the write twice."""
+    @functools.wraps(fn)
+    def wrapper(*a,**kw): return _with_retry(lambda: fn(*a,**kw),write=True)
+    return wrapper
+
+# Postgres functions/views live in supabase/migrations. Until a migration is applied
+# the PostgREST "not found" codes below send callers to their Python fallback.
+_NOT_DEPLOYED = ("PGRST202","PGRST204","PGRST205","42883","42P01")   # 204: column not found
+
+@st.cache_resource
+def _undeployed():
+    return set()   # names already known to be missing — skip the failing round trip
+
+def _deployed_or(name, call, fallback):
+    if name not in _undeployed():
+        try: return call()
+        except Exception as e:
+            if getattr(e,"code",None) not in _NOT_DEPLOYED: raise
+            _undeployed().add(name)
+    return fallback()
+
+def _rpc(name, params, fallback):
+    def call():
+        data = get_db().rpc(name,params).execute().data
+        return data[0] if isinstance(data,list) and len(data)==1 else data
+    return _deployed_or(name,call,fallback)
+
+# ─── Passwords ────────────────────────────────────────────────────────────────
+# scrypt with a per-user salt, stored as "scrypt$n$r$p$<salt hex>$<hash hex>".
+# Older rows hold a bare unsalted sha256 hex digest; login_user rehashes those.
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2**14, 8, 1
+LOGIN_CACHE_SIZE = 512
+
+def hp(pw):
+    salt=os.urandom(16)
+    h=hashlib.scrypt(pw.encode(),salt=salt,n=SCRYPT_N,r=SCRYPT_R,p=SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${h.hex()}"
+
+def check_pw(pw, stored):
+    """(matches, needs_rehash) — legacy sha256 and old scrypt parameters need a rehash."""
+    if stored.startswith("scrypt$"):
+        _,n,r,p,salt,h=stored.split("$")
+        got=hashlib.scrypt(pw.encode(),salt=bytes.fromhex(salt),n=int(n),r=int(r),p=int(p)).hex()
+        ok=hmac.compare_digest(got,h)
+        return ok, ok and (int(n),int(r),int(p))!=(SCRYPT_N,SCRYPT_R,SCRYPT_P)
+    ok=hmac.compare_digest(hashlib.sha256(pw.encode()).hexdigest(),stored)
+    return ok, ok
+
+class _LoginCache:
+    """Bounded LRU of recent successful logins: (mobile, stored hash) → HMAC of the
+    password under a key that only lives in this process. A repeat login costs one
+    HMAC instead of scrypt; a changed stored hash simply misses."""
+    def __init__(self, size):
+        self.key=os.urandom(32); self.size=size; self.lock=threading.Lock(); self.d=OrderedDict()
+    def _tag(self, pw):
+        return hmac.new(self.key,pw.encode(),"sha256").digest()
+    def hit(self, mobile, stored, pw):
+        with self.lock:
+            tag=self.d.get((mobile,stored))
+            if tag: self.d.move_to_end((mobile,stored))
+        return tag is not None and hmac.compare_digest(tag,self._tag(pw))
+    def put(self, mobile, stored, pw):
+        with self.lock:
+            self.d[(mobile,stored)]=self._tag(pw); self.d.move_to_end((mobile,stored))
+            while len(self.d)>self.size: self.d.popitem(last=False)
+
+@st.cache_resource
+def login_cache():
+    return _LoginCache(LOGIN_CACHE_SIZE)
+
+# ─── Per-run snapshot ─────────────────────────────────────────────────────────
+# Streamlit rebuilds the script module on every rerun, so this dict lives for
+# exactly one run: matches/teams/courts/state load once, every stage
+# filter and lookup is served from memory, and writers drop what they touch.
+_SNAP = {}
+_RUN  = {"queries":0}   # per-run counters (same lifetime as _SNAP)
+
+# Setup-time tables are also cached across sessions (seconds). Nothing else
+# writes them, so TTLs are long; the write helpers below clear them explicitly.
+CACHE_TTL = {"teams":600,"courts":600,"award_categories":3600,"state":30,"revealed":30,"vote_tallies":15,"role_counts":15,
+             "court_dispute":20}
+_SHARED = {}   # snapshot key → st.cache_data loader
+
+def _shared(key):
+    def deco(fn):
+        _SHARED[key]=st.cache_data(ttl=CACHE_TTL[key],show_spinner=False)(fn)
+        return _SHARED[key]
+    return deco
+
+def _snap(key, loader):
+    if key not in _SNAP: _SNAP[key]=loader()
+    return _SNAP[key]
+
+def _count(q):
+    """Row count of a select(..., count="exact", head=True) query — no rows transferred."""
+    return q.execute().count or 0
+
+def _invalidate(*keys):
+    """Drop keys (default: everything) from this run's snapshot and the shared cache."""
+    for k in keys or list(_SNAP)+list(_SHARED):
+        _SNAP.pop(k,None)
+        if k in _SHARED: _SHARED[k].clear()
+
+# ─── Profiling ────────────────────────────────────────────────────────────────
+# DB helpers that fetch or write are decorated @profiled (pure ones are not):
+# calls and latency, plus the requests, rows and bytes the backend returned while
+# it ran, tagged with the page and section being rendered (_RUN["tag"]).
+# Latency includes nested helpers; requests/rows/bytes go to the innermost one,
+# so they add up. Work on background threads is tagged "background".
+PROFILE_SAMPLES = 512   # latency samples kept per (page, section, helper)
+PROFILE_RUNS    = 50    # recent script runs kept for the Performance section
+PROFILE_SLOW_MS = 250   # p95 above this is flagged as slow
+
+def _pct(xs, p):
+    """Nearest-rank percentile of a sorted list."""
+    return xs[min(len(xs)-1,max(0,-(-p*len(xs)//100)-1))] if xs else 0.0
+
+class _Profiler:
+    def __init__(self):
+        self.lock=threading.Lock(); self.local=threading.local(); self.reset()
+    def reset(self):
+        with self.lock: self.stats={}; self.runs=deque(maxlen=PROFILE_RUNS); self.since=time.time()
+    def _charge(self, key, ms, f, calls=1):
+        s=self.stats.get(key)
+        if s is None: s=self.stats[key]={"calls":0,"ms":0.0,"max_ms":0.0,"requests":0,"rows":0,"bytes":0,
+                                         "samples":deque(maxlen=PROFILE_SAMPLES)}
+        s["calls"]+=calls; s["ms"]+=ms; s["requests"]+=f[0]; s["rows"]+=f[1]; s["bytes"]+=f[2]
+        if calls: s["max_ms"]=max(s["max_ms"],ms); s["samples"].append(ms)
+    def observe(self, table, rows, nbytes):
+        """Backend hook: one response, charged to the helper running on this thread."""
+        stack=getattr(self.local,"stack",None)
+        if stack: f=stack[-1]; f[0]+=1; f[1]+=rows; f[2]+=nbytes
+        else:
+            with self.lock: self._charge(("background","",f"({table})"),0.0,(1,rows,nbytes),calls=0)
+    def call(self, tag, name, fn, a, kw, run):
+        stack=self.local.__dict__.setdefault("stack",[]); f=[0,0,0]; stack.append(f)
+        t=time.perf_counter()
+        try: return fn(*a,**kw)
+        finally:
+            ms=(time.perf_counter()-t)*1000; stack.pop()
+            with self.lock: self._charge((*tag,name),ms,f)
+            if run is not None:
+                r=run.setdefault(name,[0,0.0,0,0,0]); r[0]+=1; r[1]+=ms; r[2]+=f[0]; r[3]+=f[1]; r[4]+=f[2]
+    def end_run(self, tag, run, ms):
+        with self.lock: self.runs.append({"at":time.time(),"page":tag[0],"section":tag[1],"ms":round(ms,1),
+            "helpers":{n:dict(zip(("calls","ms","requests","rows","bytes"),v)) for n,v in run.items()}})
+    def snapshot(self):
+        """Plain-data copy for the panel and exports — slowest p95 first."""
+        with self.lock:
+            stats=[(k,dict(v,samples=sorted(v["samples"]))) for k,v in self.stats.items()]
+            runs=list(self.runs); since=self.since
+        rows=[{"page":p,"section":sec,"helper":h,"calls":v["calls"],
+               "mean_ms":round(v["ms"]/v["calls"],2) if v["calls"] else 0.0,"p50_ms":round(_pct(v["samples"],50),2),
+               "p95_ms":round(_pct(v["samples"],95),2),"p99_ms":round(_pct(v["samples"],99),2),
+               "max_ms":round(v["max_ms"],2),"total_ms":round(v["ms"],3),
+               "requests":v["requests"],"rows":v["rows"],"bytes":v["bytes"]} for (p,sec,h),v in stats]
+        return {"since":since,"helpers":sorted(rows,key=lambda r:(-r["p95_ms"],-r["total_ms"])),"runs":runs}
+
+@st.cache_resource
+def profiler():
+    return _Profiler()
+
+def profiled(fn):
+    @functools.wraps(fn)
+    def wrapper(*a,**kw):
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return profiler().call(("background",threading.current_thread().name),fn.__name__,fn,a,kw,None)
+        return profiler().call(_RUN.get("tag",("main","")),fn.__name__,fn,a,kw,_RUN.setdefault("prof",{}))
+    return wrapper
+
+def _om_label(v):
+    return str(v).replace("\\","\\\\").replace('"','\\"').replace("\n","\\n")
+
+def profile_openmetrics(snap):
+    """OpenMetrics text exposition of a profiler snapshot."""
+    out=["# TYPE db_helper_latency_seconds summary","# UNIT db_helper_latency_seconds seconds",
+         "# HELP db_helper_latency_seconds DB helper latency (nested helpers included)."]
+    lbl=lambda r: f'page="{_om_label(r["page"])}",section="{_om_label(r["section"])}",helper="{_om_label(r["helper"])}"'
+    for r in snap["helpers"]:
+        for q,k in ((0.5,"p50_ms"),(0.95,"p95_ms"),(0.99,"p99_ms")):
+            out.append(f'db_helper_latency_seconds{{{lbl(r)},quantile="{q}"}} {r[k]/1000:.6f}')
+        out.append(f"db_helper_latency_seconds_sum{{{lbl(r)}}} {r['total_ms']/1000:.6f}")
+        out.append(f"db_helper_latency_seconds_count{{{lbl(r)}}} {r['calls']}")
+    for name,key,help_ in (("db_helper_requests","requests","Backend requests made by the helper."),
+                           ("db_helper_rows","rows","Rows returned to the helper."),
+                           ("db_helper_bytes","bytes","Response bytes returned to the helper.")):
+        out+=[f"# TYPE {name} counter",f"# HELP {name} {help_}"]
+        out+=[f"{name}_total{{{lbl(r)}}} {r[key]}" for r in snap["helpers"]]
+    return "\n".join(out+["# EOF"])+"\n"
+
+# ─── Live broadcaster ─────────────────────────────────────────────────────────
+LIVE_CHECK_S     = 5    # fragment wake-up, as the old polling fragment: reads the shared feed, no query
+LIVE_MAX_STALE_S = 30   # refetch anyway, in case a write came from another process
+LIVE_MIN_GAP_S   = 1    # coalesce bursts of points into at most one fetch per second
+LIVE_IDLE_STOP_S = 60   # poller thread exits when nobody has asked for this long
+
+class _LiveBus:
+    """In-process change feed for live scores. Referee writes publish(); the live
+    feed re-reads the DB only when version() moved since its last fetch. One global
+    counter: a Streamlit fragment re-emits every element on each run, so per-match
+    versions would save no rendering."""
+    def __init__(self):
+        self.cond=threading.Condition(); self.seq=0
+    def publish(self):
+        with self.cond: self.seq+=1; self.cond.notify_all()
+    def version(self):
+        return self.seq
+    def wait(self, since, timeout):
+        with self.cond: self.cond.wait_for(lambda: self.seq!=since,timeout)
+        return self.seq
+
+@st.cache_resource
+def live_bus():
+    return _LiveBus()
+
+class _LiveFeed:
+    """Process-wide live matches + moments. One background poller is the only thing
+    that queries; every session reads self.data. refresh() is single-flight, so
+    concurrent callers share one in-flight fetch: DB load is O(1) in viewers."""
+    def __init__(self, bus):
+        self.bus=bus; self.cond=threading.Condition()
+        self.data=None; self.fetching=False; self.seen=0.0; self.thread=None
+    def _stale(self, d):
+        return d is None or d["v"]!=self.bus.version() or time.monotonic()-d["t"]>LIVE_MAX_STALE_S
+    def refresh(self):
+        with self.cond:
+            if self.fetching:
+                self.cond.wait_for(lambda: not self.fetching); return self.data
+            self.fetching=True
+        data=None
+        try:
+            v=self.bus.version()
+            data={"v":v,"t":time.monotonic(),"live":get_live_matches(),"moments":get_all_moments()}
+        finally:
+            with self.cond:
+                if data: self.data=data
+                self.fetching=False; self.cond.notify_all()
+        return data
+    def _poll(self):
+        while time.monotonic()-self.seen<LIVE_IDLE_STOP_S:
+            d=self.data
+            self.bus.wait(d["v"] if d else -1,LIVE_MAX_STALE_S)
+            if self._stale(self.data):
+                try: self.refresh()
+                except Exception: pass   # keep serving the last good copy; retry next wake
+            time.sleep(LIVE_MIN_GAP_S)
+        with self.cond: self.thread=None
+    def get(self):
+        self.seen=time.monotonic()
+        with self.cond:
+            if self.thread is None:
+                self.thread=threading.Thread(target=self._poll,name="live-feed",daemon=True)
+                self.thread.start()
+        d=self.data   # only a cold or long-idle feed makes the caller wait for a fetch
+        return self.refresh() if d is None or time.monotonic()-d["t"]>LIVE_MAX_STALE_S else d
+
+@st.cache_resource
+def live_feed():
+    return _LiveFeed(live_bus())
+
+# ─── Referee journal ──────────────────────────────────────────────────────────
+# The referee console keeps the live score in session_state and renders it at
+# once. Every referee action (point, undo, moment, dispute, end) is appended to a
+# SQLite journal on the Streamlit server and replayed to the DB in order behind
+# the screen, so an outage between the server and Supabase delays writes instead
+# of losing them. It does not help when the referee's phone loses Wi-Fi: taps
+# never reach the server then.
+JOURNAL_BATCH    = 50    # consecutive points/undos sent in one apply_points() call
+JOURNAL_RETRY_S  = 0.25  # first retry delay, doubled per attempt …
+JOURNAL_MAX_WAIT = 10    # … up to this while the database is unreachable (retried forever)
+JOURNAL_MAX_TRIES= 6     # a definitive refusal (_is_definitive) this many times drops the match's queue
+JOURNAL_FLUSH_S  = 3     # End Game / Flag wait at most this long, then show as syncing
+
+def optimistic_scoring():
+    """OPTIMISTIC_SCORING secret (default on); off = every tap waits for its write."""
+    return str(_config("OPTIMISTIC_SCORING",True)).lower() not in ("0","false","no","off")
+
+class _RefJournal:
+    """Durable per-match FIFO of referee actions, one daemon thread per match with work.
+    Each row is (op_key, kind, args, expect); op_key makes a replay after a lost
+    response a no-op server-side. Runs of points/undos go out as one batch. expect is
+    the score the console showed: a server row that disagrees (another device) is a
+    conflict, the rest of that match's queue is dropped and the console resyncs.
+    Handlers come from bind(): the current run's functions, never the first run's."""
+    def __init__(self, path):
+        self.cond=threading.Condition(); self.threads={}; self.ops={}
+        self.done={}; self.conflict={}; self.error={}
+        self.db=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.db.execute("pragma journal_mode=wal")
+        self.db.execute("create table if not exists ops (id integer primary key autoincrement,"
+                        " op_key text unique, match_id text, kind text, args text, expect text)")
+    def _sql(self, q, *a):
+        with self.cond: return self.db.execute(q,a).fetchall()
+    def bind(self, ops):
+        """Install this run's handlers and resume matches left over from a restart."""
+        self.ops=ops
+        for (mid,) in self._sql("select distinct match_id from ops"): self._start(mid)
+    def submit(self, mid, kind, args, expect=None):
+        self._sql("insert into ops (op_key,match_id,kind,args,expect) values (?,?,?,?,?)",
+                  uuid.uuid4().hex,mid,kind,json.dumps(args),json.dumps(expect))
+        self._start(mid)
+    def _start(self, mid):
+        with self.cond:
+            if mid not in self.threads and self.ops:
+                self.threads[mid]=threading.Thread(target=self._drain,args=(mid,),name=f"ref-journal-{mid}",daemon=True)
+                self.threads[mid].start()
+    def pending(self, mid=None):
+        q="select count(*) from ops"+(" where match_id=?" if mid else "")
+        return self._sql(q,*([mid] if mid else []))[0][0]
+    def pending_op(self, mid, kind):
+        """args of the oldest unsent action of this kind, or None."""
+        row=self._sql("select args from ops where match_id=? and kind=? order by id limit 1",mid,kind)
+        return json.loads(row[0][0]) if row else None
+    def last_done(self, mid):
+        return self.done.get(mid,0.0)
+    def clear(self):
+        """Forget every unsent action (tournament reset: their matches are gone)."""
+        with self.cond:
+            self.db.execute("delete from ops"); self.conflict.clear(); self.error.clear(); self.cond.notify_all()
+    def take_conflict(self, mid):
+        with self.cond: return self.conflict.pop(mid,None)
+    def flush(self, mid, timeout=JOURNAL_FLUSH_S):
+        with self.cond: return self.cond.wait_for(lambda: not self.pending(mid),timeout)
+    def _head(self, mid):
+        rows=self._sql("select id,op_key,kind,args,expect from ops where match_id=? order by id limit ?",mid,JOURNAL_BATCH)
+        rows=[(i,k,kind,json.loads(a),json.loads(e)) for i,k,kind,a,e in rows]
+        if rows and rows[0][2] in ("point","undo"):   # the leading run of score ops, batched
+            n=next((j for j,r in enumerate(rows) if r[2] not in ("point","undo")),len(rows))
+            return rows[:n]
+        return rows[:1]
+    def _finish(self, mid, last_id, conflict=None, error=None):
+        with self.cond:
+            if conflict is not None:
+                self.conflict[mid]=conflict; self.db.execute("delete from ops where match_id=?",(mid,))
+            else: self.db.execute("delete from ops where match_id=? and id<=?",(mid,last_id))
+            if error: self.error[mid]=error
+            else: self.error.pop(mid,None)
+            self.done[mid]=time.monotonic(); self.cond.notify_all()
+    def _drain(self, mid):
+        tries=0
+        while True:
+            with self.cond:
+                batch=self._head(mid)
+                if not batch:   # a dropped queue keeps its error for the resync notice
+                    self.threads.pop(mid,None)
+                    if mid not in self.conflict: self.error.pop(mid,None)
+                    return
+            kind=batch[0][2]
+            try:
+                if kind in ("point","undo"): got=tuple(self.ops["points"](mid,[(k,kd,a) for _,k,kd,a,_ in batch]))
+                else: got=None; self.ops[kind](mid,op_key=batch[0][1],**batch[0][3])
+            except Exception as e:
+                tries+=1   # outages (5xx, transport) stay queued; only a refusal is dropped
+                if _is_definitive(e) and tries>=JOURNAL_MAX_TRIES:
+                    self._finish(mid,batch[-1][0],conflict=(),error=str(e)); tries=0; continue
+                with self.cond: self.error[mid]=str(e)
+                time.sleep(min(JOURNAL_RETRY_S*(2**(tries-1)),JOURNAL_MAX_WAIT)); continue
+            tries=0
+            expect=batch[-1][4]
+            self._finish(mid,batch[-1][0],conflict=got if expect and got!=tuple(expect) else None)
+
+@st.cache_resource
+def ref_journal():
+    return _RefJournal(_config("REFEREE_JOURNAL","referee_journal.sqlite3"))
 
 # ─── Constants ────────────────────────────────────────────────────────────────
 TEAM_NAMES = [
@@ -122,7 +596,13 @@ TEAM_NAMES = [
 ]
 TEAM_LETTERS = ["A","B","C","D","E","F","G"]
 TEAM_COLORS  = ["#2563eb","#dc2626","#16a34a","#9333ea","#ea580c","#0891b2","#be185d"]
-LIMITS = {"player":14,"referee":2,"admin":1}
+TEAM_COUNT   = max(4,int(_config("TEAM_COUNT",len(TEAM_NAMES))))   # the bracket seeds the top 4
+LIMITS = {"player":2*TEAM_COUNT,"referee":int(_config("REFEREE_COUNT",2)),"admin":1}   # one referee per court
+MATCH_INSERT_CHUNK = 500   # rows per insert request (64 teams = 2016 group matches)
+
+def team_names(n):
+    """The named teams first, then "Team 8", "Team 9", … for bigger events."""
+    return TEAM_NAMES[:n]+[f"Team {i+1}" for i in range(len(TEAM_NAMES),n)]
 
 # Fixed schedule (A=index0 … G=index6) — exactly as specified
 FIXED_SCHEDULE = [
@@ -134,271 +614,723 @@ FIXED_SCHEDULE = [
     ("C","F","Court 3"),("D","G","Court 3"),
 ]
 
+# ─── Round-robin schedule ─────────────────────────────────────────────────────
+# Any number of teams on any number of courts. Each court plays its matches in
+# match_order, so a match's "slot" is its position on its court; rest = slots a
+# team sits out between two of its games (0 = back-to-back). FIXED_SCHEDULE is
+# kept as the preset for the original 7 teams on Court 2 + Court 3.
+def round_robin(n):
+    """Circle method: rounds in which each of n teams plays at most once (one bye per
+    round when n is odd); every pair meets exactly once. Team 0 stays, the rest rotate."""
+    ring=list(range(n))+([None] if n%2 else []); m=len(ring); rounds=[]
+    for r in range(m-1):
+        pairs=[(ring[k],ring[m-1-k]) for k in range(m//2)]
+        rounds.append([(b,a) if (r+k)%2 else (a,b) for k,(a,b) in enumerate(pairs) if None not in (a,b)])
+        ring=[ring[0],ring[-1]]+ring[1:-1]
+    return rounds
+
+def build_schedule(n, k):
+    """[(team_a, team_b, court)] by index, in play order. Each court is a queue and a
+    game's slot is its position there: the next game goes to the open court with the
+    shortest queue, and is the one whose teams have rested longest without either
+    already playing that slot on another court, so back-to-backs only fill courts
+    nothing else can. A court no remaining game fits is closed (slots only move on).
+    Candidates come from a window near the front of round order (then the rest),
+    which keeps it linear enough for 64+ teams."""
+    pool=[p for rnd in round_robin(n) for p in rnd]; window=max(4*k,2*n)
+    load=[0]*k; shut=set(); last={}; out=[]
+    while pool:
+        slot,c=min((load[c],c) for c in range(k) if c not in shut)
+        best=None
+        for scope in (range(min(window,len(pool))),range(len(pool))):
+            for i in scope:
+                a,b=pool[i]; ra=slot-last.get(a,-n); rb=slot-last.get(b,-n)
+                if ra<1 or rb<1: continue
+                key=(-min(ra,rb),-(ra+rb),i)
+                if best is None or key<best: best=key
+            if best: break
+        if best is None: shut.add(c); continue
+        a,b=pool.pop(best[2]); out.append((slot,c,a,b)); last[a]=last[b]=slot; load[c]+=1
+    return [(a,b,c) for _,c,a,b in sorted(out)]
+
+def court_order(courts):
+    return sorted(courts,key=lambda c:(len(c["name"]),c["name"]))   # Court 2 … Court 10
+
+def uses_fixed_schedule(teams, courts):
+    """The original event: the 7 named teams on exactly Court 2 + Court 3."""
+    return {c["name"] for c in courts}=={"Court 2","Court 3"} and \
+        {t["name"] for t in teams}==set(TEAM_NAMES[:len(TEAM_LETTERS)]) and len(teams)==len(TEAM_LETTERS)
+
+def group_schedule(teams, courts):
+    """Group-stage match rows in match_number order: FIXED_SCHEDULE when
+    uses_fixed_schedule(), otherwise generated by build_schedule()."""
+    courts=court_order(courts); by_name={t["name"]:t for t in teams}
+    if uses_fixed_schedule(teams,courts):
+        court={c["name"]:c for c in courts}; letter=dict(zip(TEAM_LETTERS,TEAM_NAMES))
+        plan=[(by_name[letter[a]],by_name[letter[b]],court[c]) for a,b,c in FIXED_SCHEDULE]
+    else:
+        plan=[(teams[a],teams[b],courts[c]) for a,b,c in build_schedule(len(teams),len(courts))]
+    return [{"match_number":i+1,"stage":"group","team1_id":a["id"],"team2_id":b["id"],"court_id":c["id"],
+             "referee_id":c.get("referee_id"),"status":"pending","match_order":i+1} for i,(a,b,c) in enumerate(plan)]
+
+def schedule_stats(rows):
+    """Court load and rest for group rows (see above)."""
+    load={}; at={}
+    for m in sorted(rows,key=lambda m:m["match_order"]):
+        c=m["court_id"]; s=load.get(c,0); load[c]=s+1
+        for t in (m["team1_id"],m["team2_id"]): at.setdefault(t,[]).append(s)
+    gaps=[y-x for g in map(sorted,at.values()) for x,y in zip(g,g[1:])]
+    return {"matches":len(rows),"slots":max(load.values(),default=0),"court_load":sorted(load.values(),reverse=True),
+            "back_to_back":sum(g==1 for g in gaps),"min_rest":max(0,min(gaps,default=1)-1),
+            "avg_rest":round(sum(gaps)/len(gaps)-1,2) if gaps else 0.0}
+
 # ─── DB helpers ───────────────────────────────────────────────────────────────
+
+@profiled
 def signup_user(name, mobile, password, role):
     try:
-        r = get_db().table("users").insert({"name":name,"mobile":mobile,
-            "password_hash":hp(password),"role":role}).execute()
+        r = _with_retry(lambda: get_db().table("users").insert({"name":name,"mobile":mobile,
+            "password_hash":hp(password),"role":role}).execute(),write=True)
+        _invalidate("role_counts")
         return r.data[0], None
     except Exception as e:
         return None, str(e)
 
+@profiled
+@db_retry
 def login_user(mobile, password):
-    r = get_db().table("users").select("*").eq("mobile",mobile).execute()
+    r = get_db().table("users").select("id,name,role,password_hash").eq("mobile",mobile).execute()
     if not r.data: return None,"Mobile not registered."
-    u = r.data[0]
-    if hp(password) != u["password_hash"]: return None,"Wrong password."
+    u = r.data[0]; stored = u.pop("password_hash")
+    if not login_cache().hit(mobile,stored,password):
+        ok,rehash = check_pw(password,stored)
+        if not ok: return None,"Wrong password."
+        if rehash:
+            stored = hp(password)
+            get_db().table("users").update({"password_hash":stored}).eq("id",u["id"]).execute()
+        login_cache().put(mobile,stored,password)
     return u, None
 
+@_shared("role_counts")
+@db_retry
+def _load_role_counts():
+    return {role:_count(get_db().table("users").select("id",count="exact",head=True).eq("role",role))
+            for role in ("player","referee","admin")}
+
+@profiled
 def count_by_role():
-    r = get_db().table("users").select("role").execute()
-    c = {"player":0,"referee":0,"admin":0}
-    for row in r.data: c[row["role"]] = c.get(row["role"],0)+1
-    return c
+    return _snap("role_counts",_load_role_counts)
 
+@profiled
+@db_retry
 def get_all_users():
     return get_db().table("users").select("id,name,role,created_at").order("created_at").execute().data
 
-def get_state():
+@_shared("state")
+@db_retry
+def _load_state():
     return get_db().table("tournament_state").select("*").eq("id",1).execute().data[0]
 
+@profiled
+def get_state():
+    return _snap("state",_load_state)
+
+_ZERO_ID = "00000000-0000-0000-0000-000000000000"
+
+@profiled
+@db_retry
 def reset_all_data():
-    """Nuclear reset: clears all tournament data, keeps courts intact."""
-    db = get_db()
-    db.table("award_votes").delete().neq("id","00000000-0000-0000-0000-000000000000").execute()
-    db.table("match_moments").delete().neq("id","00000000-0000-0000-0000-000000000000").execute()
-    db.table("match_disputes").delete().neq("id","00000000-0000-0000-0000-000000000000").execute()
-    db.table("matches").delete().neq("id","00000000-0000-0000-0000-000000000000").execute()
-    db.table("teams").delete().neq("id","00000000-0000-0000-0000-000000000000").execute()
-    db.table("users").delete().neq("id","00000000-0000-0000-0000-000000000000").execute()
+    """Nuclear reset: clears all tournament data, keeps courts intact.
+    One atomic reset_tournament() call; returns {"counts": {table: rows}, "ms": server
+    time, "total_ms": round trip included}. In-process caches are emptied too."""
+    t=time.perf_counter()
+    rep = _rpc("reset_tournament",{},_reset_all_data_seq)
+    rep["total_ms"] = round((time.perf_counter()-t)*1000,1)
+    _invalidate(); moment_log().reset(); standings().reset(); match_seq().reset(); dispatcher().reset(); ref_journal().clear()
+    live_bus().publish()
+    return rep
+
+def _reset_all_data_seq():
+    """Fallback without reset_tournament(): one round trip per table, not atomic."""
+    db = get_db(); t=time.perf_counter(); counts={}
+    for tbl in ("award_votes","match_moments","match_disputes","matches","teams","users"):
+        counts[tbl] = db.table(tbl).delete(count="exact",returning="minimal").neq("id",_ZERO_ID).execute().count or 0
     db.table("award_results_revealed").update({"revealed":False}).eq("id",1).execute()
-    db.table("courts").update({"referee_id":None}).neq("id","00000000-0000-0000-0000-000000000000").execute()
+    counts["courts"] = db.table("courts").update({"referee_id":None},count="exact",returning="minimal")\
+        .neq("id",_ZERO_ID).execute().count or 0
     db.table("tournament_state").update({
         "phase":"signup","signups_frozen":False,"teams_assigned":False,
         "schedule_generated":False,"group_stage_complete":False,
         "semifinals_complete":False
     }).eq("id",1).execute()
+    return {"counts":counts,"ms":round((time.perf_counter()-t)*1000,1)}
 
+@profiled
+@db_retry
 def update_state(**kw):
     get_db().table("tournament_state").update(kw).eq("id",1).execute()
+    _invalidate("state")
 
-def get_teams():
+@_shared("teams")
+@db_retry
+def _load_teams():
     return get_db().table("teams").select(
         "*, p1:users!teams_player1_id_fkey(id,name), p2:users!teams_player2_id_fkey(id,name)"
     ).order("name").execute().data
 
+@profiled
+def get_teams():
+    return _snap("teams",_load_teams)
+
 def get_teams_simple():
-    return get_db().table("teams").select("id,name").order("name").execute().data
+    return [{"id":t["id"],"name":t["name"]} for t in get_teams()]
 
+@profiled
+@db_write
 def create_teams(assignments):
     get_db().table("teams").insert(assignments).execute()
+    _invalidate("teams"); standings().reset()
 
-def get_courts():
+@_shared("courts")
+@db_retry
+def _load_courts():
     return get_db().table("courts").select("*, ref:users(id,name)").execute().data
 
+@profiled
+def get_courts():
+    return _snap("courts",_load_courts)
+
+@profiled
+@db_retry
 def auto_assign_referees():
+    """Referees in signup order onto courts in name order (Court 2, Court 3, …)."""
     refs = get_db().table("users").select("id,name").eq("role","referee").order("created_at").execute().data
-    courts = get_courts()
-    c2 = next((c for c in courts if c["name"]=="Court 2"),None)
-    c3 = next((c for c in courts if c["name"]=="Court 3"),None)
-    if len(refs)>=1 and c2: get_db().table("courts").update({"referee_id":refs[0]["id"]}).eq("id",c2["id"]).execute()
-    if len(refs)>=2 and c3: get_db().table("courts").update({"referee_id":refs[1]["id"]}).eq("id",c3["id"]).execute()
-
-def _ms():
-    return ("*, "
-        "team1:teams!matches_team1_id_fkey(id,name,p1:users!teams_player1_id_fkey(id,name),p2:users!teams_player2_id_fkey(id,name)),"
-        "team2:teams!matches_team2_id_fkey(id,name,p1:users!teams_player1_id_fkey(id,name),p2:users!teams_player2_id_fkey(id,name)),"
+    for ref,court in zip(refs,court_order(get_courts())):
+        get_db().table("courts").update({"referee_id":ref["id"]}).eq("id",court["id"]).execute()
+    _invalidate("courts")
+
+# Match projections, each a superset of the one before. Views ask for the narrowest
+# they render; the run's snapshot reuses a wider one that is already loaded.
+#   minimal      match columns + team/court/winner {id,name}  (brackets, history, referee)
+#   with_players + team p1/p2 {id,name}                       (schedule rows, live cards)
+#   full         every match column, players included
+MATCH_PROJECTIONS = ("minimal","with_players","full")
+_MATCH_COLS = ("id,match_number,match_order,stage,status,court_id,referee_id,"
+               "team1_id,team2_id,winner_id,score_team1,score_team2")
+_CARD_COLS = {   # flat match_cards view columns per projection
+    "minimal": _MATCH_COLS+",team1_name,team2_name,court_name,winner_name",
+    "with_players": _MATCH_COLS+",team1_name,team2_name,court_name,winner_name,"
+        "team1_p1_id,team1_p1_name,team1_p2_id,team1_p2_name,team2_p1_id,team2_p1_name,team2_p2_id,team2_p2_name",
+}
+
+def _ms(proj="full"):
+    """Embedded-join select for a projection (the fallback without match_cards)."""
+    pl = "" if proj=="minimal" else ",p1:users!teams_player1_id_fkey(id,name),p2:users!teams_player2_id_fkey(id,name)"
+    return (("*, " if proj=="full" else _MATCH_COLS+",")+
+        f"team1:teams!matches_team1_id_fkey(id,name{pl}),"
+        f"team2:teams!matches_team2_id_fkey(id,name{pl}),"
         "court:courts(id,name),winner:teams!matches_winner_id_fkey(id,name)")
 
-def get_matches(stage=None):
-    q = get_db().table("matches").select(_ms()).order("match_order")
-    if stage: q = q.eq("stage",stage)
-    return q.execute().data
+def _from_card(r):
+    """match_cards row → the nested shape the embedded-join select returns."""
+    for t in ("team1","team2"):
+        team={"id":r[f"{t}_id"],"name":r.pop(f"{t}_name")}
+        for p in ("p1","p2"):
+            if f"{t}_{p}_id" in r: team[p]={"id":r.pop(f"{t}_{p}_id"),"name":r.pop(f"{t}_{p}_name")}
+        r[t]=team if team["id"] else None
+    cn=r.pop("court_name"); wn=r.pop("winner_name")
+    r["court"]={"id":r["court_id"],"name":cn} if r["court_id"] else None
+    r["winner"]={"id":r["winner_id"],"name":wn} if r["winner_id"] else None
+    return r
+
+@db_retry
+def _load_matches(proj="full", status=None):
+    def q(src, cols):
+        q=get_db().table(src).select(cols)
+        if status: q=q.eq("status",status)
+        return q.order("match_order").execute().data
+    if proj=="full": return q("matches",_ms())
+    return _deployed_or("match_cards",lambda: [_from_card(r) for r in q("match_cards",_CARD_COLS[proj])],
+                        lambda: q("matches",_ms(proj)))
+
+def _matches(proj):
+    have=_SNAP.get("matches") or {}
+    for p in MATCH_PROJECTIONS[MATCH_PROJECTIONS.index(proj):]:
+        if p in have: return have[p]
+    rows=_load_matches(proj); _SNAP.setdefault("matches",{})[proj]=rows
+    return rows
+
+@profiled
+def get_matches(stage=None, proj="minimal"):
+    return [m for m in _matches(proj) if not stage or m["stage"]==stage]
 
+@profiled
 def get_live_matches():
-    return get_db().table("matches").select(_ms()).eq("status","live").execute().data
+    # Not snapshot-backed: the live fragment reruns on its own and must see fresh scores
+    return _load_matches("with_players","live")
 
-def get_court_matches(court_id):
-    return get_db().table("matches").select(_ms()).eq("court_id",court_id).order("match_order").execute().data
+def get_court_matches(court_id, proj="minimal"):
+    return [m for m in get_matches(proj=proj) if m["court_id"]==court_id]
 
 def get_referee_active_match(court_id):
-    r = get_db().table("matches").select(_ms()).eq("court_id",court_id)\
-        .in_("status",["pending","live"]).order("match_order").limit(1).execute()
-    return r.data[0] if r.data else None
+    """The court's live match; otherwise the next one it should start — the head of
+    ready_queue() under dynamic dispatch, else the first pending match on the court."""
+    ms=get_matches()
+    if not dynamic_dispatch():
+        return next((m for m in ms if m["court_id"]==court_id and m["status"] in ("pending","live")),None)
+    live=next((m for m in ms if m["court_id"]==court_id and m["status"]=="live"),None)
+    return live or next(iter(ready_queue(court_id,ms)),None)
 
 def get_referee_court(ref_id):
-    r = get_db().table("courts").select("id,name").eq("referee_id",ref_id).execute()
-    return r.data[0] if r.data else None
+    return next((c for c in get_courts() if c.get("referee_id")==ref_id),None)
 
+@profiled
 def create_matches(matches):
-    get_db().table("matches").insert(matches).execute()
-
-def start_match(mid):
-    get_db().table("matches").update({"status":"live","score_history":"[]"}).eq("id",mid).execute()
-
-def add_score(mid, field, s1, s2, t1id, t2id, history):
-    ns1 = s1+(1 if field=="score_team1" else 0)
-    ns2 = s2+(1 if field=="score_team2" else 0)
-    hist2 = list(history)+[{"t1":s1,"t2":s2}]
+    """Bulk insert, MATCH_INSERT_CHUNK rows per request."""
+    for i in range(0,len(matches),MATCH_INSERT_CHUNK):
+        chunk=matches[i:i+MATCH_INSERT_CHUNK]
+        _with_retry(lambda: get_db().table("matches").insert(chunk,returning="minimal").execute(),write=True)
+    _invalidate("matches"); match_seq().reset()
+
+@profiled
+@db_write
+def start_match(mid, court=None):
+    """pending → live. Given the referee's court under dynamic dispatch the match is
+    claimed for it; False means another court got it first or a team went live."""
+    if court is not None and dynamic_dispatch():
+        if not claim_match(mid,court): _invalidate("matches"); return False
+    else: get_db().table("matches").update({"status":"live"}).eq("id",mid).execute()
+    dispatcher().on_start(mid); _invalidate("matches"); live_bus().publish()
+    return True
+
+@profiled
+def add_score(mid, field):
+    """+1 for one side in a single round trip. increment_score() bumps the score and
+    appends one (seq, team) row to match_points atomically, so two devices scoring
+    can't lose a point and the write payload stays constant-size. Not retried: a lost
+    response may hide an applied point (the referee journal uses apply_points)."""
+    team = 1 if field=="score_team1" else 2
+    m = _rpc("increment_score",{"p_match_id":mid,"p_team":team},lambda: _add_score_rmw(mid,team))
+    _invalidate("matches"); live_bus().publish()
+    ns1=m["score_team1"]; ns2=m["score_team2"]
     # Score can reach 15 — match stays LIVE until referee clicks End Game
     reached15 = ns1>=15 or ns2>=15
-    wid = (t1id if ns1>=15 else t2id) if reached15 else None
-    payload = {"score_team1":ns1,"score_team2":ns2,"score_history":json.dumps(hist2)}
-    if reached15 and wid: payload["winner_id"]=wid  # store but keep live
-    get_db().table("matches").update(payload).eq("id",mid).execute()
-    return reached15, wid, ns1, ns2
-
+    return reached15, (m.get("winner_id") if reached15 else None), ns1, ns2
+
+def _add_score_rmw(mid, team):
+    """Read-modify-write fallback for databases without increment_score()."""
+    m = get_db().table("matches").select("score_team1,score_team2,team1_id,team2_id").eq("id",mid).execute().data[0]
+    ns1 = m["score_team1"]+(1 if team==1 else 0); ns2 = m["score_team2"]+(1 if team==2 else 0)
+    payload = {"score_team1":ns1,"score_team2":ns2}
+    if ns1>=15 or ns2>=15: payload["winner_id"] = m["team1_id"] if ns1>=15 else m["team2_id"]  # store but keep live
+    _deployed_or("match_points",lambda: get_db().table("match_points").insert(
+        {"match_id":mid,"seq":ns1+ns2,"team":team}).execute(),lambda: None)   # no point log yet
+    return get_db().table("matches").update(payload).eq("id",mid).execute().data[0]
+
+@profiled
+@db_retry
 def end_game(mid):
     """Lock a match as completed — referee taps End Game after 15 is reached."""
     m = get_db().table("matches").select(
-        "score_team1,score_team2,team1_id,team2_id,winner_id"
+        "id,stage,score_team1,score_team2,team1_id,team2_id,winner_id"
     ).eq("id",mid).execute().data[0]
     s1=m["score_team1"]; s2=m["score_team2"]
     wid = m.get("winner_id") or (m["team1_id"] if s1>s2 else m["team2_id"])
     get_db().table("matches").update({"status":"completed","winner_id":wid}).eq("id",mid).execute()
-
-def undo_score(mid, history):
-    if not history: return
-    prev = history[-1]
-    get_db().table("matches").update({
-        "score_team1":prev["t1"],"score_team2":prev["t2"],
-        "score_history":json.dumps(history[:-1]),"winner_id":None,"status":"live"
-    }).eq("id",mid).execute()
-
+    _invalidate("matches"); live_bus().publish()
+    if m["stage"]=="group": standings().apply({**m,"winner_id":wid})
+    dispatcher().on_end(m); auto_advance_knockouts()
+    return m
+
+@profiled
+def apply_points(mid, ops):
+    """Replay [(op_key, "point"|"undo", args)] in order, return the server (s1, s2).
+    apply_points() records every op_key, so a batch resent after a lost response is
+    not applied twice. Without it the ops go one by one; the journal's score check
+    catches a replay."""
+    def one_by_one():
+        for _,kind,a in ops:
+            m = _rpc("increment_score",{"p_match_id":mid,"p_team":a["team"]},lambda: _add_score_rmw(mid,a["team"])) \
+                if kind=="point" else _rpc("undo_last_point",{"p_match_id":mid},lambda: _undo_score_rmw(mid,a.get("team")))
+        return m
+    m = _rpc("apply_points",{"p_match_id":mid,"p_ops":[{"key":k,"kind":kind,"team":a.get("team")} for k,kind,a in ops]},one_by_one)
+    _invalidate("matches"); live_bus().publish()
+    if any(kind=="undo" for _,kind,_ in ops): standings().remove(mid)
+    return m["score_team1"], m["score_team2"]
+
+@profiled
+def finish_match(mid, op_key=None):
+    """Journal handler for End Game: lock the match and flag the group stage when done."""
+    if end_game(mid)["stage"]=="group" and check_group_done(): update_state(group_stage_complete=True)
+
+def _undo_score_rmw(mid, team=None):
+    """Fallback for undo_last_point(). The point log says whose point was last; without
+    the match_points table only the caller's hint (the referee's tap history) does, and
+    with neither the score is left as it is."""
+    m = get_db().table("matches").select("score_team1,score_team2").eq("id",mid).execute().data[0]
+    tail = _deployed_or("match_points",lambda: get_db().table("match_points").select("seq,team").eq("match_id",mid)
+        .order("seq",desc=True).limit(1).execute().data,lambda: None)
+    if tail: t = tail[0]["team"]; get_db().table("match_points").delete().eq("match_id",mid).eq("seq",tail[0]["seq"]).execute()
+    elif tail is None and team and m[f"score_team{team}"]>0: t = team
+    else: return m
+    return get_db().table("matches").update({
+        "score_team1":m["score_team1"]-(t==1),"score_team2":m["score_team2"]-(t==2),
+        "winner_id":None,"status":"live"
+    }).eq("id",mid).execute().data[0]
+
+@profiled
+@db_retry
+def get_point_log(match_id, last=None):
+    """Point-by-point replay: [{seq, team, t1, t2, created_at}] with the running score.
+    last=n returns only the final n points (the running score is still exact)."""
+    pts = _deployed_or("match_points",lambda: get_db().table("match_points").select("seq,team,created_at")
+        .eq("match_id",match_id).order("seq").execute().data,lambda: [])
+    t1=t2=0
+    for p in pts:
+        t1+=p["team"]==1; t2+=p["team"]==2; p["t1"]=t1; p["t2"]=t2
+    return pts[-last:] if last else pts
+
+# ─── Standings ────────────────────────────────────────────────────────────────
+STANDINGS_REBUILD_S = 300   # full rebuild safety net for writes from another process
+
+@db_retry
+def _load_group_results():
+    return get_db().table("matches").select(
+        "id,team1_id,team2_id,score_team1,score_team2,winner_id"
+    ).eq("stage","group").eq("status","completed").execute().data
+
+class _Standings:
+    """Process-wide group table. Built once from completed group matches, then kept
+    current by end_game (apply) and undo (remove). The ranked list is cached until
+    the next change, so reading the standings costs nothing.
+    Rank: wins, then head-to-head wins among the teams tied on wins, diff, points for."""
+    def __init__(self):
+        self.lock=threading.Lock(); self.reset()
+    def reset(self):
+        with self.lock: self.results=None; self.built=0.0; self.ranked_rows=None
+    def _ensure(self):
+        if self.results is None or time.monotonic()-self.built>STANDINGS_REBUILD_S:
+            self.teams={t["id"]:t["name"] for t in _load_teams()}
+            self.results={m["id"]:m for m in _load_group_results()}
+            self.built=time.monotonic(); self.ranked_rows=None
+    def apply(self, m):
+        with self.lock:
+            if self.results is not None: self.results[m["id"]]=m; self.ranked_rows=None
+    def remove(self, mid):
+        with self.lock:
+            if self.results is not None and self.results.pop(mid,None): self.ranked_rows=None
+    def _rank(self):
+        rows={tid:{"id":tid,"team_name":n,"matches_played":0,"won":0,"lost":0,
+                   "score_for":0,"score_against":0} for tid,n in self.teams.items()}
+        for m in self.results.values():
+            for tid,sf,sa in ((m["team1_id"],m["score_team1"],m["score_team2"]),
+                              (m["team2_id"],m["score_team2"],m["score_team1"])):
+                r=rows.get(tid)
+                if r is None: continue
+                r["matches_played"]+=1; r["score_for"]+=sf; r["score_against"]+=sa
+                if m["winner_id"]==tid: r["won"]+=1
+                else: r["lost"]+=1
+        tied={}
+        for r in rows.values():
+            r["score_diff"]=r["score_for"]-r["score_against"]
+            tied.setdefault(r["won"],set()).add(r["id"])
+        for r in rows.values():
+            peers=tied[r["won"]]
+            r["h2h"]=sum(1 for m in self.results.values() if m["winner_id"]==r["id"]
+                         and m["team1_id"] in peers and m["team2_id"] in peers)
+        return sorted(rows.values(),key=lambda x:(x["won"],x["h2h"],x["score_diff"],x["score_for"]),reverse=True)
+    def ranked(self):
+        with self.lock:
+            self._ensure()
+            if self.ranked_rows is None: self.ranked_rows=self._rank()
+            return [dict(r) for r in self.ranked_rows]
+
+@st.cache_resource
+def standings():
+    return _Standings()
+
+@profiled
 def get_leaderboard():
-    rows = get_db().table("leaderboard").select("*").execute().data
-    for r in rows: r["score_diff"] = r["score_for"]-r["score_against"]
-    return rows
+    """Group table, already ranked (see _Standings)."""
+    return standings().ranked()
 
+@profiled
+@db_retry
 def check_group_done():
-    r = get_db().table("matches").select("id").eq("stage","group").neq("status","completed").execute()
-    return len(r.data)==0
-
-def get_top4():
-    rows = get_leaderboard()
-    rows.sort(key=lambda x:(x["won"],x["score_diff"],x["score_for"]),reverse=True)
-    return rows[:4], rows[4:]
-
-def create_semis(top4):
-    """
-    New knockout format:
-    Match A (stage=semifinal):  1st vs 2nd  → winner goes straight to Grand Final
-    Match B (stage=third_place): 3rd vs 4th  → loser is eliminated
-    Match C (stage=final): loser of A vs winner of B → winner goes to Grand Final
-    Grand Final: winner of A vs winner of C
-    Matches A and B are created now. C and GF created after both are done.
-    """
-    courts = get_courts()
-    c2 = next(c for c in courts if c["name"]=="Court 2")
-    c3 = next(c for c in courts if c["name"]=="Court 3")
-    mn = get_db().table("matches").select("match_number").order("match_number",desc=True).limit(1).execute()
-    mo = get_db().table("matches").select("match_order").order("match_order",desc=True).limit(1).execute()
-    bn = mn.data[0]["match_number"] if mn.data else 21
-    bo = mo.data[0]["match_order"] if mo.data else 21
-    get_db().table("matches").insert([
-        # SF1: 1st vs 2nd — winner goes to Grand Final (Court 3)
-        {"match_number":bn+1,"stage":"semifinal","team1_id":top4[0]["id"],"team2_id":top4[1]["id"],
-         "court_id":c3["id"],"referee_id":c3.get("referee_id"),"status":"pending","match_order":bo+1},
-        # SF2: 3rd vs 4th — loser eliminated (Court 2)
-        {"match_number":bn+2,"stage":"third_place","team1_id":top4[2]["id"],"team2_id":top4[3]["id"],
-         "court_id":c2["id"],"referee_id":c2.get("referee_id"),"status":"pending","match_order":bo+2},
-    ]).execute()
-
-def create_qualifier(sf_match, tp_match):
-    """
-    Match C: loser of Match A vs winner of Match B.
-    Winner of this qualifier reaches the Grand Final.
-    """
-    courts = get_courts()
-    c3 = next(c for c in courts if c["name"]=="Court 3")
-    mn = get_db().table("matches").select("match_number").order("match_number",desc=True).limit(1).execute()
-    mo = get_db().table("matches").select("match_order").order("match_order",desc=True).limit(1).execute()
-    bn = mn.data[0]["match_number"]; bo = mo.data[0]["match_order"]
-    def loser_id(m):
-        t1=(m.get("team1") or {}).get("id"); t2=(m.get("team2") or {}).get("id")
-        w=m.get("winner_id") or (m.get("winner") or {}).get("id")
-        return t1 if w==t2 else t2
-    def winner_id(m):
-        return m.get("winner_id") or (m.get("winner") or {}).get("id")
-    get_db().table("matches").insert([
-        {"match_number":bn+1,"stage":"qualifier",
-         "team1_id":loser_id(sf_match),"team2_id":winner_id(tp_match),
-         "court_id":c3["id"],"referee_id":c3.get("referee_id"),"status":"pending","match_order":bo+1},
-    ]).execute()
-
-def create_finals(sf_winner_id, qualifier_winner_id):
-    """Create the Grand Final: winner of Match A vs winner of Match C."""
-    courts = get_courts()
-    c3 = next(c for c in courts if c["name"]=="Court 3")
-    mn = get_db().table("matches").select("match_number").order("match_number",desc=True).limit(1).execute()
-    mo = get_db().table("matches").select("match_order").order("match_order",desc=True).limit(1).execute()
-    bn = mn.data[0]["match_number"]; bo = mo.data[0]["match_order"]
-    get_db().table("matches").insert([
-        {"match_number":bn+1,"stage":"final","team1_id":sf_winner_id,"team2_id":qualifier_winner_id,
-         "court_id":c3["id"],"referee_id":c3.get("referee_id"),"status":"pending","match_order":bo+1},
-    ]).execute()
+    if "matches" in _SNAP: return all(m["status"]=="completed" for m in get_matches("group"))
+    return _count(get_db().table("matches").select("id",count="exact",head=True)
+                  .eq("stage","group").neq("status","completed"))==0
+
+# ─── Court dispatch ───────────────────────────────────────────────────────────
+# Group matches are a shared queue instead of a per-court list: when a court is free
+# its referee gets the best match any court could start now. A match's court_id is
+# only its planned court until it is claimed (claim_match: pending → live on this
+# court, refused if another court took it or one of its teams is live). Knockout
+# matches keep their bracket court. DYNAMIC_DISPATCH=off restores the fixed courts.
+DISPATCH_REST_S  = 180      # a team that finished less than this ago is only picked if nothing else is ready
+DISPATCH_MATCH_S = 15*60    # assumed match length until this process has timed some
+
+def dynamic_dispatch():
+    """DYNAMIC_DISPATCH secret (default on)."""
+    return str(_config("DYNAMIC_DISPATCH",True)).lower() not in ("0","false","no","off")
+
+class _Dispatcher:
+    """Match start/finish times seen by this process — team rest and the average match
+    length behind projected_finish(). lock serialises claims made by the fallback."""
+    def __init__(self):
+        self.lock=threading.Lock(); self.reset()
+    def reset(self):
+        self.started={}; self.finished={}; self.durations=deque(maxlen=50)
+    def on_start(self, mid):
+        self.started[mid]=time.time()
+    def on_end(self, m):
+        now=time.time()
+        for t in (m["team1_id"],m["team2_id"]): self.finished[t]=now
+        t0=self.started.pop(m["id"],None)
+        if t0 is not None: self.durations.append(now-t0)
+    def rest(self, team, now):
+        return now-self.finished.get(team,float("-inf"))
+    def match_s(self):
+        return sum(self.durations)/len(self.durations) if self.durations else DISPATCH_MATCH_S
+
+@st.cache_resource
+def dispatcher():
+    return _Dispatcher()
+
+def ready_queue(court_id, matches=None):
+    """Pending matches court_id may start now, best first. Never a match with a team on
+    court. Order: its own pinned knockout match; then group matches whose teams have
+    both rested DISPATCH_REST_S, in plan order (slot on the planned court, this court's
+    own first); then the rest, most rested first."""
+    ms=get_matches() if matches is None else matches; now=time.time(); d=dispatcher()
+    busy={t for m in ms if m["status"]=="live" for t in (m["team1_id"],m["team2_id"])}
+    slot={}; seen={}
+    for m in ms:
+        if m["stage"]=="group": slot[m["id"]]=seen.get(m["court_id"],0); seen[m["court_id"]]=slot[m["id"]]+1
+    heap=[]
+    for m in ms:
+        if m["status"]!="pending" or m["team1_id"] in busy or m["team2_id"] in busy: continue
+        if m["stage"]!="group":
+            if m["court_id"]==court_id: heapq.heappush(heap,((0,0,0,0,m["match_order"]),m["id"],m))
+            continue
+        rest=min(d.rest(m["team1_id"],now),d.rest(m["team2_id"],now))
+        tier=1 if rest>=DISPATCH_REST_S else 2
+        key=(tier,0 if tier==1 else -rest,slot[m["id"]],m["court_id"]!=court_id,m["match_order"])
+        heapq.heappush(heap,(key,m["id"],m))
+    return [heapq.heappop(heap)[2] for _ in range(len(heap))]
+
+@profiled
+def claim_match(mid, court):
+    """Start mid on court if it is still pending and neither team is live. The
+    claim_match() RPC checks and updates under one advisory lock; the fallback does it
+    under the dispatcher lock with a conditional update (sound within one process)."""
+    def fallback():
+        with dispatcher().lock:
+            m=get_db().table("matches").select("team1_id,team2_id").eq("id",mid).execute().data[0]
+            live=get_db().table("matches").select("team1_id,team2_id").eq("status","live").execute().data
+            if {m["team1_id"],m["team2_id"]} & {t for l in live for t in (l["team1_id"],l["team2_id"])}: return False
+            return bool(get_db().table("matches").update({"status":"live","court_id":court["id"],"referee_id":court.get("referee_id")})
+                        .eq("id",mid).eq("status","pending").execute().data)
+    return bool(_rpc("claim_match",{"p_match_id":mid,"p_court_id":court["id"],"p_referee_id":court.get("referee_id")},fallback))
+
+def projected_finish(matches=None):
+    """(seconds left, unix time) for the whole event, roughly: live matches end after
+    the average match length, then every remaining match — pending plus bracket stages
+    not created yet — goes to whichever court frees up first."""
+    ms=get_matches() if matches is None else matches; d=dispatcher(); avg=d.match_s(); now=time.time()
+    k=max(1,len([c for c in get_courts() if c.get("referee_id")]))
+    free=[max(0.0,avg-(now-d.started.get(m["id"],now))) for m in ms if m["status"]=="live"]
+    free=sorted(free+[0.0]*(k-len(free)))
+    left=sum(m["status"]=="pending" for m in ms)+len(BRACKET)-len({m["stage"] for m in ms if m["stage"]!="group"})
+    heapq.heapify(free)
+    for _ in range(left): heapq.heappush(free,heapq.heappop(free)+avg)
+    secs=max(free) if ms else 0.0
+    return secs, now+secs
+
+# ─── Knockout bracket ─────────────────────────────────────────────────────────
+# Declarative bracket: a stage is created once every stage in "after" is complete.
+# Team sources: ("seed",n) = n-th in the group table, ("winner"|"loser",stage).
+#   SF1 (semifinal):    1st vs 2nd  → winner goes straight to the Grand Final
+#   SF2 (third_place):  3rd vs 4th  → loser is eliminated
+#   Qualifier:          loser of SF1 vs winner of SF2 → winner reaches the Grand Final
+#   Grand Final (final): winner of SF1 vs winner of Qualifier
+# "court" indexes court_order() of the refereed courts (1 = Court 3 at the original
+# event, 0 = Court 2); with fewer courts it falls back to the last one.
+BRACKET = [
+    {"stage":"semifinal",  "after":("group",),                 "court":1,"phase":"semifinals",
+     "teams":(("seed",1),("seed",2))},
+    {"stage":"third_place","after":("group",),                 "court":0,
+     "teams":(("seed",3),("seed",4))},
+    {"stage":"qualifier",  "after":("semifinal","third_place"),"court":1,
+     "teams":(("loser","semifinal"),("winner","third_place"))},
+    {"stage":"final",      "after":("semifinal","qualifier"),  "court":1,"phase":"final",
+     "teams":(("winner","semifinal"),("winner","qualifier"))},
+]
 
+def bracket_court(spec, courts):
+    """The court a knockout stage is played on: courts with a referee first, so a stage
+    never lands on a court nobody can score."""
+    pick=court_order([c for c in courts if c.get("referee_id")] or courts)
+    return pick[min(spec["court"],len(pick)-1)] if pick else None
+
+def bracket_next(matches, ranked):
+    """Pure: [(spec, team1_id, team2_id)] for every stage that is due but not created yet."""
+    group=[m for m in matches if m["stage"]=="group"]
+    by_stage={}
+    for m in matches: by_stage.setdefault(m["stage"],m)
+    def done(stage):
+        if stage=="group": return bool(group) and all(m["status"]=="completed" for m in group)
+        return stage in by_stage and by_stage[stage]["status"]=="completed"
+    def team(src):
+        kind,arg=src
+        if kind=="seed": return ranked[arg-1]["id"] if len(ranked)>=arg else None
+        m=by_stage[arg]; w=m.get("winner_id")
+        return w if kind=="winner" else (m["team1_id"] if w==m["team2_id"] else m["team2_id"])
+    due=[]
+    for spec in BRACKET:
+        if spec["stage"] in by_stage or not all(done(a) for a in spec["after"]): continue
+        t1,t2=(team(src) for src in spec["teams"])
+        if t1 and t2: due.append((spec,t1,t2))
+    return due
+
+class _MatchSeq:
+    """Allocator for the next match_number / match_order. Seeded once from the matches
+    snapshot, then handed out under a lock, so creating knockout matches needs no
+    max() queries and two concurrent advancers never get the same numbers."""
+    def __init__(self):
+        self.lock=threading.Lock(); self.next=None
+    def reset(self):
+        with self.lock: self.next=None
+    def take(self, n, matches):
+        with self.lock:
+            if self.next is None:
+                self.next=(max((m["match_number"] for m in matches),default=0)+1,
+                           max((m["match_order"] for m in matches),default=0)+1)
+            bn,bo=self.next; self.next=(bn+n,bo+n)
+            return list(zip(range(bn,bn+n),range(bo,bo+n)))
+    def give_back(self, nums):
+        """Undo take() after a failed insert, unless a later take() already moved on."""
+        with self.lock:
+            if nums and self.next==(nums[-1][0]+1,nums[-1][1]+1): self.next=nums[0]
+
+@st.cache_resource
+def match_seq():
+    return _MatchSeq()
+
+@profiled
+@db_write
+def create_knockout_matches(due):
+    """Insert every due stage in one batch — the only round trip bracket creation makes."""
+    courts=get_courts(); rows=[]; nums=match_seq().take(len(due),get_matches())
+    for (spec,t1,t2),(num,order) in zip(due,nums):
+        c=bracket_court(spec,courts)
+        rows.append({"match_number":num,"stage":spec["stage"],"team1_id":t1,"team2_id":t2,
+                     "court_id":c["id"],"referee_id":c.get("referee_id"),"status":"pending","match_order":order})
+    try: get_db().table("matches").insert(rows).execute()
+    except Exception: match_seq().give_back(nums); raise
+    _invalidate("matches")
+
+@st.cache_resource
+def _bracket_lock():
+    return threading.Lock()
+
+@profiled
 def auto_advance_knockouts():
     """
-    Called on every page load when group stage is complete.
-    Creates SF1, SF2 automatically. Then when both done → Qualifier.
-    Then when Qualifier done → Grand Final. Fully automatic, no admin clicks needed.
+    Match-completion handler (end_game calls it). Works out the due stages from the
+    in-memory matches + standings, so when nothing is due it costs no queries.
+    Exactly-once: a process lock serialises callers here, and the unique index on
+    matches(stage) for knockout stages turns a concurrent duplicate into a no-op.
     """
-    try:
-        all_sf = get_db().table("matches").select("*,team1:teams!matches_team1_id_fkey(id,name),team2:teams!matches_team2_id_fkey(id,name),winner:teams!matches_winner_id_fkey(id,name)").eq("stage","semifinal").order("match_order").execute().data
-        all_tp = get_db().table("matches").select("*,team1:teams!matches_team1_id_fkey(id,name),team2:teams!matches_team2_id_fkey(id,name),winner:teams!matches_winner_id_fkey(id,name)").eq("stage","third_place").order("match_order").execute().data
-        all_ql = get_db().table("matches").select("*,team1:teams!matches_team1_id_fkey(id,name),team2:teams!matches_team2_id_fkey(id,name),winner:teams!matches_winner_id_fkey(id,name)").eq("stage","qualifier").order("match_order").execute().data
-        all_fn = get_db().table("matches").select("*").eq("stage","final").execute().data
-
-        match_sf1 = all_sf[0] if all_sf else None
-        match_sf2 = all_tp[0] if all_tp else None
-        match_ql  = all_ql[0] if all_ql else None
-
-        # Step 1: Create SF1 + SF2 if not yet created
-        if not match_sf1:
-            top4, _ = get_top4()
-            if len(top4) >= 4:
-                create_semis(top4)
-                update_state(phase="semifinals")
-            return  # rerun will pick up next step
-
-        # Step 2: Once SF1 and SF2 both done, create Qualifier
-        sf1_done = match_sf1["status"] == "completed"
-        sf2_done = match_sf2 and match_sf2["status"] == "completed"
-        if sf1_done and sf2_done and not match_ql and not all_fn:
-            create_qualifier(match_sf1, match_sf2)
-            return
-
-        # Step 3: Once Qualifier done, create Grand Final
-        ql_done = match_ql and match_ql["status"] == "completed"
-        if sf1_done and ql_done and not all_fn:
-            def _wid(m): return m.get("winner_id") or (m.get("winner") or {}).get("id")
-            create_finals(_wid(match_sf1), _wid(match_ql))
-            update_state(phase="final")
-    except Exception:
-        pass  # Silently skip on errors — will retry next rerun
-
-def add_moment(match_id, mtype, team_id, score_str):
-    get_db().table("match_moments").insert({
+    with _bracket_lock():
+        due=bracket_next(get_matches(),get_leaderboard())
+        if not due: return []
+        try: create_knockout_matches(due)
+        except Exception as e:
+            if getattr(e,"code",None)!="23505": raise   # unique_violation: already created
+            _invalidate("matches"); match_seq().reset(); return []
+        for spec,_,_ in due:
+            if spec.get("phase"): update_state(phase=spec["phase"])
+        return [spec["stage"] for spec,_,_ in due]
+
+def _insert_once(table, row, op_key=None):
+    """Insert row tagged with op_key (unique); a replayed op_key (23505) is already in."""
+    ins=lambda r: get_db().table(table).insert(r).execute()
+    if not op_key: return ins(row)
+    try: _deployed_or(f"{table}.op_key",lambda: ins({**row,"op_key":op_key}),lambda: ins(row))
+    except Exception as e:
+        if getattr(e,"code",None)!="23505": raise
+
+@profiled
+@db_write
+def add_moment(match_id, mtype, team_id, score_str, op_key=None):
+    _insert_once("match_moments",{
         "match_id":match_id,"moment_type":mtype,"team_id":team_id,"score_at_time":score_str
-    }).execute()
+    },op_key)
+    live_bus().publish()
+
+@db_retry
+def _fetch_moments(match_ids, since=None):
+    q = get_db().table("match_moments").select("*, team:teams(name)").in_("match_id",list(match_ids))
+    if since: q = q.gte("created_at",since)
+    return q.order("created_at").execute().data
+
+class _MomentLog:
+    """Process-wide moments grouped by match. The first request for a set of matches
+    is one batched in_() query; after that, only rows at/after the last created_at
+    already seen are pulled, and only when the live bus reports a write."""
+    def __init__(self):
+        self.lock=threading.Lock(); self.reset()
+    def reset(self):
+        with self.lock: self.by_match={}; self.known=set(); self.last={}; self.checked={}
+    def get(self, match_ids):
+        ids=[m for m in dict.fromkeys(match_ids) if m]
+        v=live_bus().version()
+        with self.lock:
+            todo=[m for m in ids if self.checked.get(m)!=v]
+            if todo:
+                marks=[self.last.get(m) for m in todo]
+                since=None if None in marks else min(marks)
+                rows=_fetch_moments(todo,since)
+                for mm in rows:
+                    if mm["id"] in self.known: continue
+                    self.known.add(mm["id"]); self.by_match.setdefault(mm["match_id"],[]).append(mm)
+                high=max((mm["created_at"] for mm in rows),default=None)
+                for m in todo:
+                    self.by_match.setdefault(m,[]); self.checked[m]=v
+                    if high: self.last[m]=max(self.last.get(m) or high,high)
+            return {m:list(self.by_match[m]) for m in ids}
+
+@st.cache_resource
+def moment_log():
+    return _MomentLog()
+
+@profiled
+def get_moments_for(match_ids):
+    """{match_id: [moments in created_at order]} for every id — one query at most."""
+    return moment_log().get(match_ids)
 
 def get_moments(match_id):
-    return get_db().table("match_moments").select(
-        "*, team:teams(name)"
-    ).eq("match_id",match_id).order("created_at").execute().data
+    return get_moments_for([match_id])[match_id]
 
+@profiled
+@db_retry
 def get_all_moments():
     """All moments across all matches for broadcast feed."""
     return get_db().table("match_moments").select(
         "*, team:teams(name), match:matches(match_number,stage)"
     ).order("created_at",desc=True).limit(20).execute().data
 
-def flag_dispute(match_id, ref_id, note):
-    get_db().table("match_disputes").insert({
+@profiled
+@db_write
+def flag_dispute(match_id, ref_id, note, op_key=None):
+    _insert_once("match_disputes",{
         "match_id":match_id,"referee_id":ref_id,"note":note,"status":"open"
-    }).execute()
+    },op_key)
+    _invalidate("court_dispute")
 
+@profiled
+@db_retry
 def get_open_disputes():
     return get_db().table("match_disputes").select(
         "*, match:matches(id,match_number,score_team1,score_team2,"
@@ -407,6 +1339,8 @@ def get_open_disputes():
         "referee:users(name)"
     ).eq("status","open").execute().data
 
+@profiled
+@db_retry
 def get_all_disputes():
     return get_db().table("match_disputes").select(
         "*, match:matches(id,match_number,score_team1,score_team2,"
@@ -415,96 +1349,161 @@ def get_all_disputes():
         "referee:users(name)"
     ).order("created_at",desc=True).execute().data
 
+@_shared("court_dispute")
+@db_retry
+def _load_court_dispute(court_id):
+    # Inner join filtered on matches.court_id server-side (matches_court_id_idx), one row max
+    r = get_db().table("match_disputes").select(
+        "id, status, note, match_id, match:matches!inner(court_id)"
+    ).eq("status","open").eq("match.court_id",court_id).limit(1).execute()
+    return r.data[0] if r.data else None
+
+@profiled
 def get_referee_open_dispute(court_id):
-    """Check if there's an open dispute for ANY match on this court."""
-    try:
-        # Get all open disputes with their match court_id
-        r = get_db().table("match_disputes").select(
-            "id, status, note, match_id, match:matches!inner(court_id)"
-        ).eq("status","open").execute()
-        for d in r.data:
-            m = d.get("match") or {}
-            if m.get("court_id") == court_id:
-                return d
-    except Exception:
-        pass
-    return None
+    """Check if there's an open dispute for ANY match on this court. Cached per court;
+    flag_dispute / resolve_dispute invalidate, so a referee tap normally costs no query."""
+    try: return _load_court_dispute(court_id)
+    except Exception: return None
 
+@profiled
+@db_write
 def resolve_dispute(dispute_id, match_id, undo):
     from datetime import datetime
     get_db().table("match_disputes").update({
         "status":"resolved","resolved_at":datetime.utcnow().isoformat()
     }).eq("id",dispute_id).execute()
-    if undo and match_id:
-        m = get_db().table("matches").select("score_history,score_team1,score_team2")\
-            .eq("id",match_id).execute().data[0]
-        hist = m.get("score_history") or []
-        if isinstance(hist,str): hist = json.loads(hist) if hist else []
-        undo_score(match_id,hist)
+    _invalidate("court_dispute")
+    # Keyed by the dispute, so a retried resolve never undoes a second point
+    if undo and match_id: apply_points(match_id,[(f"dispute:{dispute_id}","undo",{})])
 
 # Awards / Voting
+@_shared("award_categories")
+@db_retry
+def _load_award_categories():
+    return get_db().table("award_categories").select("*").order("created_at").execute().data
+
+@profiled
 def get_award_categories():
     EXCLUDED = {"Best Dressed", "Fan Favourite", "Fan Favorite"}
-    rows = get_db().table("award_categories").select("*").order("created_at").execute().data
+    rows = _snap("award_categories",_load_award_categories)
     return [r for r in rows if r.get("name") not in EXCLUDED]
 
+@profiled
+@db_retry
 def get_my_votes(user_id):
     r = get_db().table("award_votes").select("category_id,voted_team_id").eq("voter_id",user_id).execute()
     return {row["category_id"]: row["voted_team_id"] for row in r.data}
 
+@profiled
 def cast_vote(user_id, category_id, team_id):
     try:
-        get_db().table("award_votes").insert({
+        _with_retry(lambda: get_db().table("award_votes").insert({
             "voter_id":user_id,"category_id":category_id,"voted_team_id":team_id
-        }).execute()
+        }).execute(),write=True)
+        _invalidate("vote_tallies")
         return True
     except: return False
 
-def get_vote_results():
-    """Tally votes per category."""
+@_shared("vote_tallies")
+@db_retry
+def _load_vote_tallies():
+    """[{category_id, team_name, votes}] from the trigger-maintained award_tallies table:
+    one row per (category, team), so the read stays the same size however many vote."""
+    def read():
+        rows = get_db().table("award_tallies").select("category_id,votes,team:teams(name)").gt("votes",0).execute().data
+        return [{"category_id":r["category_id"],"team_name":(r.get("team") or {}).get("name","?"),"votes":r["votes"]} for r in rows]
+    return _deployed_or("award_tallies",read,_tally_votes)
+
+def _tally_votes():
+    """Fallback before the award_tallies migration: download and count every vote."""
     votes = get_db().table("award_votes").select("category_id,voted_team_id,team:teams(name)").execute().data
-    cats  = get_award_categories()
     tally = {}
     for v in votes:
-        cid = v["category_id"]; tn = (v.get("team") or {}).get("name","?")
-        tally.setdefault(cid,{})
-        tally[cid][tn] = tally[cid].get(tn,0)+1
+        key = (v["category_id"],(v.get("team") or {}).get("name","?"))
+        tally[key] = tally.get(key,0)+1
+    return [{"category_id":c,"team_name":tn,"votes":n} for (c,tn),n in tally.items()]
+
+@profiled
+def get_vote_results():
+    """Per category: {"cat", "ranked": [(team, votes)…] most votes first, "counts", "winner"}."""
+    by_cat = {}
+    for r in _snap("vote_tallies",_load_vote_tallies):
+        by_cat.setdefault(r["category_id"],[]).append((r["team_name"],r["votes"]))
     result = {}
-    for cat in cats:
-        cid = cat["id"]
-        counts = tally.get(cid,{})
-        winner = max(counts,key=counts.get) if counts else None
-        result[cid] = {"cat":cat,"counts":counts,"winner":winner}
+    for cat in get_award_categories():
+        ranked = sorted(by_cat.get(cat["id"],[]),key=lambda x:(-x[1],x[0]))
+        result[cat["id"]] = {"cat":cat,"ranked":ranked,"counts":dict(ranked),
+                             "winner":ranked[0][0] if ranked else None}
     return result
 
-def get_revealed():
+@_shared("revealed")
+@db_retry
+def _load_revealed():
     r = get_db().table("award_results_revealed").select("revealed").eq("id",1).execute()
     return r.data[0]["revealed"] if r.data else False
 
+@profiled
+def get_revealed():
+    return _snap("revealed",_load_revealed)
+
+@profiled
+@db_retry
 def count_all_matches():
-    """Returns (total, completed) across all match stages."""
-    all_m = get_db().table("matches").select("id,status").execute().data
-    done = sum(1 for m in all_m if m["status"] == "completed")
-    return len(all_m), done
+    """Returns (total, completed) across all match stages — from this run's snapshot
+    if it is already loaded, otherwise two head-only count requests."""
+    if "matches" in _SNAP:
+        all_m = get_matches()
+        return len(all_m), sum(1 for m in all_m if m["status"]=="completed")
+    q = lambda: get_db().table("matches").select("id",count="exact",head=True)
+    return _count(q()), _count(q().eq("status","completed"))
+
+def planned_match_count():
+    """Matches in the whole tournament: the round robin for the current teams plus the bracket."""
+    n=len(get_teams_simple())
+    return n*(n-1)//2+len(BRACKET)
 
 def is_tournament_complete():
-    """All 25 matches done: 21 group + 4 knockout."""
+    """Every match done: the full round robin plus the whole bracket."""
     total, done = count_all_matches()
-    return total >= 25 and done == total
+    return len(get_teams_simple())>=4 and total >= planned_match_count() and done == total
 
+@profiled
+@db_retry
 def set_revealed(val):
     get_db().table("award_results_revealed").update({"revealed":val}).eq("id",1).execute()
+    _invalidate("revealed")
 
 # History
 def get_match_history():
     """All completed matches with moments."""
-    return get_db().table("matches").select(_ms()).eq("status","completed").order("match_order").execute().data
+    return [m for m in get_matches() if m["status"]=="completed"]
 
 # ─── Render helpers ───────────────────────────────────────────────────────────
 def _tp(tobj):
     p1=(tobj.get("p1") or {}).get("name","?"); p2=(tobj.get("p2") or {}).get("name","?")
     return p1, p2
 
+def section_nav(page, labels):
+    """Lazy stand-in for st.tabs. Streamlit runs every tab body on every rerun, so
+    pages route on this instead and only the selected section loads its data.
+    The choice is mirrored in ?<page>=<index> so refreshes and shared links keep it."""
+    key=f"nav_{page}"
+    if key not in st.session_state:
+        try: st.session_state[key]=labels[int(st.query_params.get(page,0))]
+        except (ValueError,IndexError): st.session_state[key]=labels[0]
+    choice=st.radio(page,labels,horizontal=True,key=key,label_visibility="collapsed")
+    idx=labels.index(choice); st.query_params[page]=str(idx)
+    # Queries each hidden section cost the last time it was open = queries avoided now
+    costs=st.session_state.setdefault("_section_cost",{})
+    skipped=sum(c for (p,i),c in costs.items() if p==page and i!=idx)
+    if skipped: st.caption(f"⚡ {skipped} queries skipped this rerun (hidden sections)")
+    _RUN["section"]=(page,idx); _RUN["section_q0"]=_RUN["queries"]; _RUN["tag"]=(f"page_{page}",choice)
+    return idx
+
+def record_section_cost():
+    if "section" in _RUN:
+        st.session_state.setdefault("_section_cost",{})[_RUN["section"]]=_RUN["queries"]-_RUN["section_q0"]
+
 def render_match_row(m):
     t1=m.get("team1") or {}; t2=m.get("team2") or {}
     court=m.get("court") or {}; winner=m.get("winner") or {}
@@ -542,7 +1541,6 @@ def render_schedule_by_court(matches):
         for m in cms: render_match_row(m)
 
 def render_leaderboard(rows, my_team_name=None):
-    rows=sorted(rows,key=lambda x:(x["won"],x["score_diff"],x["score_for"]),reverse=True)
     pos_icons={1:"🥇",2:"🥈",3:"🥉",4:"4th"}
     st.markdown('<div class="lb-head"><div>Pos</div><div>Team</div><div>P</div><div>W</div><div>L</div><div>For</div><div>Agn</div><div>Diff</div></div>',unsafe_allow_html=True)
     for i,row in enumerate(rows):
@@ -583,11 +1581,15 @@ def render_bracket(matches, title):
             f'</div>',unsafe_allow_html=True
         )
 
-@st.fragment(run_every=5)
+@st.fragment(run_every=LIVE_CHECK_S)
 def render_live_scores_widget(auto_refresh=True):
-    """Renders live scores + highlights. Decorated with @st.fragment(run_every=5)
-    so Streamlit re-runs ONLY this fragment every 5 s — zero sleep, zero Errno 11."""
-    live = get_live_matches()
+    """Renders live scores + highlights. The fragment wakes every LIVE_CHECK_S and reads
+    the process-wide live_feed(); only its poller queries, once per score change."""
+    try: feed = live_feed().get()
+    except Exception: feed = None
+    if feed is None:
+        st.warning("⚠️ Live scores temporarily unavailable — retrying…"); return
+    live = feed["live"]
     if not live:
         st.info("⏳ No live matches right now.")
     else:
@@ -613,7 +1615,7 @@ def render_live_scores_widget(auto_refresh=True):
                     unsafe_allow_html=True
                 )
     # Moments feed — visible to everyone
-    moments = get_all_moments()
+    moments = feed["moments"]
     if moments:
         st.markdown("<br>",unsafe_allow_html=True)
         st.markdown('<div class="stitle">🎉 Highlights Feed</div>',unsafe_allow_html=True)
@@ -632,7 +1634,7 @@ def render_live_scores_widget(auto_refresh=True):
                 f'</div>',unsafe_allow_html=True
             )
     if auto_refresh:
-        st.caption("🔄 Auto-refreshing every 5 seconds")
+        st.caption("🔄 Updates automatically as points are scored")
 
 def show_teams_grid(teams):
     cols=st.columns(4)
@@ -681,8 +1683,9 @@ def render_history_tiles(history):
 
     # Moments — use expanders per match (tap to reveal), shown below the grid
     has_moments=False
+    by_match=get_moments_for([m["id"] for m in history])
     for m in history:
-        moments=get_moments(m["id"])
+        moments=by_match[m["id"]]
         if moments:
             if not has_moments:
                 st.markdown("<br>**🎯 Match Highlights (tap to expand)**", unsafe_allow_html=True)
@@ -717,7 +1720,7 @@ canvas{{border-radius:50%;box-shadow:0 8px 36px rgba(37,99,235,.28);}}
 const names={nj},colors={cj};
 const cv=document.getElementById('wh'),ctx=cv.getContext('2d');
 let cur=0,spinning=false,rem=[...names],spinIdx=0;
-const teams=["Vedant's Kitchens","Vedu's Rally Crew","Dink with Vedant","Pickleball Warriors","Drop Shot Society","Baseline Rebels","Spin Doctors"];
+const teams={json.dumps(team_names(len(player_names)//2))};
 function draw(a){{const cx=140,cy=140,r=132,disp=rem.length>0?rem:names,arc=2*Math.PI/disp.length;
 ctx.clearRect(0,0,280,280);
 for(let i=0;i<disp.length;i++){{const s=a+i*arc;ctx.beginPath();ctx.moveTo(cx,cy);ctx.arc(cx,cy,r,s,s+arc);ctx.closePath();
@@ -735,7 +1738,7 @@ const idx=Math.floor(norm/arc)%rem.length,w=rem[idx],ti=Math.floor(spinIdx/2);
 if(spinIdx%2===0)document.getElementById('result').textContent='🏓 '+w+' → '+teams[ti];
 else document.getElementById('result').textContent='🤝 Pair: prev + '+w+' = '+teams[ti];
 spinIdx++;rem=rem.filter(n=>n!==w);
-document.getElementById('prog').textContent=rem.length>0?rem.length+' left':'✅ All 7 teams formed!';
+document.getElementById('prog').textContent=rem.length>0?rem.length+' left':'✅ All '+teams.length+' teams formed!';
 setTimeout(()=>{{draw(cur);if(rem.length>0)spin();}},1100);}}requestAnimationFrame(anim);}}
 cv.addEventListener('click',spin);draw(0);
 </script></body></html>"""
@@ -800,15 +1803,15 @@ def show_win_celebration(winner_name):
 
 def page_spectator():
     """Public read-only view: Live scores, Schedule, Standings, Knockout."""
-    tabs=st.tabs(["🔴 Live Scores","📅 Schedule","🏆 Standings","🥊 Knockout","📜 History"])
+    sec=section_nav("spectator",["🔴 Live Scores","📅 Schedule","🏆 Standings","🥊 Knockout","📜 History"])
 
-    with tabs[0]:
+    if sec==0:
         st.markdown('<div class="stitle">🔴 Live Scores & Highlights</div>',unsafe_allow_html=True)
         render_live_scores_widget(auto_refresh=True)
 
-    with tabs[1]:
+    if sec==1:
         st.markdown('<div class="stitle">📅 Full Schedule</div>',unsafe_allow_html=True)
-        all_m=get_matches()
+        all_m=get_matches(proj="with_players")
         if not all_m: st.info("Schedule not generated yet.")
         else:
             done=sum(1 for m in all_m if m["status"]=="completed")
@@ -816,13 +1819,13 @@ def page_spectator():
             c1,c2,c3=st.columns(3); c1.metric("Total",len(all_m)); c2.metric("Done",done); c3.metric("Live",live)
             st.markdown("---"); render_schedule_by_court(all_m)
 
-    with tabs[2]:
+    if sec==2:
         st.markdown('<div class="stitle">🏆 Standings</div>',unsafe_allow_html=True)
         rows=get_leaderboard()
         if not rows: st.info("No data yet.")
         else: render_leaderboard(rows)
 
-    with tabs[3]:
+    if sec==3:
         st.markdown('<div class="stitle">🥊 Knockout Stage</div>',unsafe_allow_html=True)
         all_sf=get_matches("semifinal"); all_tp=get_matches("third_place")
         all_ql=get_matches("qualifier"); fn=get_matches("final")
@@ -853,7 +1856,7 @@ def page_spectator():
                             unsafe_allow_html=True
                         )
 
-    with tabs[4]:
+    if sec==4:
         st.markdown('<div class="stitle">📜 Match History</div>',unsafe_allow_html=True)
         history=get_match_history()
         st.caption(f"{len(history)} matches completed")
@@ -869,7 +1872,7 @@ def page_signup(state, counts):
         update_state(signups_frozen=True); st.error("All slots filled!"); return
     st.markdown('<div class="stitle">📝 Create Account</div>',unsafe_allow_html=True)
     c1,c2,c3=st.columns(3)
-    c1.metric("Players",f"{counts['player']}/14"); c2.metric("Referees",f"{counts['referee']}/2"); c3.metric("Admin",f"{counts['admin']}/1")
+    c1.metric("Players",f"{counts['player']}/{LIMITS['player']}"); c2.metric("Referees",f"{counts['referee']}/{LIMITS['referee']}"); c3.metric("Admin",f"{counts['admin']}/{LIMITS['admin']}")
     st.markdown("---")
     with st.form("signup",clear_on_submit=True):
         name=st.text_input("Full Name")
@@ -893,7 +1896,7 @@ def page_signup(state, counts):
             else:
                 st.success(f"✅ Registered as **{role}**! Switch to Login tab.")
                 nc=count_by_role()
-                if nc["player"]>=14 and nc["referee"]>=2 and nc["admin"]>=1:
+                if all(nc[r]>=LIMITS[r] for r in LIMITS):
                     update_state(signups_frozen=True); auto_assign_referees()
                 st.rerun()
 
@@ -912,9 +1915,9 @@ def page_login():
 
 # ── ADMIN ─────────────────────────────────────────────────────────────────────
 def page_admin(state):
-    tabs=st.tabs(["🔴 Live","👥 Participants","🎡 Teams","📅 Schedule","🏆 Standings","🥊 Knockout","🚨 Disputes","🏅 Awards","📜 History"])
+    sec=section_nav("admin",["🔴 Live","👥 Participants","🎡 Teams","📅 Schedule","🏆 Standings","🥊 Knockout","🚨 Disputes","🏅 Awards","📜 History","⏱️ Performance"])
 
-    with tabs[0]:
+    if sec==0:
         st.markdown('<div class="stitle">🔴 Live Scores</div>',unsafe_allow_html=True)
         render_live_scores_widget(auto_refresh=True)
 
@@ -925,12 +1928,12 @@ def page_admin(state):
             confirm_reset=st.text_input("Type RESET to confirm",key="reset_confirm")
             if st.button("🔴 Execute Full Reset",type="primary",key="do_reset"):
                 if confirm_reset=="RESET":
-                    reset_all_data(); st.session_state.user=None
-                    st.success("✅ Tournament reset complete! Redirecting…"); st.rerun()
+                    st.session_state["reset_report"]=reset_all_data(); st.session_state.user=None
+                    st.rerun()
                 else:
                     st.error("Type RESET exactly to confirm.")
 
-    with tabs[1]:
+    if sec==1:
         st.markdown('<div class="stitle">👥 Participants</div>',unsafe_allow_html=True)
         users=get_all_users()
         players=[u for u in users if u["role"]=="player"]
@@ -938,37 +1941,37 @@ def page_admin(state):
         admins=[u for u in users if u["role"]=="admin"]
         c1,c2,c3=st.columns(3)
         with c1:
-            st.markdown(f"**🏓 Players ({len(players)}/14)**")
+            st.markdown(f"**🏓 Players ({len(players)}/{LIMITS['player']})**")
             for p in players: st.markdown(f'<div class="uchip"><div class="uchip-name">{p["name"]}</div></div>',unsafe_allow_html=True)
         with c2:
-            st.markdown(f"**🎯 Referees ({len(refs)}/2)**")
+            st.markdown(f"**🎯 Referees ({len(refs)}/{LIMITS['referee']})**")
             for r in refs: st.markdown(f'<div class="uchip"><div class="uchip-name">{r["name"]}</div></div>',unsafe_allow_html=True)
             courts=get_courts()
             for court in courts:
                 ri=court.get("ref") or {}; rn=ri.get("name","Unassigned") if isinstance(ri,dict) else "Unassigned"
                 st.caption(f"🏟️ {court['name']} → **{rn}**")
         with c3:
-            st.markdown(f"**⚙️ Admin ({len(admins)}/1)**")
+            st.markdown(f"**⚙️ Admin ({len(admins)}/{LIMITS['admin']})**")
             for a in admins: st.markdown(f'<div class="uchip"><div class="uchip-name">{a["name"]}</div></div>',unsafe_allow_html=True)
         needed=[]
-        if len(players)<14: needed.append(f"{14-len(players)} more player(s)")
-        if len(refs)<2: needed.append(f"{2-len(refs)} more referee(s)")
+        if len(players)<LIMITS["player"]: needed.append(f"{LIMITS['player']-len(players)} more player(s)")
+        if len(refs)<LIMITS["referee"]: needed.append(f"{LIMITS['referee']-len(refs)} more referee(s)")
         if needed: st.warning(f"Waiting for: {', '.join(needed)}")
-        else: st.success("✅ All 17 registered!")
+        else: st.success(f"✅ All {sum(LIMITS.values())} registered!")
 
-    with tabs[2]:
+    if sec==2:
         st.markdown('<div class="stitle">🎲 Team Assignment</div>',unsafe_allow_html=True)
         teams=get_teams()
         if state["teams_assigned"] and teams:
             st.success("✅ Teams assigned."); show_teams_grid(teams)
         else:
             users=get_all_users(); players=[u for u in users if u["role"]=="player"]
-            if len(players)<14: st.warning(f"Need 14 players. Currently {len(players)}.")
+            if len(players)<LIMITS["player"]: st.warning(f"Need {LIMITS['player']} players. Currently {len(players)}.")
             else:
                 st.markdown(
                     '<div style="background:#eff6ff;border:1px solid #bfdbfe;border-radius:12px;padding:16px;margin-bottom:16px;">'
                     '<div style="font-size:15px;font-weight:800;color:#1e40af;margin-bottom:4px">🎲 Mystery Team Generator</div>'
-                    '<div style="font-size:13px;color:#3730a3">Click <b>Generate Mystery Partners</b> to randomly pair all 14 players into 7 teams. '
+                    f'<div style="font-size:13px;color:#3730a3">Click <b>Generate Mystery Partners</b> to randomly pair all {LIMITS["player"]} players into {TEAM_COUNT} teams. '
                     'Preview the pairings, then confirm to lock them in — or regenerate for a fresh shuffle.</div>'
                     '</div>', unsafe_allow_html=True
                 )
@@ -977,9 +1980,9 @@ def page_admin(state):
                     if st.button("🎲 Generate Mystery Partners & Teams",type="primary",use_container_width=True,key="gen_teams"):
                         shuffled=random.sample(players,len(players))
                         st.session_state.pending_teams=[
-                            {"name":TEAM_NAMES[i],"player1_id":shuffled[i*2]["id"],"player2_id":shuffled[i*2+1]["id"],
+                            {"name":name,"player1_id":shuffled[i*2]["id"],"player2_id":shuffled[i*2+1]["id"],
                              "p1n":shuffled[i*2]["name"],"p2n":shuffled[i*2+1]["name"]}
-                            for i in range(7)]
+                            for i,name in enumerate(team_names(TEAM_COUNT))]
                         st.rerun()
                 else:
                     st.markdown("### 👀 Team Preview")
@@ -1005,58 +2008,61 @@ def page_admin(state):
                             if "pending_teams" in st.session_state: del st.session_state.pending_teams
                             st.rerun()
 
-    with tabs[3]:
+    if sec==3:
         st.markdown('<div class="stitle">📅 Schedule</div>',unsafe_allow_html=True)
         if not state["teams_assigned"]: st.warning("Assign teams first.")
         else:
-            existing=get_matches("group")
+            existing=get_matches("group","with_players")
             if not existing:
-                courts=get_courts()
-                if not all(c.get("referee_id") for c in courts):
-                    st.info("Auto-assigning referees…"); auto_assign_referees(); st.rerun()
-                st.info("21 matches fixed schedule across Court 2 and Court 3.")
-                if st.button("Generate Match Schedule",type="primary"):
-                    courts=get_courts(); court_map={c["name"]:c for c in courts}
-                    teams_db=get_teams_simple(); team_map={t["name"]:t["id"] for t in teams_db}
-                    # Map letter to full name
-                    letter_to_name={l:TEAM_NAMES[i] for i,l in enumerate(TEAM_LETTERS)}
-                    matches=[]
-                    for i,(ta,tb,court_name) in enumerate(FIXED_SCHEDULE):
-                        tna=letter_to_name[ta]; tnb=letter_to_name[tb]
-                        if tna not in team_map or tnb not in team_map:
-                            st.error(f"Team {tna} or {tnb} not found in DB. Check team names."); break
-                        matches.append({"match_number":i+1,"stage":"group",
-                            "team1_id":team_map[tna],"team2_id":team_map[tnb],
-                            "court_id":court_map[court_name]["id"],
-                            "referee_id":court_map[court_name].get("referee_id"),
-                            "status":"pending","match_order":i+1})
-                    if len(matches)==21:
-                        create_matches(matches); update_state(phase="group_stage",schedule_generated=True)
-                        st.success("✅ 21 matches generated!"); st.rerun()
+                if not all(c.get("referee_id") for c in get_courts()):
+                    auto_assign_referees()   # courts beyond the referees signed up stay unused
+                courts=[c for c in get_courts() if c.get("referee_id")]; teams_db=get_teams_simple()
+                if not courts: st.warning("No court has a referee yet.")
+                else:
+                    plan=group_schedule(teams_db,courts); ss=schedule_stats(plan)
+                    kind="fixed schedule" if uses_fixed_schedule(teams_db,courts) else "generated round robin"
+                    st.info(f"{ss['matches']} matches ({kind}) · {len(teams_db)} teams on {len(courts)} courts "
+                            f"({' / '.join(map(str,ss['court_load']))} games) · {ss['back_to_back']} back-to-back · "
+                            f"rest min {ss['min_rest']}, avg {ss['avg_rest']} games")
+                    if st.button("Generate Match Schedule",type="primary"):
+                        create_matches(plan); update_state(phase="group_stage",schedule_generated=True)
+                        st.success(f"✅ {len(plan)} matches generated!"); st.rerun()
             else:
                 done=sum(1 for m in existing if m["status"]=="completed")
                 live=sum(1 for m in existing if m["status"]=="live")
-                c1,c2,c3=st.columns(3)
-                c1.metric("Total",21); c2.metric("Done",done); c3.metric("Live",live)
+                c1,c2,c3,c4=st.columns(4)
+                c1.metric("Total",len(existing)); c2.metric("Done",done); c3.metric("Live",live)
+                secs,eta=projected_finish()
+                c4.metric("Projected finish",time.strftime("%H:%M",time.localtime(eta)) if secs else "—",
+                          f"~{secs/60:.0f} min left" if secs else None,delta_color="off")
+                if dynamic_dispatch():
+                    ups=[]
+                    for c in court_order([c for c in get_courts() if c.get("referee_id")]):
+                        if any(m["court_id"]==c["id"] and m["status"]=="live" for m in existing): continue
+                        q=ready_queue(c["id"])
+                        if q: ups.append(f"**{c['name']}** → {(q[0].get('team1') or {}).get('name','?')} vs {(q[0].get('team2') or {}).get('name','?')}")
+                    st.caption(f"🔀 Dynamic court dispatch: a free court takes the best ready match, whichever court it was planned on. "
+                               f"Avg match {dispatcher().match_s()/60:.0f} min.")
+                    if ups: st.markdown("⏭️ Up next: "+" · ".join(ups))
                 st.markdown("---"); render_schedule_by_court(existing)
-                if done==21 and not state["group_stage_complete"]:
+                if done==len(existing) and not state["group_stage_complete"]:
                     update_state(group_stage_complete=True); st.success("🎉 Group stage complete!")
 
-    with tabs[4]:
+    if sec==4:
         st.markdown('<div class="stitle">🏆 Standings</div>',unsafe_allow_html=True)
         rows=get_leaderboard()
         if not rows: st.info("No data yet.")
         else: render_leaderboard(rows)
 
-    with tabs[5]:
+    if sec==5:
         st.markdown('<div class="stitle">🥊 Knockout</div>',unsafe_allow_html=True)
         all_g_ko=get_matches("group"); group_done_cnt=sum(1 for m in all_g_ko if m["status"]=="completed")
-        if group_done_cnt==21 and not state.get("group_stage_complete"):
+        if all_g_ko and group_done_cnt==len(all_g_ko) and not state.get("group_stage_complete"):
             update_state(group_stage_complete=True); state["group_stage_complete"]=True
-        if not state.get("group_stage_complete") and group_done_cnt<21:
-            st.warning(f"Group stage not complete. ({group_done_cnt}/21 done)")
+        if not state.get("group_stage_complete"):
+            st.warning(f"Group stage not complete. ({group_done_cnt}/{len(all_g_ko)} done)")
         else:
-            # Auto-advance — creates matches as they become ready, no buttons needed
+            # end_game advances the bracket; this in-memory check only catches up a missed event
             auto_advance_knockouts()
 
             all_sf=get_matches("semifinal")
@@ -1068,13 +2074,14 @@ def page_admin(state):
             match_sf2=all_tp[0] if all_tp else None
             match_ql=all_ql[0] if all_ql else None
 
-            st.markdown("""
+            kc={spec["stage"]:(bracket_court(spec,get_courts()) or {}).get("name","?") for spec in BRACKET}
+            st.markdown(f"""
             <div style="background:#eff6ff;border:1px solid #bfdbfe;border-radius:12px;padding:14px;margin-bottom:16px;font-size:13px;line-height:1.9">
             <b>Knockout Format (fully automatic):</b><br>
-            🏅 <b>SF1</b>: 1st vs 2nd (Court 3) — winner → Grand Final<br>
-            💥 <b>SF2</b>: 3rd vs 4th (Court 2) — loser eliminated<br>
-            ⚔️ <b>Qualifier</b>: Loser of SF1 vs Winner of SF2 (Court 3) — winner → Grand Final<br>
-            🏆 <b>Grand Final</b>: Winner of SF1 vs Winner of Qualifier (Court 3)
+            🏅 <b>SF1</b>: 1st vs 2nd ({kc["semifinal"]}) — winner → Grand Final<br>
+            💥 <b>SF2</b>: 3rd vs 4th ({kc["third_place"]}) — loser eliminated<br>
+            ⚔️ <b>Qualifier</b>: Loser of SF1 vs Winner of SF2 ({kc["qualifier"]}) — winner → Grand Final<br>
+            🏆 <b>Grand Final</b>: Winner of SF1 vs Winner of Qualifier ({kc["final"]})
             </div>""",unsafe_allow_html=True)
 
             if match_sf1 or match_sf2:
@@ -1099,7 +2106,7 @@ def page_admin(state):
                         st.markdown(f'<div class="match-complete"><div class="mc-label">🏆 Tournament Champion 🏆</div><div class="mc-winner">{w}</div><div style="font-size:36px;margin-top:10px">🏓🎉🏆</div></div>',unsafe_allow_html=True)
                         update_state(phase="completed")
 
-    with tabs[6]:
+    if sec==6:
         st.markdown('<div class="stitle">🚨 Disputes</div>',unsafe_allow_html=True)
         # Open disputes first
         disputes=get_open_disputes()
@@ -1115,6 +2122,8 @@ def page_admin(state):
                     f'<div style="font-size:12px;color:#b45309">Score: {match.get("score_team1",0)}—{match.get("score_team2",0)}</div></div>',
                     unsafe_allow_html=True
                 )
+                tail=get_point_log(match["id"],last=5) if match.get("id") else []
+                if tail: st.caption("Last points: "+" → ".join(f'{p["t1"]}—{p["t2"]}' for p in tail))
                 c1,c2=st.columns(2)
                 with c1:
                     if st.button("✅ Keep score",key=f"res_{d['id']}"): resolve_dispute(d["id"],match.get("id"),undo=False); st.rerun()
@@ -1134,7 +2143,7 @@ def page_admin(state):
                         unsafe_allow_html=True
                     )
 
-    with tabs[7]:
+    if sec==7:
         st.markdown('<div class="stitle">🏅 Awards & Nominations</div>',unsafe_allow_html=True)
         revealed=get_revealed()
         col_rev,_=st.columns([2,3])
@@ -1157,7 +2166,7 @@ def page_admin(state):
                 unsafe_allow_html=True
             )
             if counts:
-                for tn,cnt in sorted(counts.items(),key=lambda x:-x[1]):
+                for tn,cnt in r["ranked"]:
                     pct=int(cnt/total_votes*100) if total_votes else 0
                     bar_w=max(pct,2)
                     st.markdown(
@@ -1172,15 +2181,198 @@ def page_admin(state):
                 st.markdown(f'<div class="award-winner-box"><div style="font-size:11px;font-weight:700;color:#92400e;letter-spacing:2px;text-transform:uppercase;margin-bottom:4px">🏅 WINNER</div><div class="award-winner-name">🏆 {winner}</div></div>',unsafe_allow_html=True)
             st.markdown("</div>",unsafe_allow_html=True)
 
-    with tabs[8]:
+    if sec==8:
         st.markdown('<div class="stitle">📜 Match History</div>',unsafe_allow_html=True)
         history=get_match_history()
         st.caption(f"{len(history)} matches completed")
         render_history_tiles(history)
 
+    if sec==9:
+        st.markdown('<div class="stitle">⏱️ Performance</div>',unsafe_allow_html=True)
+        snap=profiler().snapshot(); rows=snap["helpers"]
+        st.caption(f"Since {time.strftime('%H:%M:%S',time.localtime(snap['since']))} · this server process · "
+                   f"percentiles over the last {PROFILE_SAMPLES} calls · 🐢 p95 over {PROFILE_SLOW_MS} ms")
+        slow=[r for r in rows if r["p95_ms"]>PROFILE_SLOW_MS]
+        if slow: st.warning("🐢 "+" · ".join(f"**{r['helper']}** ({r['page']} {r['section']}) p95 {r['p95_ms']:.0f} ms" for r in slow[:5]))
+        pages=sorted({r["page"] for r in rows})
+        pick=st.multiselect("Pages",pages,default=pages,key="perf_pages")
+        st.dataframe([{"":"🐢" if r["p95_ms"]>PROFILE_SLOW_MS else "",**r} for r in rows if r["page"] in pick],
+                     use_container_width=True,hide_index=True)
+        st.markdown("**Recent runs**")
+        st.dataframe([{"time":time.strftime("%H:%M:%S",time.localtime(r["at"])),"page":r["page"],"section":r["section"],
+                       "ms":r["ms"],"helper calls":sum(h["calls"] for h in r["helpers"].values()),
+                       "requests":sum(h["requests"] for h in r["helpers"].values()),
+                       "KiB":round(sum(h["bytes"] for h in r["helpers"].values())/1024,1),
+                       "slowest":max(r["helpers"],key=lambda n: r["helpers"][n]["ms"],default="")}
+                      for r in reversed(snap["runs"])],use_container_width=True,hide_index=True)
+        c1,c2,c3=st.columns(3)
+        with c1: st.download_button("⬇️ JSON",json.dumps(snap,indent=1),"profile.json","application/json",use_container_width=True)
+        with c2: st.download_button("⬇️ OpenMetrics",profile_openmetrics(snap),"profile.txt",
+                                    "application/openmetrics-text; version=1.0.0; charset=utf-8",use_container_width=True)
+        with c3:
+            if st.button("🧹 Reset counters",use_container_width=True,key="perf_reset"): profiler().reset(); st.rerun()
+
 # ── REFEREE ───────────────────────────────────────────────────────────────────
+_REF_LIVE_BANNER='<div style="text-align:center;padding:7px;background:#fee2e2;border:1px solid #fecaca;border-radius:8px;margin-bottom:14px"><span style="color:#dc2626;font-weight:700;font-size:12px;letter-spacing:2px">● LIVE MATCH</span></div>'
+
+def _ref_header(t1, t2, s1, s2, status):
+    # Score boxes — always horizontal (flex row) on all screen sizes
+    label="FINAL" if status=="completed" else ("LIVE" if status=="live" else "READY")
+    color_label="#ef4444" if status=="live" else "#94a3b8"
+    st.markdown(
+        f'<div class="ref-score-row">'
+        f'<div class="sbox" style="flex:1">'
+        f'<div class="sbox-name">{t1.get("name","Team 1")}</div>'
+        f'<div class="sbox-num score-red">{s1}</div>'
+        f'</div>'
+        f'<div class="ref-score-sep">'
+        f'<div style="font-size:13px;font-weight:900;color:{color_label};white-space:nowrap">{label}</div>'
+        f'<div style="font-size:9px;font-weight:700;color:#e2e8f0;margin-top:4px;letter-spacing:1px">TO 15</div>'
+        f'</div>'
+        f'<div class="sbox" style="flex:1">'
+        f'<div class="sbox-name">{t2.get("name","Team 2")}</div>'
+        f'<div class="sbox-num score-blue">{s2}</div>'
+        f'</div>'
+        f'</div>',
+        unsafe_allow_html=True
+    )
+    st.markdown("<br>",unsafe_allow_html=True)
+
+def _ref_local(match, t0):
+    """The session's live score {mid, s1, s2, hist}. The DB row replaces it only when
+    they differ and none of our writes is queued or landed after this run began (t0)."""
+    mid=match["id"]; srv=(match.get("score_team1",0),match.get("score_team2",0))
+    loc=st.session_state.get("ref_score"); w=ref_journal()
+    if loc is None or loc["mid"]!=mid or \
+       ((loc["s1"],loc["s2"])!=srv and not w.pending(mid) and w.last_done(mid)<t0):
+        loc=st.session_state["ref_score"]={"mid":mid,"s1":srv[0],"s2":srv[1],"hist":[]}
+    return loc
+
+# Journal kind → handler, re-bound every referee run (see _RefJournal.bind)
+_JOURNAL_OPS = {"points":apply_points,"moment":add_moment,"dispute":flag_dispute,"end":finish_match}
+
+def _ref_point(mid, team):
+    loc=st.session_state["ref_score"]; st.session_state[f"undone_{mid}"]=False
+    if optimistic_scoring():
+        loc[f"s{team}"]+=1; loc["hist"].append(team)
+        ref_journal().submit(mid,"point",{"team":team},(loc["s1"],loc["s2"]))
+    else:
+        loc["s1"],loc["s2"]=apply_points(mid,[(uuid.uuid4().hex,"point",{"team":team})]); loc["hist"].append(team)
+
+def _ref_undo(mid):
+    loc=st.session_state["ref_score"]; st.session_state[f"undone_{mid}"]=True
+    if optimistic_scoring() and loc["hist"]:
+        t=loc["hist"].pop(); loc[f"s{t}"]-=1
+        ref_journal().submit(mid,"undo",{"team":t},(loc["s1"],loc["s2"]))
+    else:   # synchronous, or the point predates this session — only the server knows whose it was
+        ref_journal().flush(mid)
+        loc["s1"],loc["s2"]=apply_points(mid,[(uuid.uuid4().hex,"undo",{"team":loc["hist"][-1]} if loc["hist"] else {})])
+        if loc["hist"]: loc["hist"].pop()
+
+def _ref_moment(mid, mtype, team_id, score_str):
+    ref_journal().submit(mid,"moment",{"mtype":mtype,"team_id":team_id,"score_str":score_str})
+    st.toast("🎯 Moment tagged")
+
+@st.fragment(run_every=LIVE_CHECK_S)
+def _ref_syncing(mid):
+    """Shown while an End Game is still in the journal (database unreachable); reloads once sent."""
+    w=ref_journal(); n=w.pending(mid); err=w.error.get(mid)
+    if not n: st.rerun()
+    st.warning(f"🔒 Match locked — {n} action{'s' if n>1 else ''} queued on the server, waiting for the database."
+               + (f" Last error: {err}" if err else ""))
+
+@st.fragment(run_every=LIVE_CHECK_S)
+def _ref_waiting(court_id):
+    """Shown while every remaining group match has a team on another court; reloads once one is ready."""
+    _invalidate("matches")
+    if ready_queue(court_id): st.rerun()
+    st.info("⏳ Every remaining match has a team on court right now — the next one appears here as soon as a court frees up.")
+
+@st.fragment(run_every=LIVE_CHECK_S)
+def _ref_scoring_panel(match, t1, t2):
+    """Live scoring console. A tap runs its callback and reruns only this fragment from
+    the session's local score — no query before the new number shows."""
+    mid=match["id"]; w=ref_journal()
+    if w.take_conflict(mid) is not None:
+        st.session_state.pop("ref_score",None); st.session_state["ref_resynced"]=w.error.pop(mid,None) or True; st.rerun()
+    loc=st.session_state["ref_score"]; s1=loc["s1"]; s2=loc["s2"]
+    _ref_header(t1,t2,s1,s2,"live")
+    st.markdown(_REF_LIVE_BANNER,unsafe_allow_html=True)
+
+    undo_key=f"undone_{mid}"
+    already_undone=st.session_state.get(undo_key,False)
+    t1name=t1.get("name","Team 1"); t2name=t2.get("name","Team 2")
+    reached15 = s1>=15 or s2>=15
+    winner_name_now = t1name if s1>s2 else t2name
+
+    # ── Side-by-side score display (HTML flex — always horizontal) ──
+    # Red box for T1, blue box for T2 — winner gets green border
+    t1_border='#16a34a' if s1>=15 else '#dc2626'
+    t2_border='#16a34a' if s2>=15 else '#1d4ed8'
+    t1_bord_w='4px' if s1>=15 else '2px'
+    t2_bord_w='4px' if s2>=15 else '2px'
+    st.markdown(
+        f'<div class="ref-score-row">'
+        f'<div style="flex:1;background:#fff5f5;border:{t1_bord_w} solid {t1_border};border-top:4px solid #dc2626;border-radius:14px;padding:14px 10px;text-align:center;box-shadow:0 2px 8px rgba(220,38,38,.12)">'
+        f'<div style="font-size:11px;font-weight:700;color:#dc2626;letter-spacing:1px;text-transform:uppercase;margin-bottom:4px">{t1name}</div>'
+        f'<div style="font-family:Inter,sans-serif;font-size:72px;font-weight:900;line-height:1;color:#dc2626">{s1}{" 🏆" if s1>=15 else ""}</div></div>'
+        f'<div class="ref-score-sep"><div style="font-size:13px;font-weight:900;color:#ef4444">●</div>'
+        f'<div style="font-size:9px;color:#94a3b8;margin-top:2px;letter-spacing:1px">TO 15</div></div>'
+        f'<div style="flex:1;background:#eff6ff;border:{t2_bord_w} solid {t2_border};border-top:4px solid #1d4ed8;border-radius:14px;padding:14px 10px;text-align:center;box-shadow:0 2px 8px rgba(29,78,216,.12)">'
+        f'<div style="font-size:11px;font-weight:700;color:#1d4ed8;letter-spacing:1px;text-transform:uppercase;margin-bottom:4px">{t2name}</div>'
+        f'<div style="font-family:Inter,sans-serif;font-size:72px;font-weight:900;line-height:1;color:#1d4ed8">{s2}{" 🏆" if s2>=15 else ""}</div></div>'
+        f'</div>',
+        unsafe_allow_html=True
+    )
+
+    if reached15:
+        # 15 reached — show game-point banner + End Game button
+        st.markdown(
+            f'<div style="background:linear-gradient(135deg,#14532d,#16a34a);color:#fff;border-radius:12px;'
+            f'padding:16px;text-align:center;margin:10px 0">'
+            f'<div style="font-size:11px;font-weight:700;letter-spacing:3px;color:#bbf7d0;text-transform:uppercase">Game Point!</div>'
+            f'<div style="font-family:Inter,sans-serif;font-size:22px;font-weight:900;margin-top:4px">🏆 {winner_name_now} — {max(s1,s2)} : {min(s1,s2)}</div>'
+            f'<div style="font-size:12px;color:rgba(255,255,255,.8);margin-top:6px">Undo if needed, then click End Game to lock score.</div>'
+            f'</div>',
+            unsafe_allow_html=True
+        )
+        eg_col,undo_col2=st.columns([2,1])
+        with eg_col:
+            if st.button("🔒 End Game — Lock Score",type="primary",use_container_width=True,key="endgame"):
+                # Queued behind the points it locks; with the database down, the page shows it as syncing
+                w.submit(mid,"end",{})
+                if w.flush(mid) and w.take_conflict(mid) is not None:
+                    st.session_state["ref_resynced"]=w.error.pop(mid,None) or True
+                else: st.session_state["celebrate"]=winner_name_now
+                st.session_state.pop("ref_score",None); st.rerun()
+        with undo_col2:
+            st.button("↩️ Undo",use_container_width=True,key="undo_at15",
+                      disabled=s1+s2==0 or already_undone,on_click=_ref_undo,args=(mid,))
+    else:
+        # Normal scoring
+        st.markdown('<p style="text-align:center;font-size:12px;color:#64748b;font-weight:600;letter-spacing:1.2px;margin:8px 0 6px">TAP BUTTON TO ADD A POINT</p>',unsafe_allow_html=True)
+        sc1,sc2=st.columns(2)
+        with sc1: st.button(f"+ Point for {t1name}",type="primary",use_container_width=True,key="pt1",on_click=_ref_point,args=(mid,1))
+        with sc2: st.button(f"+ Point for {t2name}",type="secondary",use_container_width=True,key="pt2",on_click=_ref_point,args=(mid,2))
+        undo_col,_=st.columns([1,2])
+        with undo_col:
+            st.button("↩️ Undo last point",use_container_width=True,key="undo_pt",
+                      disabled=s1+s2==0 or already_undone,on_click=_ref_undo,args=(mid,))
+    if already_undone: st.caption("↩️ Undo used — score a point to re-enable")
+    n=w.pending(mid); err=w.error.get(mid)
+    if n and err: st.warning(f"📴 Database unreachable — {n} action{'s' if n>1 else ''} queued on the server, sent automatically once it is back. ({err})")
+    elif n: st.caption(f"⏳ {n} change{'s' if n>1 else ''} syncing…")
+
+    st.markdown("<br>",unsafe_allow_html=True)
+    pc1,pc2=st.columns(2)
+    with pc1: st.markdown(f"**{t1name}** — {s1}/15"); st.progress(min(s1/15,1.0))
+    with pc2: st.markdown(f"**{t2name}** — {s2}/15"); st.progress(min(s2/15,1.0))
+
 def page_referee(user):
     st.markdown(f'<div class="stitle">🎯 Referee — {user["name"]}</div>',unsafe_allow_html=True)
+    _RUN["tag"]=("page_referee","")
+    t0=time.monotonic()   # writes landing after this can't be in the rows read below
+    ref_journal().bind(_JOURNAL_OPS)
     court=get_referee_court(user["id"])
     if court is None: st.warning("Not assigned to a court yet."); return
 
@@ -1192,22 +2384,25 @@ def page_referee(user):
     )
 
     # All court matches — history
-    all_court_m=get_court_matches(court["id"])
+    all_court_m=get_court_matches(court["id"],"with_players")
     if all_court_m:
         with st.expander(f"📋 All {len(all_court_m)} matches on {court['name']}",expanded=False):
             for cm in all_court_m: render_match_row(cm)
 
     match=get_referee_active_match(court["id"])
-    if match is None: st.success(f"✅ All matches on {court['name']} complete!"); return
+    if match is None:
+        if dynamic_dispatch() and any(m["stage"]=="group" and m["status"]=="pending" for m in get_matches()):
+            _ref_waiting(court["id"]); return
+        st.success(f"✅ All matches on {court['name']} complete!"); return
+    if st.session_state.pop("ref_claim_lost",False):
+        st.warning("↪️ That match was just started on another court — this is your next one.")
 
     t1=match.get("team1") or {}; t2=match.get("team2") or {}
     status=match.get("status","pending")
     s1=match.get("score_team1",0); s2=match.get("score_team2",0)
-    history=match.get("score_history") or []
-    if isinstance(history,str): history=json.loads(history) if history else []
 
     # Check for open dispute — freeze scoring if yes
-    open_dispute=get_referee_open_dispute(court["id"])
+    open_dispute=get_referee_open_dispute(court["id"]) or ref_journal().pending_op(match["id"],"dispute")
 
     stage_map={"group":"Group Stage","semifinal":"Semifinal","third_place":"3rd Place","final":"Grand Final"}
     st.markdown(
@@ -1216,28 +2411,39 @@ def page_referee(user):
         unsafe_allow_html=True
     )
 
-    # Score boxes — always horizontal (flex row) on all screen sizes
-    label="FINAL" if status=="completed" else ("LIVE" if status=="live" else "READY")
-    color_label="#ef4444" if status=="live" else "#94a3b8"
-    st.markdown(
-        f'<div class="ref-score-row">'
-        f'<div class="sbox" style="flex:1">'
-        f'<div class="sbox-name">{t1.get("name","Team 1")}</div>'
-        f'<div class="sbox-num score-red">{s1}</div>'
-        f'</div>'
-        f'<div class="ref-score-sep">'
-        f'<div style="font-size:13px;font-weight:900;color:{color_label};white-space:nowrap">{label}</div>'
-        f'<div style="font-size:9px;font-weight:700;color:#e2e8f0;margin-top:4px;letter-spacing:1px">TO 15</div>'
-        f'</div>'
-        f'<div class="sbox" style="flex:1">'
-        f'<div class="sbox-name">{t2.get("name","Team 2")}</div>'
-        f'<div class="sbox-num score-blue">{s2}</div>'
-        f'</div>'
-        f'</div>',
-        unsafe_allow_html=True
-    )
+    if status=="live" and ref_journal().pending_op(match["id"],"end") is not None:
+        _ref_header(t1,t2,s1,s2,status); _ref_syncing(match["id"]); return
 
-    st.markdown("<br>",unsafe_allow_html=True)
+    if status=="live" and not open_dispute:
+        loc=_ref_local(match,t0)
+        why=st.session_state.pop("ref_resynced",False)
+        if why: st.warning("🔄 Score resynced from the server — it was changed elsewhere or a write failed."
+                           +(f" Rejected: {why}" if why is not True else ""))
+        _ref_scoring_panel(match,t1,t2)
+
+        # Celebration fires after End Game
+        if st.session_state.get("celebrate"):
+            _winner=st.session_state.pop("celebrate")
+            show_win_celebration(_winner)
+
+        st.markdown("---")
+        st.markdown("**🎯 Tag a Moment**")
+        score_str=f"{loc['s1']}—{loc['s2']}"
+        t1n=t1.get("name","T1"); t2n=t2.get("name","T2")
+        # Row 1: Shot buttons
+        mg1,mg2=st.columns(2)
+        with mg1:
+            if st.button(f"🎯 Shot: {t1n}",use_container_width=True,key="gs1"): _ref_moment(match["id"],"good_shot",t1.get("id"),score_str)
+        with mg2:
+            if st.button(f"🎯 Shot: {t2n}",use_container_width=True,key="gs2"): _ref_moment(match["id"],"good_shot",t2.get("id"),score_str)
+        # Row 2: Rally/Comeback
+        mg3,mg4=st.columns(2)
+        with mg3:
+            if st.button("🔥 Great Rally",use_container_width=True,key="gr"): _ref_moment(match["id"],"great_rally",None,score_str)
+        with mg4:
+            if st.button("⚡ Comeback",use_container_width=True,key="cc"): _ref_moment(match["id"],"crazy_comeback",None,score_str)
+    else:
+        _ref_header(t1,t2,s1,s2,status)
 
     if status=="completed":
         w=match.get("winner") or {}
@@ -1264,15 +2470,16 @@ def page_referee(user):
         if open_dispute:
             st.markdown(f'<div class="frozen-banner"><div class="frozen-title">🚨 Dispute Pending</div><div>Admin must resolve the dispute before this match can start.</div></div>',unsafe_allow_html=True)
         else:
+            if match["court_id"]!=court["id"]:
+                st.caption(f"↪️ Planned for another court — yours is free first, so it moves to {court['name']}.")
             if st.button("▶️ Start Match",type="primary",use_container_width=True):
-                start_match(match["id"]); st.rerun()
+                if not start_match(match["id"],court): st.session_state["ref_claim_lost"]=True
+                st.rerun()
         return
 
-    # LIVE
-    st.markdown('<div style="text-align:center;padding:7px;background:#fee2e2;border:1px solid #fecaca;border-radius:8px;margin-bottom:14px"><span style="color:#dc2626;font-weight:700;font-size:12px;letter-spacing:2px">● LIVE MATCH</span></div>',unsafe_allow_html=True)
-
     # FROZEN check — if open dispute, freeze scoring
     if open_dispute:
+        st.markdown(_REF_LIVE_BANNER,unsafe_allow_html=True)
         st.markdown(
             f'<div class="frozen-banner">'
             f'<div class="frozen-title">🚫 Scoring Frozen</div>'
@@ -1286,119 +2493,19 @@ def page_referee(user):
             st.warning("Waiting for admin to review and resolve this dispute.")
         return
 
-    undo_key=f"undone_{match['id']}"
-    already_undone=st.session_state.get(undo_key,False)
-    t1name=t1.get("name","Team 1"); t2name=t2.get("name","Team 2")
-    reached15 = s1>=15 or s2>=15
-    winner_id_now = match.get("winner_id") or (match.get("winner") or {}).get("id")
-    winner_name_now = t1name if winner_id_now==t1.get("id") else t2name
-
-    # ── Side-by-side score display (HTML flex — always horizontal) ──
-    sc_color1 = "#dc2626" if s1>=15 else "#dc2626"
-    sc_color2 = "#1d4ed8" if s2>=15 else "#1d4ed8"
-    # Red box for T1, blue box for T2 — winner gets green border
-    t1_bg='#fff5f5' if s1>0 or True else '#fff'
-    t2_bg='#eff6ff' if s2>0 or True else '#fff'
-    t1_border='#16a34a' if s1>=15 else '#dc2626'
-    t2_border='#16a34a' if s2>=15 else '#1d4ed8'
-    t1_bord_w='4px' if s1>=15 else '2px'
-    t2_bord_w='4px' if s2>=15 else '2px'
-    st.markdown(
-        f'<div class="ref-score-row">'
-        f'<div style="flex:1;background:{t1_bg};border:{t1_bord_w} solid {t1_border};border-top:4px solid #dc2626;border-radius:14px;padding:14px 10px;text-align:center;box-shadow:0 2px 8px rgba(220,38,38,.12)">'
-        f'<div style="font-size:11px;font-weight:700;color:#dc2626;letter-spacing:1px;text-transform:uppercase;margin-bottom:4px">{t1name}</div>'
-        f'<div style="font-family:Inter,sans-serif;font-size:72px;font-weight:900;line-height:1;color:#dc2626">{s1}{" 🏆" if s1>=15 else ""}</div></div>'
-        f'<div class="ref-score-sep"><div style="font-size:13px;font-weight:900;color:#ef4444">●</div>'
-        f'<div style="font-size:9px;color:#94a3b8;margin-top:2px;letter-spacing:1px">TO 15</div></div>'
-        f'<div style="flex:1;background:{t2_bg};border:{t2_bord_w} solid {t2_border};border-top:4px solid #1d4ed8;border-radius:14px;padding:14px 10px;text-align:center;box-shadow:0 2px 8px rgba(29,78,216,.12)">'
-        f'<div style="font-size:11px;font-weight:700;color:#1d4ed8;letter-spacing:1px;text-transform:uppercase;margin-bottom:4px">{t2name}</div>'
-        f'<div style="font-family:Inter,sans-serif;font-size:72px;font-weight:900;line-height:1;color:#1d4ed8">{s2}{" 🏆" if s2>=15 else ""}</div></div>'
-        f'</div>',
-        unsafe_allow_html=True
-    )
-
-    if reached15:
-        # 15 reached — show game-point banner + End Game button
-        st.markdown(
-            f'<div style="background:linear-gradient(135deg,#14532d,#16a34a);color:#fff;border-radius:12px;'
-            f'padding:16px;text-align:center;margin:10px 0">'
-            f'<div style="font-size:11px;font-weight:700;letter-spacing:3px;color:#bbf7d0;text-transform:uppercase">Game Point!</div>'
-            f'<div style="font-family:Inter,sans-serif;font-size:22px;font-weight:900;margin-top:4px">🏆 {winner_name_now} — {max(s1,s2)} : {min(s1,s2)}</div>'
-            f'<div style="font-size:12px;color:rgba(255,255,255,.8);margin-top:6px">Undo if needed, then click End Game to lock score.</div>'
-            f'</div>',
-            unsafe_allow_html=True
-        )
-        eg_col,undo_col2=st.columns([2,1])
-        with eg_col:
-            if st.button("🔒 End Game — Lock Score",type="primary",use_container_width=True,key="endgame"):
-                end_game(match["id"])
-                if match.get("stage")=="group" and check_group_done():
-                    update_state(group_stage_complete=True)
-                auto_advance_knockouts()
-                st.session_state["celebrate"]=winner_name_now
-                st.rerun()
-        with undo_col2:
-            if st.button("↩️ Undo",use_container_width=True,key="undo_at15",
-                         disabled=len(history)==0 or already_undone):
-                undo_score(match["id"],history); st.session_state[undo_key]=True; st.rerun()
-        if already_undone: st.caption("↩️ Undo used — score a point to re-enable")
-    else:
-        # Normal scoring
-        st.markdown('<p style="text-align:center;font-size:12px;color:#64748b;font-weight:600;letter-spacing:1.2px;margin:8px 0 6px">TAP BUTTON TO ADD A POINT</p>',unsafe_allow_html=True)
-        sc1,sc2=st.columns(2)
-        with sc1:
-            if st.button(f"+ Point for {t1name}",type="primary",use_container_width=True,key="pt1"):
-                st.session_state[undo_key]=False
-                add_score(match["id"],"score_team1",s1,s2,t1.get("id"),t2.get("id"),history); st.rerun()
-        with sc2:
-            if st.button(f"+ Point for {t2name}",type="secondary",use_container_width=True,key="pt2"):
-                st.session_state[undo_key]=False
-                add_score(match["id"],"score_team2",s1,s2,t1.get("id"),t2.get("id"),history); st.rerun()
-        undo_col,_=st.columns([1,2])
-        with undo_col:
-            if st.button("↩️ Undo last point",use_container_width=True,key="undo_pt",
-                         disabled=len(history)==0 or already_undone):
-                undo_score(match["id"],history); st.session_state[undo_key]=True; st.rerun()
-        if already_undone: st.caption("↩️ Undo used — score a point to re-enable")
-
-    # Celebration fires after End Game
-    if st.session_state.get("celebrate"):
-        _winner=st.session_state.pop("celebrate")
-        show_win_celebration(_winner)
-
-    st.markdown("<br>",unsafe_allow_html=True)
-    pc1,pc2=st.columns(2)
-    with pc1: st.markdown(f"**{t1.get('name')}** — {s1}/15"); st.progress(min(s1/15,1.0))
-    with pc2: st.markdown(f"**{t2.get('name')}** — {s2}/15"); st.progress(min(s2/15,1.0))
-
-    st.markdown("---")
-    st.markdown("**🎯 Tag a Moment**")
-    score_str=f"{s1}—{s2}"
-    t1n=t1.get("name","T1"); t2n=t2.get("name","T2")
-    # Row 1: Shot buttons
-    mg1,mg2=st.columns(2)
-    with mg1:
-        if st.button(f"🎯 Shot: {t1n}",use_container_width=True,key="gs1"): add_moment(match["id"],"good_shot",t1.get("id"),score_str); st.rerun()
-    with mg2:
-        if st.button(f"🎯 Shot: {t2n}",use_container_width=True,key="gs2"): add_moment(match["id"],"good_shot",t2.get("id"),score_str); st.rerun()
-    # Row 2: Rally/Comeback
-    mg3,mg4=st.columns(2)
-    with mg3:
-        if st.button("🔥 Great Rally",use_container_width=True,key="gr"): add_moment(match["id"],"great_rally",None,score_str); st.rerun()
-    with mg4:
-        if st.button("⚡ Comeback",use_container_width=True,key="cc"): add_moment(match["id"],"crazy_comeback",None,score_str); st.rerun()
-
     st.markdown("---")
 
     # Show current dispute status if any
-    cur_dispute=get_referee_open_dispute(court["id"])
+    cur_dispute=open_dispute
     if cur_dispute:
         st.markdown(f'<div class="dispute-box">⚠️ <strong>Active dispute flagged</strong> — awaiting admin resolution<br><small>Note: {cur_dispute.get("note","")}</small></div>',unsafe_allow_html=True)
     else:
         with st.expander("⚠️ Flag a Dispute"):
             note=st.text_input("Describe dispute",key="dispute_note",placeholder="e.g. ball landed out")
             if st.button("🚩 Flag to Admin",type="secondary"):
-                if note.strip(): flag_dispute(match["id"],user["id"],note.strip()); st.warning("⚠️ Flagged!"); st.rerun()
+                if note.strip():
+                    w=ref_journal(); w.submit(match["id"],"dispute",{"ref_id":user["id"],"note":note.strip()})
+                    w.flush(match["id"]); st.rerun()
                 else: st.error("Enter a note first.")
 
 # ── PLAYER ────────────────────────────────────────────────────────────────────
@@ -1410,7 +2517,7 @@ def page_player(user):
         if user["id"] in (p1.get("id"),p2.get("id")): my_team=t; break
 
     if my_team:
-        idx=next((i for i,n in enumerate(TEAM_NAMES) if n==my_team["name"]),0)
+        idx=next((i for i,n in enumerate(team_names(TEAM_COUNT)) if n==my_team["name"]),0)
         color=TEAM_COLORS[idx%len(TEAM_COLORS)]
         p1n=(my_team.get("p1") or {}).get("name","?"); p2n=(my_team.get("p2") or {}).get("name","?")
         st.markdown(
@@ -1421,26 +2528,26 @@ def page_player(user):
             unsafe_allow_html=True
         )
 
-    tabs=st.tabs(["🔴 Live","📅 Schedule","📅 My Matches","👥 All Teams","🏆 Standings","🏅 Awards","📜 History"])
+    sec=section_nav("player",["🔴 Live","📅 Schedule","📅 My Matches","👥 All Teams","🏆 Standings","🏅 Awards","📜 History"])
 
-    with tabs[0]:
+    if sec==0:
         st.markdown('<div class="stitle">🔴 Live Scores & Highlights</div>',unsafe_allow_html=True)
         render_live_scores_widget(auto_refresh=True)
 
-    with tabs[1]:
+    if sec==1:
         st.markdown('<div class="stitle">📅 Full Schedule</div>',unsafe_allow_html=True)
-        all_m=get_matches()
+        all_m=get_matches(proj="with_players")
         if not all_m: st.info("Schedule not generated yet.")
         else:
             done=sum(1 for m in all_m if m["status"]=="completed"); live=sum(1 for m in all_m if m["status"]=="live")
             c1,c2,c3=st.columns(3); c1.metric("Total",len(all_m)); c2.metric("Done",done); c3.metric("Live",live)
             st.markdown("---"); render_schedule_by_court(all_m)
 
-    with tabs[2]:
+    if sec==2:
         st.markdown('<div class="stitle">📅 My Matches</div>',unsafe_allow_html=True)
         if not my_team: st.info("Teams not assigned yet.")
         else:
-            all_m=get_matches()
+            all_m=get_matches(proj="with_players")
             my_m=sorted([m for m in all_m if (m.get("team1") or {}).get("id")==my_team["id"] or (m.get("team2") or {}).get("id")==my_team["id"]],key=lambda x:x["match_order"])
             if not my_m: st.info("Schedule not generated yet.")
             else:
@@ -1449,7 +2556,7 @@ def page_player(user):
                 played=sum(1 for m in my_m if m["status"]=="completed")
                 st.markdown(f"<br>**{won}W / {played-won}L** from {played} played · {len(my_m)-played} remaining",unsafe_allow_html=True)
 
-    with tabs[3]:
+    if sec==3:
         st.markdown('<div class="stitle">👥 All Teams</div>',unsafe_allow_html=True)
         all_teams=get_teams()
         if not all_teams:
@@ -1480,16 +2587,16 @@ def page_player(user):
             if my_team:
                 st.markdown(f"<br><small>🟢 Highlighted = your team (**{my_team['name']}**)</small>",unsafe_allow_html=True)
 
-    with tabs[4]:
+    if sec==4:
         st.markdown('<div class="stitle">🏆 Standings</div>',unsafe_allow_html=True)
         rows=get_leaderboard()
         if not rows: st.info("No data yet.")
         else: render_leaderboard(rows,my_team["name"] if my_team else None)
 
-    with tabs[5]:
+    if sec==5:
         st.markdown('<div class="stitle">🏅 Awards & Voting</div>',unsafe_allow_html=True)
         revealed=get_revealed()
-        # Awards gate: entire tournament (25 matches) must be complete
+        # Awards gate: entire tournament (round robin + bracket) must be complete
         tournament_done=is_tournament_complete()
         total_m,done_m=count_all_matches()
         if revealed:
@@ -1507,12 +2614,12 @@ def page_player(user):
                     st.markdown(f'<div class="award-winner-box"><div style="font-size:11px;font-weight:700;color:#92400e;letter-spacing:2px;text-transform:uppercase">🏅 WINNER</div><div class="award-winner-name">🏆 {winner}</div></div>',unsafe_allow_html=True)
                 st.markdown("</div>",unsafe_allow_html=True)
         elif not tournament_done:
-            remaining=total_m-done_m
+            total_m=max(total_m,planned_match_count()); remaining=total_m-done_m   # bracket rows don't exist yet
             st.markdown(
                 f'<div style="background:#fff7ed;border:1px solid #fed7aa;border-radius:12px;padding:20px;text-align:center;margin:12px 0">'
                 f'<div style="font-size:28px;margin-bottom:8px">🔒</div>'
                 f'<div style="font-size:16px;font-weight:800;color:#92400e;margin-bottom:6px">Voting Not Open Yet</div>'
-                f'<div style="font-size:14px;color:#b45309">Awards open after the full tournament (all 25 matches) is complete.</div>'
+                f'<div style="font-size:14px;color:#b45309">Awards open after the full tournament (all {total_m} matches) is complete.</div>'
                 f'<div style="font-size:13px;color:#64748b;margin-top:8px">{done_m}/{total_m} matches done · {remaining} remaining</div>'
                 f'</div>',
                 unsafe_allow_html=True
@@ -1556,73 +2663,87 @@ def page_player(user):
                                     else: st.error("Already voted or error.")
                         st.markdown("</div>",unsafe_allow_html=True)
 
-    with tabs[6]:
+    if sec==6:
         st.markdown('<div class="stitle">📜 Match History</div>',unsafe_allow_html=True)
         history=get_match_history()
         st.caption(f"{len(history)} matches completed")
         render_history_tiles(history)
 
 # ─── Init ─────────────────────────────────────────────────────────────────────
-if "user" not in st.session_state: st.session_state.user=None
+def main():
+    _RUN["tag"]=("main",""); t0=time.perf_counter()
+    if "user" not in st.session_state: st.session_state.user=None
 
-try:
-    _state=get_state(); _counts=count_by_role()
-    _phase=_state["phase"].replace("_"," ").title()
-except Exception as _e:
-    st.error(f"⚠️ Cannot connect to database. Error: {_e}"); st.stop()
+    try:
+        _state=get_state(); _counts=count_by_role()
+        _phase=_state["phase"].replace("_"," ").title()
+    except Exception as _e:
+        st.error(f"⚠️ Cannot connect to database. Error: {_e}"); st.stop()
+
+    with st.sidebar:
+        st.markdown("### 🏓 Serve & Smash")
+        st.markdown(
+            f'<div class="sb-stat"><span class="sb-lbl">Players</span><span class="sb-val">{_counts["player"]}/{LIMITS["player"]}</span></div>'
+            f'<div class="sb-stat"><span class="sb-lbl">Referees</span><span class="sb-val">{_counts["referee"]}/{LIMITS["referee"]}</span></div>'
+            f'<div class="sb-stat"><span class="sb-lbl">Admin</span><span class="sb-val">{_counts["admin"]}/{LIMITS["admin"]}</span></div>'
+            f'<div class="sb-stat"><span class="sb-lbl">Phase</span><span class="sb-val">{_phase}</span></div>',
+            unsafe_allow_html=True
+        )
+        st.markdown("---")
+        # QR Code for easy sharing
+        _app_url = "https://serveandsmashseries.streamlit.app"
+        try:
+            _req_url = st.context.headers.get("host","") if hasattr(st,"context") else ""
+            if _req_url and not _app_url: _app_url = f"https://{_req_url}"
+        except: pass
+        with st.expander("📱 Share App — QR Code",expanded=False):
+            components.html(f"""
+            <div style="text-align:center;padding:8px">
+            <script src="https://cdnjs.cloudflare.com/ajax/libs/qrcodejs/1.0.0/qrcode.min.js"></script>
+            <div id="qr" style="display:inline-block;margin:8px auto"></div>
+            <div style="font-size:11px;color:#64748b;margin-top:8px;word-break:break-all">{_app_url}</div>
+            <script>new QRCode(document.getElementById("qr"),{{text:"{_app_url}",width:180,height:180,colorDark:"#0f172a",colorLight:"#ffffff"}});</script>
+            </div>
+            """, height=240)
+        st.markdown("---")
+        if st.session_state.user:
+            u=st.session_state.user
+            icons={"player":"🏓","referee":"🎯","admin":"⚙️"}
+            st.success(f'{icons.get(u["role"],"👤")} **{u["name"]}** ({u["role"].title()})')
+            if st.button("Logout",use_container_width=True): st.session_state.user=None; st.rerun()
+        else: st.info("Sign up or log in below.")
 
-with st.sidebar:
-    st.markdown("### 🏓 Serve & Smash")
     st.markdown(
-        f'<div class="sb-stat"><span class="sb-lbl">Players</span><span class="sb-val">{_counts["player"]}/14</span></div>'
-        f'<div class="sb-stat"><span class="sb-lbl">Referees</span><span class="sb-val">{_counts["referee"]}/2</span></div>'
-        f'<div class="sb-stat"><span class="sb-lbl">Admin</span><span class="sb-val">{_counts["admin"]}/1</span></div>'
-        f'<div class="sb-stat"><span class="sb-lbl">Phase</span><span class="sb-val">{_phase}</span></div>',
-        unsafe_allow_html=True
+        f'<div class="hero"><div class="hero-icon">🏓</div><div>'
+        f'<div class="hero-title">Serve &amp; Smash</div>'
+        f'<div class="hero-sub">Pickleball Tournament Management System</div>'
+        f'<div class="phase-pill">{_phase}</div>'
+        f'</div></div>',unsafe_allow_html=True
     )
-    st.markdown("---")
-    # QR Code for easy sharing
-    _app_url = "https://serveandsmashseries.streamlit.app"
-    try:
-        _req_url = st.context.headers.get("host","") if hasattr(st,"context") else ""
-        if _req_url and not _app_url: _app_url = f"https://{_req_url}"
-    except: pass
-    with st.expander("📱 Share App — QR Code",expanded=False):
-        components.html(f"""
-        <div style="text-align:center;padding:8px">
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/qrcodejs/1.0.0/qrcode.min.js"></script>
-        <div id="qr" style="display:inline-block;margin:8px auto"></div>
-        <div style="font-size:11px;color:#64748b;margin-top:8px;word-break:break-all">{_app_url}</div>
-        <script>new QRCode(document.getElementById("qr"),{{text:"{_app_url}",width:180,height:180,colorDark:"#0f172a",colorLight:"#ffffff"}});</script>
-        </div>
-        """, height=240)
-    st.markdown("---")
-    if st.session_state.user:
-        u=st.session_state.user
-        icons={"player":"🏓","referee":"🎯","admin":"⚙️"}
-        st.success(f'{icons.get(u["role"],"👤")} **{u["name"]}** ({u["role"].title()})')
-        if st.button("Logout",use_container_width=True): st.session_state.user=None; st.rerun()
-    else: st.info("Sign up or log in below.")
-
-st.markdown(
-    f'<div class="hero"><div class="hero-icon">🏓</div><div>'
-    f'<div class="hero-title">Serve &amp; Smash</div>'
-    f'<div class="hero-sub">Pickleball Tournament Management System</div>'
-    f'<div class="phase-pill">{_phase}</div>'
-    f'</div></div>',unsafe_allow_html=True
-)
-
-user=st.session_state.user
-if user is None:
-    # ── Public spectator view — no login needed ──
-    page_spectator()
-    st.markdown("---")
-    st.markdown('<div style="text-align:center;font-size:12px;color:#94a3b8;margin-bottom:4px">Participants: Sign up or log in below</div>',unsafe_allow_html=True)
-    ta,tb=st.tabs(["📝 Sign Up","🔐 Login"])
-    with ta: page_signup(_state,_counts)
-    with tb: page_login()
-else:
-    role=user["role"]
-    if role=="admin": page_admin(_state)
-    elif role=="referee": page_referee(user)
-    elif role=="player": page_player(user)
+
+    user=st.session_state.user
+    if "reset_report" in st.session_state:
+        _rep=st.session_state.pop("reset_report")
+        st.success(f"✅ Tournament reset complete — {sum(_rep['counts'].values())} rows in {_rep['ms']} ms "
+                   f"(server), {_rep['total_ms']} ms round trip.")
+        with st.expander("Reset details"): st.table([{"table":k,"rows":v} for k,v in _rep["counts"].items()])
+    if user is None:
+        # ── Public spectator view — no login needed ──
+        page_spectator(); _RUN["run_tag"]=_RUN["tag"]
+        st.markdown("---")
+        st.markdown('<div style="text-align:center;font-size:12px;color:#94a3b8;margin-bottom:4px">Participants: Sign up or log in below</div>',unsafe_allow_html=True)
+        ta,tb=st.tabs(["📝 Sign Up","🔐 Login"])
+        _RUN["tag"]=("page_signup","")
+        with ta: page_signup(_state,_counts)
+        _RUN["tag"]=("page_login","")
+        with tb: page_login()
+    else:
+        role=user["role"]
+        if role=="admin": page_admin(_state)
+        elif role=="referee": page_referee(user)
+        elif role=="player": page_player(user)
+    record_section_cost()
+    profiler().end_run(_RUN.get("run_tag",_RUN["tag"]),_RUN.get("prof",{}),(time.perf_counter()-t0)*1000)
+
+# streamlit runs the script as __main__; `import app` (bench.py) only gets the helpers
+if __name__=="__main__": main()
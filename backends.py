@@ -0,0 +1,453 @@
+"""Local data backends for app.py — the Supabase client's query-builder subset
+(table/select/insert/update/delete, eq/neq/gt/gte/lt/lte/in_, order, limit,
+count="exact", head=True, embedded to-one joins with !fk and !inner hints,
+filters on embedded columns) and .rpc() for the functions in supabase/migrations,
+over an in-memory or a SQLite store. Errors carry PostgREST/Postgres codes so the
+app's fallbacks behave exactly as against a real project.
+
+    open_backend("memory")                    # fresh, seeded, per process
+    open_backend("sqlite:tournament.sqlite3") # durable, offline event mode
+
+Tables without a local implementation (award_tallies, match_cards) answer
+PGRST205, so the app reads its Python fallback, as before the migration.
+"""
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+
+class APIError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message); self.code=code; self.message=message
+
+# ─── Schema ───────────────────────────────────────────────────────────────────
+# cols: name → type (uuid|text|int|bool|ts); fks: col → (table, on_delete);
+# unique: (cols, condition) with condition (col, op, value) for a partial index.
+SCHEMA = {
+    "users": {"cols":{"id":"uuid","name":"text","mobile":"text","role":"text","password_hash":"text","created_at":"ts"},
+              "unique":[(("mobile",),None)]},
+    "teams": {"cols":{"id":"uuid","name":"text","player1_id":"uuid","player2_id":"uuid","created_at":"ts"},
+              "fks":{"player1_id":("users",None),"player2_id":("users",None)}},
+    "courts": {"cols":{"id":"uuid","name":"text","referee_id":"uuid","created_at":"ts"},
+               "fks":{"referee_id":("users","set null")}},
+    "matches": {"cols":{"id":"uuid","match_number":"int","match_order":"int","stage":"text","status":"text",
+                        "court_id":"uuid","referee_id":"uuid","team1_id":"uuid","team2_id":"uuid","winner_id":"uuid",
+                        "score_team1":"int","score_team2":"int","created_at":"ts"},
+                "fks":{"court_id":("courts",None),"referee_id":("users",None),"team1_id":("teams",None),
+                       "team2_id":("teams",None),"winner_id":("teams",None)},
+                "defaults":{"status":"pending","score_team1":0,"score_team2":0},
+                "unique":[(("stage",),("stage","neq","group"))]},
+    "match_points": {"cols":{"match_id":"uuid","seq":"int","team":"int","created_at":"ts"},"pk":("match_id","seq"),
+                     "fks":{"match_id":("matches","cascade")}},
+    "applied_ops": {"cols":{"op_key":"text","match_id":"uuid","applied_at":"ts"},"pk":("op_key",),
+                    "fks":{"match_id":("matches","cascade")}},
+    "match_moments": {"cols":{"id":"uuid","match_id":"uuid","moment_type":"text","team_id":"uuid",
+                              "score_at_time":"text","op_key":"text","created_at":"ts"},
+                      "fks":{"match_id":("matches",None),"team_id":("teams",None)},"unique":[(("op_key",),None)]},
+    "match_disputes": {"cols":{"id":"uuid","match_id":"uuid","referee_id":"uuid","note":"text","status":"text",
+                               "resolved_at":"ts","op_key":"text","created_at":"ts"},
+                       "fks":{"match_id":("matches",None),"referee_id":("users",None)},
+                       "defaults":{"status":"open"},"unique":[(("op_key",),None)]},
+    "award_categories": {"cols":{"id":"uuid","name":"text","emoji":"text","description":"text","created_at":"ts"}},
+    "award_votes": {"cols":{"id":"uuid","voter_id":"uuid","category_id":"uuid","voted_team_id":"uuid","created_at":"ts"},
+                    "fks":{"voter_id":("users",None),"category_id":("award_categories",None),"voted_team_id":("teams",None)},
+                    "unique":[(("voter_id","category_id"),None)]},
+    "award_results_revealed": {"cols":{"id":"int","revealed":"bool"},"defaults":{"revealed":False}},
+    "tournament_state": {"cols":{"id":"int","phase":"text","signups_frozen":"bool","teams_assigned":"bool",
+                                 "schedule_generated":"bool","group_stage_complete":"bool","semifinals_complete":"bool"},
+                         "defaults":{"phase":"signup","signups_frozen":False,"teams_assigned":False,"schedule_generated":False,
+                                     "group_stage_complete":False,"semifinals_complete":False}},
+}
+
+SEED = {   # rows the hosted project ships with; a reset keeps them
+    "courts": [{"name":"Court 2"},{"name":"Court 3"}],
+    "award_categories": [
+        {"name":"Best Team Spirit","emoji":"🤝","description":"Most fun to play against"},
+        {"name":"Shot of the Tournament","emoji":"🎯","description":"The one everyone is still talking about"},
+        {"name":"Comeback Kings","emoji":"⚡","description":"Never out of a game"},
+    ],
+    "award_results_revealed": [{"id":1}],
+    "tournament_state": [{"id":1}],
+}
+
+def _pk(table):
+    return SCHEMA[table].get("pk",("id",))
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+_OPS = {"eq":lambda a,b: a==b, "neq":lambda a,b: a!=b,
+        "gt":lambda a,b: a is not None and a>b, "gte":lambda a,b: a is not None and a>=b,
+        "lt":lambda a,b: a is not None and a<b, "lte":lambda a,b: a is not None and a<=b,
+        "in":lambda a,b: a in b, "is":lambda a,b: a is b}
+
+def _match(row, where):
+    return all(_OPS[op](row.get(c),v) for c,op,v in where)
+
+# ─── Stores: rows keyed by primary key ────────────────────────────────────────
+class _MemoryStore:
+    def __init__(self):
+        self.t={name:{} for name in SCHEMA}
+        # value → primary keys for the leading column of each unique constraint
+        self.ix={name:{cols[0]:{} for cols,_ in spec.get("unique",[])} for name,spec in SCHEMA.items()}
+    def _index(self, table, key, row, add):
+        for col,ix in self.ix[table].items():
+            if row.get(col) is None: continue
+            keys=ix.setdefault(row[col],set())
+            if add: keys.add(key)
+            else: keys.discard(key)
+    def scan(self, table, where):
+        return [dict(r) for r in self.t[table].values() if _match(r,where)]
+    def lookup(self, table, col, vals):
+        """Rows whose indexed col is in vals, in no particular order (uniqueness checks)."""
+        ix=self.ix[table][col]; rows=self.t[table]
+        return [dict(rows[k]) for v in vals for k in ix.get(v,())]
+    def has(self, table, key):
+        return key in self.t[table]
+    def insert(self, table, rows):
+        for r in rows:
+            key=tuple(r[k] for k in _pk(table)); self.t[table][key]=dict(r); self._index(table,key,r,True)
+    def update(self, table, keys, payload):
+        reindex=any(c in self.ix[table] for c in payload)
+        for k in keys:
+            if reindex: self._index(table,k,self.t[table][k],False)
+            self.t[table][k].update(payload)
+            if reindex: self._index(table,k,self.t[table][k],True)
+    def delete(self, table, keys):
+        for k in keys:
+            r=self.t[table].pop(k,None)
+            if r is not None: self._index(table,k,r,False)
+    def begin(self): pass
+    def commit(self): pass
+    def rollback(self): pass
+
+class _SqliteStore:
+    _SQL = {"uuid":"text","text":"text","ts":"text","int":"integer","bool":"integer"}
+    _CMP = {"eq":"=","neq":"<>","gt":">","gte":">=","lt":"<","lte":"<="}
+    def __init__(self, path):
+        self.db=sqlite3.connect(path,check_same_thread=False,isolation_level=None)
+        self.db.execute("pragma journal_mode=wal")
+        for name,spec in SCHEMA.items():
+            cols=", ".join(f'"{c}" {self._SQL[t]}' for c,t in spec["cols"].items())
+            self.db.execute(f'create table if not exists "{name}" ({cols}, primary key ({",".join(_pk(name))}))')
+            for c in {u[0] for u,_ in spec.get("unique",[])}:   # lookup() for uniqueness checks
+                self.db.execute(f'create index if not exists "{name}_{c}_idx" on "{name}" ("{c}")')
+    def _where(self, where):
+        sql=[]; args=[]
+        for c,op,v in where:
+            if op=="in":
+                sql.append(f'"{c}" in ({",".join("?"*len(v))})' if v else "0"); args+=list(v)
+            elif v is None: sql.append(f'"{c}" is {"not " if op=="neq" else ""}null')
+            elif op=="is": sql.append(f'"{c}" is ?'); args.append(v)
+            else: sql.append(f'"{c}" {self._CMP[op]} ?'); args.append(v)
+        return (" where "+" and ".join(sql) if sql else ""), args
+    def _row(self, table, cur, tup):
+        types=SCHEMA[table]["cols"]
+        return {d[0]:(bool(v) if types[d[0]]=="bool" and v is not None else v) for d,v in zip(cur.description,tup)}
+    def scan(self, table, where):
+        w,args=self._where(where)
+        cur=self.db.execute(f'select * from "{table}"{w} order by rowid',args)
+        return [self._row(table,cur,t) for t in cur.fetchall()]
+    def lookup(self, table, col, vals):
+        return self.scan(table,[(col,"in",list(vals))])
+    def has(self, table, key):
+        w,args=self._keys(table,[key])
+        return self.db.execute(f'select 1 from "{table}" where {w} limit 1',args).fetchone() is not None
+    def insert(self, table, rows):
+        for r in rows:
+            cols=",".join(f'"{c}"' for c in r)
+            self.db.execute(f'insert into "{table}" ({cols}) values ({",".join("?"*len(r))})',list(r.values()))
+    def _keys(self, table, keys):
+        pk=_pk(table)
+        return " or ".join("("+" and ".join(f'"{c}"=?' for c in pk)+")" for _ in keys), [v for k in keys for v in k]
+    def update(self, table, keys, payload):
+        if not keys or not payload: return
+        w,args=self._keys(table,keys); sets=",".join(f'"{c}"=?' for c in payload)
+        self.db.execute(f'update "{table}" set {sets} where {w}',list(payload.values())+args)
+    def delete(self, table, keys):
+        if not keys: return
+        w,args=self._keys(table,keys)
+        self.db.execute(f'delete from "{table}" where {w}',args)
+    def begin(self): self.db.execute("begin immediate")
+    def commit(self): self.db.execute("commit")
+    def rollback(self): self.db.execute("rollback")
+
+# ─── Select parsing ───────────────────────────────────────────────────────────
+_EMBED = re.compile(r"^(?:(\w+):)?(\w+)((?:!\w+)*)\((.*)\)$",re.S)
+
+def _split(s):
+    out=[]; depth=0; cur=""
+    for ch in s:
+        if ch=="," and depth==0: out.append(cur.strip()); cur=""; continue
+        depth+=(ch=="(")-(ch==")"); cur+=ch
+    if cur.strip(): out.append(cur.strip())
+    return out
+
+def _parse(table, cols):
+    """select string → [("col", name) | ("embed", alias, target, fk col, inner, sub)]"""
+    items=[]
+    for it in _split(cols or "*"):
+        m=_EMBED.match(it)
+        if not m:
+            if it!="*" and it not in SCHEMA[table]["cols"]: raise APIError("42703",f"column {table}.{it} does not exist")
+            items.append(("col",it)); continue
+        alias,target,hints,sub=m.groups()
+        hints=[h for h in hints.split("!") if h]; inner="inner" in hints
+        fk=[h for h in hints if h!="inner"]
+        if target not in SCHEMA: raise APIError("PGRST200",f"Could not find a relationship between '{table}' and '{target}'")
+        cands=[c for c,(t,_) in SCHEMA[table].get("fks",{}).items()
+               if t==target and (not fk or fk[0]==f"{table}_{c}_fkey")]
+        if len(cands)!=1:
+            raise APIError("PGRST201" if cands else "PGRST200",
+                           f"Could not embed '{target}' from '{table}': {len(cands)} relationships match")
+        items.append(("embed",alias or target,target,cands[0],inner,_parse(target,sub)))
+    return items
+
+# ─── Backend ──────────────────────────────────────────────────────────────────
+class _Result:
+    def __init__(self, data, count=None):
+        self.data=data; self.count=count
+
+class _Query:
+    def __init__(self, backend, table):
+        self.b=backend; self.table=table; self.op="select"; self.cols="*"; self.payload=None
+        self.where=[]; self.orders=[]; self.lim=None; self.count=None; self.head=False; self.returning="representation"
+    def select(self, *cols, count=None, head=False):
+        self.cols=",".join(cols) or "*"; self.count=count; self.head=head; return self
+    def insert(self, rows, count=None, returning="representation", **_):
+        self.op="insert"; self.payload=rows if isinstance(rows,list) else [rows]
+        self.count=count; self.returning=str(getattr(returning,"value",returning)); return self
+    def update(self, payload, count=None, returning="representation"):
+        self.op="update"; self.payload=payload; self.count=count
+        self.returning=str(getattr(returning,"value",returning)); return self
+    def delete(self, count=None, returning="representation"):
+        self.op="delete"; self.count=count; self.returning=str(getattr(returning,"value",returning)); return self
+    def _f(self, col, op, val):
+        self.where.append((col,op,val)); return self
+    def eq(self, col, val): return self._f(col,"eq",val)
+    def neq(self, col, val): return self._f(col,"neq",val)
+    def gt(self, col, val): return self._f(col,"gt",val)
+    def gte(self, col, val): return self._f(col,"gte",val)
+    def lt(self, col, val): return self._f(col,"lt",val)
+    def lte(self, col, val): return self._f(col,"lte",val)
+    def in_(self, col, vals): return self._f(col,"in",list(vals))
+    def is_(self, col, val): return self._f(col,"is",None if val in (None,"null") else val)
+    def order(self, col, desc=False, **_):
+        self.orders.append((col,desc)); return self
+    def limit(self, n, **_):
+        self.lim=n; return self
+    def execute(self):
+        return self.b._execute(self)
+
+class _Rpc:
+    def __init__(self, backend, name, params):
+        self.b=backend; self.name=name; self.params=params or {}
+    def execute(self):
+        fn=getattr(self.b,f"_rpc_{self.name}",None)
+        if fn is None: raise APIError("PGRST202",f"Could not find the function public.{self.name} in the schema cache")
+        with self.b.lock:
+            self.b.store.begin()
+            try: data=fn(**self.params)
+            except Exception: self.b.store.rollback(); raise
+            self.b.store.commit()
+        return self.b._seen(f"rpc:{self.name}",_Result(data))
+
+class LocalBackend:
+    """One shared store for every session in the process. A lock makes each request
+    (and each RPC, which also runs in one store transaction) atomic. Also quacks like
+    app._ClientPool: acquire() returns itself, reset() is a no-op."""
+    def __init__(self, store):
+        self.store=store; self.lock=threading.RLock()
+        self.observer=None   # observer(table, rows, bytes) after every request, as app._ClientPool reports
+        with self.lock:
+            for table,rows in SEED.items():
+                if not self.store.scan(table,[]): self._insert(table,rows)
+    def acquire(self): return self
+    def reset(self): pass
+    def table(self, name):
+        if name not in SCHEMA: raise APIError("PGRST205",f"Could not find the table 'public.{name}' in the schema cache")
+        return _Query(self,name)
+    def rpc(self, name, params=None):
+        return _Rpc(self,name,params)
+
+    # ── execution ──
+    def _seen(self, table, res):
+        """Report the result to the observer; bytes are its JSON size, as PostgREST would send it."""
+        if self.observer:
+            d=res.data
+            self.observer(table,len(d) if isinstance(d,list) else int(d is not None),
+                          len(json.dumps(d,default=str)) if d is not None else 0)
+        return res
+
+    def _execute(self, q):
+        with self.lock:
+            if q.op=="select": return self._seen(q.table,self._select(q))
+            self.store.begin()
+            try: rows=self._insert(q.table,q.payload) if q.op=="insert" else getattr(self,f"_{q.op}")(q)
+            except Exception: self.store.rollback(); raise
+            self.store.commit()
+        n=len(rows) if q.count else None
+        return self._seen(q.table,_Result([] if q.returning=="minimal" else rows,n))
+
+    def _select(self, q):
+        items=_parse(q.table,q.cols)
+        own=[f for f in q.where if "." not in f[0]]
+        nested={}
+        for c,op,v in q.where:
+            if "." in c: a,col=c.split(".",1); nested.setdefault(a,[]).append((col,op,v))
+        rows=self._embed(q.table,self.store.scan(q.table,own),items,nested)
+        for col,desc in reversed(q.orders):   # Postgres: nulls last ascending, first descending
+            rows.sort(key=lambda r: (r.get(col) is None, r.get(col) if r.get(col) is not None else 0),reverse=desc)
+        count=len(rows) if q.count else None
+        if q.lim is not None: rows=rows[:q.lim]
+        if q.head: return _Result([],count)
+        return _Result([self._project(q.table,r,items) for r in rows],count)
+
+    def _embed(self, table, rows, items, nested=None):
+        """Attach each embed's full target row as r["\\0alias"]; drop rows !inner excludes."""
+        for kind,*e in items:
+            if kind!="embed": continue
+            alias,target,fk,inner,sub=e
+            ids=list({r[fk] for r in rows if r.get(fk) is not None})
+            found={t["id"]:t for t in self._embed(target,self.store.scan(target,[("id","in",ids)]),sub)} if ids else {}
+            filt=(nested or {}).get(alias,[])
+            for r in rows:
+                t=found.get(r.get(fk))
+                r["\0"+alias]=t if t is not None and _match(t,filt) else None
+            if inner: rows=[r for r in rows if r["\0"+alias] is not None]
+        return rows
+
+    def _project(self, table, r, items):
+        out={}
+        for kind,*e in items:
+            if kind=="col":
+                if e[0]=="*": out.update({c:r.get(c) for c in SCHEMA[table]["cols"]})
+                else: out[e[0]]=r.get(e[0])
+            else:
+                alias,target,_,_,sub=e; t=r.get("\0"+alias)
+                out[alias]=self._project(target,t,sub) if t is not None else None
+        return out
+
+    def _check_cols(self, table, row):
+        for c in row:
+            if c not in SCHEMA[table]["cols"]:
+                raise APIError("PGRST204",f"Could not find the '{c}' column of '{table}' in the schema cache")
+
+    def _check_unique(self, table, rows, skip=()):
+        for cols,cond in SCHEMA[table].get("unique",[]):
+            # NULLs never collide; a partial index only covers rows meeting its condition
+            covered=lambda r: all(r.get(c) is not None for c in cols) and (cond is None or _match(r,[cond]))
+            new=[r for r in rows if covered(r)]
+            if not new: continue
+            # only rows sharing a leading value can collide: an indexed lookup, not a scan
+            seen={tuple(r[c] for c in cols) for r in self.store.lookup(table,cols[0],{r[cols[0]] for r in new})
+                  if covered(r) and tuple(r[k] for k in _pk(table)) not in skip}
+            for r in filter(covered,rows):
+                key=tuple(r[c] for c in cols)
+                if key in seen:
+                    raise APIError("23505",f'duplicate key value violates unique constraint "{table}_{"_".join(cols)}_key"')
+                seen.add(key)
+
+    def _insert(self, table, payload):
+        spec=SCHEMA[table]; rows=[]
+        for r in payload:
+            self._check_cols(table,r)
+            row={c:None for c in spec["cols"]}; row.update(spec.get("defaults",{}))
+            if spec["cols"].get("id")=="uuid": row["id"]=str(uuid.uuid4())
+            for ts in ("created_at","applied_at"):
+                if ts in spec["cols"]: row[ts]=_now()
+            row.update(r); rows.append(row)
+        pks=[tuple(r[k] for k in _pk(table)) for r in rows]
+        if len(set(pks))<len(pks) or any(self.store.has(table,k) for k in pks):   # primary-key lookups, no scan
+            raise APIError("23505",f'duplicate key value violates unique constraint "{table}_pkey"')
+        self._check_unique(table,rows)
+        self.store.insert(table,rows)
+        return [dict(r) for r in rows]
+
+    def _update(self, q):
+        self._check_cols(q.table,q.payload)
+        rows=self.store.scan(q.table,q.where)
+        keys=[tuple(r[k] for k in _pk(q.table)) for r in rows]
+        for r in rows: r.update(q.payload)
+        self._check_unique(q.table,rows,skip=set(keys))
+        self.store.update(q.table,keys,q.payload)
+        return rows
+
+    def _delete(self, q):
+        rows=self.store.scan(q.table,q.where)
+        self._cascade(q.table,[r["id"] for r in rows if "id" in r])
+        self.store.delete(q.table,[tuple(r[k] for k in _pk(q.table)) for r in rows])
+        return rows
+
+    def _cascade(self, table, ids):
+        if not ids: return
+        for child,spec in SCHEMA.items():
+            for col,(target,rule) in spec.get("fks",{}).items():
+                if target!=table or rule is None: continue
+                sub=_Query(self,child)
+                if rule=="cascade": sub.where=[(col,"in",ids)]; self._delete(sub)
+                else: sub.where=[(col,"in",ids)]; sub.payload={col:None}; self._update(sub)
+
+    # ── RPCs (supabase/migrations), each one store transaction ──
+    def _one(self, table, **eq):
+        rows=self.store.scan(table,[(c,"eq",v) for c,v in eq.items()])
+        return rows[0] if rows else None
+    def _set(self, table, rid, **vals):
+        q=_Query(self,table); q.where=[("id","eq",rid)]; q.payload=vals
+        return self._update(q)[0]
+
+    def _rpc_increment_score(self, p_match_id, p_team):
+        m=self._one("matches",id=p_match_id)
+        if m is None: return None
+        s1=m["score_team1"]+(p_team==1); s2=m["score_team2"]+(p_team==2)
+        wid=m["team1_id"] if s1>=15 else m["team2_id"] if s2>=15 else m["winner_id"]
+        m=self._set("matches",p_match_id,score_team1=s1,score_team2=s2,winner_id=wid)
+        self._insert("match_points",[{"match_id":p_match_id,"seq":s1+s2,"team":p_team}])
+        return m
+
+    def _rpc_undo_last_point(self, p_match_id):
+        pts=self.store.scan("match_points",[("match_id","eq",p_match_id)])
+        m=self._one("matches",id=p_match_id)
+        if not pts: return m
+        tail=max(pts,key=lambda p: p["seq"])
+        self.store.delete("match_points",[(p_match_id,tail["seq"])])
+        return self._set("matches",p_match_id,score_team1=m["score_team1"]-(tail["team"]==1),
+                         score_team2=m["score_team2"]-(tail["team"]==2),winner_id=None,status="live")
+
+    def _rpc_apply_points(self, p_match_id, p_ops):
+        for op in p_ops:
+            if self._one("applied_ops",op_key=op["key"]): continue
+            self._insert("applied_ops",[{"op_key":op["key"],"match_id":p_match_id}])
+            if op["kind"]=="point": self._rpc_increment_score(p_match_id,int(op["team"]))
+            else: self._rpc_undo_last_point(p_match_id)
+        return self._one("matches",id=p_match_id)
+
+    def _rpc_claim_match(self, p_match_id, p_court_id, p_referee_id):
+        m=self._one("matches",id=p_match_id)
+        if m is None or m["status"]!="pending": return False
+        teams={m["team1_id"],m["team2_id"]}
+        if any(teams & {l["team1_id"],l["team2_id"]} for l in self.store.scan("matches",[("status","eq","live")])): return False
+        self._set("matches",p_match_id,status="live",court_id=p_court_id,referee_id=p_referee_id)
+        return True
+
+    def _rpc_reset_tournament(self):
+        t0=datetime.now(timezone.utc); counts={}
+        for table in ("award_votes","match_moments","match_disputes","match_points","applied_ops","matches"):
+            rows=self.store.scan(table,[]); self.store.delete(table,[tuple(r[k] for k in _pk(table)) for r in rows])
+            if table!="applied_ops": counts[table]=len(rows)
+        refd=[(c["id"],) for c in self.store.scan("courts",[]) if c["referee_id"]]
+        self.store.update("courts",refd,{"referee_id":None}); counts["courts"]=len(refd)
+        for table in ("teams","users"):
+            rows=self.store.scan(table,[]); self.store.delete(table,[(r["id"],) for r in rows]); counts[table]=len(rows)
+        self.store.update("award_results_revealed",[(1,)],{"revealed":False})
+        self.store.update("tournament_state",[(1,)],{k:v for k,v in SCHEMA["tournament_state"]["defaults"].items()})
+        return {"counts":counts,"ms":round((datetime.now(timezone.utc)-t0).total_seconds()*1000,1)}
+
+def open_backend(spec):
+    """"memory" or "sqlite[:path]" → LocalBackend (seeded on first open)."""
+    kind,_,path=spec.partition(":")
+    if kind=="memory": return LocalBackend(_MemoryStore())
+    if kind=="sqlite": return LocalBackend(_SqliteStore(path or "tournament.sqlite3"))
+    raise ValueError(f"unknown DB_BACKEND {spec!r} (supabase, memory, sqlite[:path])")
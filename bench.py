@@ -0,0 +1,243 @@
+"""Simulated-tournament load benchmark for app.py.
+
+Plays a whole event against a local backend (see backends.py): signups, team draw,
+the round robin (--teams on --courts; the default 7 on 2 is the 21-game FIXED_SCHEDULE)
+and the knockout bracket. One referee thread per court scores through the real helpers (add_score, finish_match → end_game →
+auto_advance_knockouts) while --viewers spectator threads rerun what the spectator
+page reads (the live_feed() behind render_live_scores_widget, standings, schedule,
+history). Every loop iteration is one simulated rerun with a fresh per-run snapshot.
+
+Reports p50/p95/p99 per operation, queries per rerun and bytes returned by the
+backend. --save NAME / --compare NAME keep baselines under bench_baselines/.
+
+    python bench.py --viewers 200
+    python bench.py --viewers 200 --save main
+    python bench.py --viewers 200 --compare main     # exit status 1 on a regression
+    python bench.py --teams 64 --courts 8 --tap-ms 0 --viewers 20
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),"bench_baselines")
+NOISE_MS = 1.0   # latency deltas below this are never a regression
+
+class _PerThread:
+    """Stands in for app._SNAP / app._RUN: one dict per thread, so every simulated
+    session has its own per-run state, as each Streamlit rerun gets a fresh module."""
+    def __init__(self, init=dict):
+        self.local=threading.local(); self.init=init
+    def d(self):
+        if not hasattr(self.local,"d"): self.local.d=self.init()
+        return self.local.d
+    def fresh(self): self.local.d=self.init()
+    def __getitem__(self, k): return self.d()[k]
+    def __setitem__(self, k, v): self.d()[k]=v
+    def __contains__(self, k): return k in self.d()
+    def __iter__(self): return iter(list(self.d()))
+    def __len__(self): return len(self.d())
+    def get(self, k, default=None): return self.d().get(k,default)
+    def pop(self, k, *default): return self.d().pop(k,*default)
+    def setdefault(self, k, v): return self.d().setdefault(k,v)
+
+def pct(xs, p):
+    """Nearest-rank percentile."""
+    if not xs: return 0.0
+    xs=sorted(xs); return xs[min(len(xs)-1,max(0,math.ceil(p/100*len(xs))-1))]
+
+class Meter:
+    def __init__(self, app):
+        self.app=app; self.lock=threading.Lock(); self.local=threading.local()
+        self.lat={}; self.reruns={}; self.requests=0; self.bytes=0
+    def observe(self, table, rows, n):
+        self.local.bytes=getattr(self.local,"bytes",0)+n
+        with self.lock: self.requests+=1; self.bytes+=n
+    def time(self, op, fn, *a):
+        t=time.perf_counter()
+        try: return fn(*a)
+        finally:
+            ms=(time.perf_counter()-t)*1000
+            with self.lock: self.lat.setdefault(op,[]).append(ms)
+    def rerun(self, kind, fn):
+        """One simulated rerun: fresh snapshot, then count the queries and bytes fn costs."""
+        self.app._SNAP.fresh(); self.app._RUN.fresh(); self.local.bytes=0
+        out=fn()
+        with self.lock: self.reruns.setdefault(kind,[]).append((self.app._RUN["queries"],self.local.bytes))
+        return out
+
+# ─── Tournament ───────────────────────────────────────────────────────────────
+def setup(app, rng, n_teams, n_courts):
+    """Signups → teams → referees → round-robin schedule, through the same helpers the
+    admin page uses. 7 teams on the two seeded courts play FIXED_SCHEDULE."""
+    have=len(app.get_courts())
+    if n_courts>have:
+        app.get_db().table("courts").insert([{"name":f"Court {i+2}"} for i in range(have,n_courts)]).execute()
+        app._invalidate("courts")
+    def signup(name, mobile, role):
+        user,err=app.signup_user(name,mobile,"bench",role)
+        if err: raise RuntimeError(f"signup {name}: {err}")
+        return user
+    signup("Admin","9000000000","admin")
+    for i in range(n_courts): signup(f"Referee {i+1}",f"8{i:09d}","referee")
+    players=[signup(f"Player {i+1}",f"7{i:09d}","player") for i in range(2*n_teams)]
+    app.update_state(signups_frozen=True); app.auto_assign_referees()
+    rng.shuffle(players)
+    app.create_teams([{"name":name,"player1_id":players[2*i]["id"],"player2_id":players[2*i+1]["id"]}
+                      for i,name in enumerate(app.team_names(n_teams))])
+    app.update_state(teams_assigned=True)
+    courts=[c for c in app.get_courts() if c.get("referee_id")]
+    app.create_matches(app.group_schedule(app.get_teams_simple(),courts))
+    app.update_state(phase="group_stage",schedule_generated=True)
+    return [c["referee_id"] for c in courts]
+
+def _referee_reads(app, ref_id):
+    """What page_referee loads on a rerun."""
+    court=app.get_referee_court(ref_id)
+    app.get_court_matches(court["id"],"with_players")
+    m=app.get_referee_active_match(court["id"])
+    app.get_referee_open_dispute(court["id"])
+    return court,m
+
+def referee(app, meter, ref_id, rng, tap_s, done, errors):
+    try:
+        while not done.is_set():
+            court,m=meter.rerun("referee",lambda: meter.time("referee_reads",_referee_reads,app,ref_id))
+            if m is None:
+                if app.is_tournament_complete(): return
+                time.sleep(0.005); continue   # waiting for the other court to finish a bracket dependency
+            if m["status"]=="pending" and not meter.rerun("referee",lambda: meter.time("start_match",app.start_match,m["id"],court)):
+                continue   # another court claimed it first
+            s1,s2=m["score_team1"],m["score_team2"]
+            while max(s1,s2)<15 and not done.is_set():
+                field="score_team1" if rng.random()<0.5 else "score_team2"
+                _,_,s1,s2=meter.rerun("referee",lambda: meter.time("add_score",app.add_score,m["id"],field))
+                if tap_s: time.sleep(tap_s)
+            meter.rerun("referee",lambda: meter.time("end_game",app.finish_match,m["id"]))
+            meter.rerun("referee",lambda: meter.time("auto_advance_knockouts",app.auto_advance_knockouts))
+    except Exception as e:
+        errors.append(f"referee {ref_id}: {e!r}"); done.set()
+
+def viewer(app, meter, rng, poll_s, done, errors):
+    sections=[("get_leaderboard",lambda: app.get_leaderboard()),
+              ("schedule",lambda: app.get_matches(proj="with_players")),
+              ("history",lambda: app.get_moments_for([m["id"] for m in app.get_match_history()]))]
+    try:
+        while not done.is_set():
+            op,fn=rng.choice(sections)
+            def run():
+                meter.time("live_feed",app.live_feed().get)   # render_live_scores_widget data path
+                meter.time(op,fn)
+            meter.rerun("viewer",run)
+            time.sleep(poll_s)
+    except Exception as e:
+        errors.append(f"viewer: {e!r}"); done.set()
+
+def run(args):
+    os.environ.setdefault("DB_BACKEND",args.backend)
+    os.environ.setdefault("DYNAMIC_DISPATCH",str(args.dispatch=="dynamic"))
+    os.environ.setdefault("REFEREE_JOURNAL",os.path.join(tempfile.mkdtemp(),"journal.sqlite3"))
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL","error")   # bare mode warns once per thread otherwise
+    import app   # after DB_BACKEND is set: _db_pool() reads it on first use
+    app._SNAP=_PerThread(); app._RUN=_PerThread(lambda: {"queries":0})
+    meter=Meter(app); app._db_pool().observer=meter.observe
+    rng=random.Random(args.seed)
+
+    t0=time.perf_counter(); refs=meter.time("setup",setup,app,rng,args.teams,args.courts)
+    done=threading.Event(); errors=[]
+    threads=[threading.Thread(target=referee,args=(app,meter,r,random.Random(args.seed+i),args.tap_ms*(1+args.skew*i)/1000,done,errors),daemon=True)
+             for i,r in enumerate(refs)]
+    viewers=[threading.Thread(target=viewer,args=(app,meter,random.Random(args.seed*1000+i),args.poll_ms/1000,done,errors),daemon=True)
+             for i in range(args.viewers)]
+    for t in threads+viewers: t.start()
+    for t in threads: t.join(max(0.0,args.timeout-(time.perf_counter()-t0)))
+    done.set()
+    for t in viewers: t.join(5)
+    wall=time.perf_counter()-t0
+    if any(t.is_alive() for t in threads): errors.append(f"tournament not finished after {args.timeout}s")
+    total,completed=app.count_all_matches()
+    return {
+        "meta":{"backend":os.environ["DB_BACKEND"],"teams":args.teams,"courts":args.courts,"dispatch":args.dispatch,"viewers":args.viewers,"seed":args.seed,"tap_ms":args.tap_ms,"skew":args.skew,
+                "poll_ms":args.poll_ms,"python":platform.python_version(),"at":time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "ops":{op:{"n":len(xs),"p50":round(pct(xs,50),3),"p95":round(pct(xs,95),3),"p99":round(pct(xs,99),3),
+                   "max":round(max(xs),3)} for op,xs in sorted(meter.lat.items())},
+        "reruns":{k:{"n":len(v),"queries_mean":round(sum(q for q,_ in v)/len(v),3),"queries_p95":pct([q for q,_ in v],95),
+                     "bytes_mean":round(sum(b for _,b in v)/len(v),1),"bytes_p95":pct([b for _,b in v],95)}
+                  for k,v in sorted(meter.reruns.items())},
+        "totals":{"wall_s":round(wall,2),"matches":total,"completed":completed,"requests":meter.requests,
+                  "bytes":meter.bytes,"errors":errors},
+    }
+
+# ─── Reporting ────────────────────────────────────────────────────────────────
+def report(r):
+    m=r["meta"]; t=r["totals"]
+    print(f"backend={m['backend']} teams={m['teams']} courts={m['courts']} dispatch={m['dispatch']} viewers={m['viewers']} seed={m['seed']} tap={m['tap_ms']}ms poll={m['poll_ms']}ms")
+    print(f"\n{'operation':<24}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for op,s in r["ops"].items():
+        print(f"{op:<24}{s['n']:>8}{s['p50']:>10.2f}{s['p95']:>10.2f}{s['p99']:>10.2f}{s['max']:>10.2f}")
+    print(f"\n{'rerun':<24}{'n':>8}{'queries':>10}{'q p95':>8}{'bytes':>12}{'bytes p95':>12}")
+    for k,s in r["reruns"].items():
+        print(f"{k:<24}{s['n']:>8}{s['queries_mean']:>10.2f}{s['queries_p95']:>8}{s['bytes_mean']:>12.0f}{s['bytes_p95']:>12}")
+    print(f"\n{t['completed']}/{t['matches']} matches in {t['wall_s']}s · {t['requests']} backend requests · "
+          f"{t['bytes']/1024:.0f} KiB returned")
+    for e in t["errors"]: print(f"ERROR {e}")
+
+def compare(new, old, tol):
+    """Print deltas against a baseline; return the regressions (p95/p99, queries, bytes)."""
+    bad=[]
+    differ=[k for k in ("backend","teams","courts","dispatch","viewers","seed","tap_ms","skew","poll_ms") if new["meta"][k]!=old["meta"].get(k)]
+    if differ: print(f"\nnote: baseline was run with different {', '.join(differ)} — deltas are not like-for-like")
+    def check(label, a, b, floor=0.0):
+        if b is None: return
+        d=a-b; pctd=(d/b*100) if b else 0.0
+        flag=a>b*(1+tol) and d>floor
+        if flag: bad.append(label)
+        print(f"{label:<40}{b:>12.2f}{a:>12.2f}{pctd:>+9.1f}%{'  REGRESSION' if flag else ''}")
+    print(f"\n{'vs baseline ('+old['meta']['at']+')':<40}{'before':>12}{'after':>12}{'delta':>10}")
+    for op,s in new["ops"].items():
+        o=old["ops"].get(op) or {}
+        for p in ("p95","p99"): check(f"{op} {p} ms",s[p],o.get(p),NOISE_MS)
+    for k,s in new["reruns"].items():
+        o=old["reruns"].get(k) or {}
+        check(f"{k} queries/rerun",s["queries_mean"],o.get("queries_mean"))
+        check(f"{k} bytes/rerun",s["bytes_mean"],o.get("bytes_mean"))
+    return bad
+
+def main(argv=None):
+    ap=argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--viewers",type=int,default=50,help="concurrent spectator sessions")
+    ap.add_argument("--teams",type=int,default=7,help="teams in the round robin (at least 4)")
+    ap.add_argument("--courts",type=int,default=2,help="courts, one referee each")
+    ap.add_argument("--dispatch",choices=("dynamic","static"),default="dynamic",help="court dispatch (DYNAMIC_DISPATCH)")
+    ap.add_argument("--backend",default="memory",help="memory or sqlite[:path] (DB_BACKEND wins if set)")
+    ap.add_argument("--tap-ms",type=float,default=2,help="referee pause between points")
+    ap.add_argument("--skew",type=float,default=0,help="court i taps (1+skew*i) times slower — uneven courts")
+    ap.add_argument("--poll-ms",type=float,default=100,help="spectator pause between reruns")
+    ap.add_argument("--seed",type=int,default=7)
+    ap.add_argument("--timeout",type=float,default=600,help="give up on the tournament after this many seconds")
+    ap.add_argument("--save",metavar="NAME",help="write the result to bench_baselines/NAME.json")
+    ap.add_argument("--compare",metavar="NAME",help="compare with bench_baselines/NAME.json")
+    ap.add_argument("--tolerance",type=float,default=0.25,help="allowed slowdown before a regression (0.25 = 25%%)")
+    ap.add_argument("--json",action="store_true",help="print the raw result as JSON")
+    args=ap.parse_args(argv)
+
+    r=run(args)
+    print(json.dumps(r,indent=2)) if args.json else report(r)
+    status=1 if r["totals"]["errors"] else 0
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR,args.compare+".json")) as f: bad=compare(r,json.load(f),args.tolerance)
+        if bad: print(f"\n{len(bad)} regression(s) beyond {args.tolerance:.0%}"); status=1
+    if args.save:
+        os.makedirs(BASELINE_DIR,exist_ok=True)
+        with open(os.path.join(BASELINE_DIR,args.save+".json"),"w") as f: json.dump(r,f,indent=2)
+        print(f"\nbaseline saved: bench_baselines/{args.save}.json")
+    return status
+
+if __name__=="__main__":
+    sys.exit(main())
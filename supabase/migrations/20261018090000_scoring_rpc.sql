@@ -0,0 +1,54 @@
+-- Atomic scoring for the referee console (add_score / undo_score in app.py).
+-- One round trip per point, no client-side read, no lost updates.
+
+-- score_history holds a JSON array, or on older rows a JSON string encoding one
+-- (the app used to send json.dumps(...) into the jsonb column).
+create or replace function _score_hist(h jsonb) returns jsonb
+language sql immutable as $$
+  select case jsonb_typeof(h)
+    when 'array'  then h
+    when 'string' then coalesce(nullif(h #>> '{}', '')::jsonb, '[]'::jsonb)
+    else '[]'::jsonb
+  end
+$$;
+
+-- +1 for team 1 or 2, append the pre-point score to score_history and set
+-- winner_id once a side reaches 15 (the match stays live until End Game).
+create or replace function increment_score(p_match_id uuid, p_team int)
+returns matches language sql as $$
+  update matches set
+    score_team1   = score_team1 + (p_team = 1)::int,
+    score_team2   = score_team2 + (p_team = 2)::int,
+    score_history = _score_hist(score_history)
+                    || jsonb_build_array(jsonb_build_object('t1', score_team1, 't2', score_team2)),
+    winner_id     = case when score_team1 + (p_team = 1)::int >= 15 then team1_id
+                         when score_team2 + (p_team = 2)::int >= 15 then team2_id
+                         else winner_id end
+  where id = p_match_id
+  returning *;
+$$;
+
+-- Restore the score before the last point and drop it from score_history.
+create or replace function undo_last_point(p_match_id uuid)
+returns matches language plpgsql as $$
+declare
+  h jsonb;
+  m matches;
+begin
+  select _score_hist(score_history) into h from matches where id = p_match_id for update;
+  if h is null or jsonb_array_length(h) = 0 then
+    select * into m from matches where id = p_match_id;
+    return m;
+  end if;
+  update matches set
+    score_team1   = (h -> -1 ->> 't1')::int,
+    score_team2   = (h -> -1 ->> 't2')::int,
+    score_history = h - (-1),
+    winner_id     = null,
+    status        = 'live'
+  where id = p_match_id
+  returning * into m;
+  return m;
+end $$;
+
+grant execute on function increment_score(uuid, int), undo_last_point(uuid) to anon, authenticated;
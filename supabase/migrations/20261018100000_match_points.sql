@@ -0,0 +1,58 @@
+-- Append-only point log. Each point is one small (match_id, seq, team) row instead
+-- of re-sending the whole score_history JSON; undo pops the tail.
+-- seq is 1-based and always equals score_team1 + score_team2 after the point.
+create table if not exists match_points (
+  match_id   uuid     not null references matches(id) on delete cascade,
+  seq        int      not null,
+  team       smallint not null check (team in (1, 2)),
+  created_at timestamptz not null default now(),
+  primary key (match_id, seq)
+);
+
+alter table match_points enable row level security;
+create policy "match_points open access" on match_points for all using (true) with check (true);
+
+-- Replaces the score_history version from 20261018090000_scoring_rpc.sql.
+create or replace function increment_score(p_match_id uuid, p_team int)
+returns matches language plpgsql as $$
+declare
+  m matches;
+begin
+  update matches set
+    score_team1 = score_team1 + (p_team = 1)::int,
+    score_team2 = score_team2 + (p_team = 2)::int,
+    winner_id   = case when score_team1 + (p_team = 1)::int >= 15 then team1_id
+                       when score_team2 + (p_team = 2)::int >= 15 then team2_id
+                       else winner_id end
+  where id = p_match_id
+  returning * into m;
+  insert into match_points (match_id, seq, team)
+  values (p_match_id, m.score_team1 + m.score_team2, p_team);
+  return m;
+end $$;
+
+-- Matches scored before this migration have no log rows, so undo stops at the cutover.
+create or replace function undo_last_point(p_match_id uuid)
+returns matches language plpgsql as $$
+declare
+  m matches;
+  t smallint;
+begin
+  perform 1 from matches where id = p_match_id for update;
+  delete from match_points
+  where match_id = p_match_id
+    and seq = (select max(seq) from match_points where match_id = p_match_id)
+  returning team into t;
+  if t is null then
+    select * into m from matches where id = p_match_id;
+    return m;
+  end if;
+  update matches set
+    score_team1 = score_team1 - (t = 1)::int,
+    score_team2 = score_team2 - (t = 2)::int,
+    winner_id   = null,
+    status      = 'live'
+  where id = p_match_id
+  returning * into m;
+  return m;
+end $$;
@@ -0,0 +1,6 @@
+-- One match per knockout stage. auto_advance_knockouts() relies on this to make
+-- bracket progression exactly-once: a concurrent duplicate insert fails with
+-- unique_violation (23505) and the app treats it as "already created".
+-- If an older event left duplicate knockout rows, delete them before applying.
+create unique index if not exists matches_one_per_knockout_stage
+  on matches (stage) where stage <> 'group';
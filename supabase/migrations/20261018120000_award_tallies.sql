@@ -0,0 +1,32 @@
+-- Vote counts per (category, team), kept current by a trigger on award_votes so
+-- get_vote_results() reads a table whose size doesn't grow with the voter count.
+create table if not exists award_tallies (
+  category_id uuid not null references award_categories(id) on delete cascade,
+  team_id     uuid not null references teams(id) on delete cascade,
+  votes       int  not null default 0,
+  primary key (category_id, team_id)
+);
+
+create or replace function _award_tally() returns trigger
+language plpgsql as $$
+begin
+  if tg_op = 'INSERT' then
+    insert into award_tallies (category_id, team_id, votes)
+    values (new.category_id, new.voted_team_id, 1)
+    on conflict (category_id, team_id) do update set votes = award_tallies.votes + 1;
+    return new;
+  end if;
+  update award_tallies set votes = votes - 1
+  where category_id = old.category_id and team_id = old.voted_team_id;
+  return old;
+end $$;
+
+drop trigger if exists award_votes_tally on award_votes;
+create trigger award_votes_tally
+  after insert or delete on award_votes
+  for each row execute function _award_tally();
+
+-- Backfill votes cast before the trigger existed.
+insert into award_tallies (category_id, team_id, votes)
+select category_id, voted_team_id, count(*) from award_votes group by 1, 2
+on conflict (category_id, team_id) do update set votes = excluded.votes;
@@ -0,0 +1,5 @@
+-- get_referee_open_dispute(): open disputes joined to matches, filtered on court_id.
+create index if not exists matches_court_id_idx
+  on matches (court_id, match_order);
+create index if not exists match_disputes_open_idx
+  on match_disputes (match_id) where status = 'open';
@@ -0,0 +1,37 @@
+-- Idempotency keys for the referee journal. Every queued action carries an op_key
+-- generated on the referee's device; replaying it after a lost response is a no-op.
+alter table match_moments  add column if not exists op_key text unique;
+alter table match_disputes add column if not exists op_key text unique;
+
+create table if not exists applied_ops (
+  op_key     text primary key,
+  match_id   uuid not null references matches(id) on delete cascade,
+  applied_at timestamptz not null default now()
+);
+
+alter table applied_ops enable row level security;
+create policy "applied_ops open access" on applied_ops for all using (true) with check (true);
+
+-- p_ops: [{"key": text, "kind": "point" | "undo", "team": 1 | 2}] in tap order.
+-- Keys already in applied_ops are skipped; returns the match row after the batch.
+create or replace function apply_points(p_match_id uuid, p_ops jsonb)
+returns matches language plpgsql as $$
+declare
+  op jsonb;
+  m  matches;
+begin
+  perform 1 from matches where id = p_match_id for update;
+  for op in select * from jsonb_array_elements(p_ops) loop
+    insert into applied_ops (op_key, match_id) values (op->>'key', p_match_id)
+    on conflict (op_key) do nothing;
+    if found then
+      if op->>'kind' = 'point' then
+        perform increment_score(p_match_id, (op->>'team')::int);
+      else
+        perform undo_last_point(p_match_id);
+      end if;
+    end if;
+  end loop;
+  select * into m from matches where id = p_match_id;
+  return m;
+end $$;
@@ -0,0 +1,31 @@
+-- One-call, all-or-nothing tournament reset. Courts and award categories are kept.
+-- Returns {"counts": {table: rows affected}, "ms": server-side duration}.
+-- Children go before parents, so no delete depends on a cascade.
+create or replace function reset_tournament()
+returns jsonb language plpgsql as $$
+declare
+  t0     timestamptz := clock_timestamp();
+  n      int;
+  counts jsonb := '{}';
+begin
+  delete from award_tallies where true;
+  delete from award_votes where true;     get diagnostics n = row_count; counts := counts || jsonb_build_object('award_votes', n);
+  delete from match_moments where true;   get diagnostics n = row_count; counts := counts || jsonb_build_object('match_moments', n);
+  delete from match_disputes where true;  get diagnostics n = row_count; counts := counts || jsonb_build_object('match_disputes', n);
+  delete from match_points where true;    get diagnostics n = row_count; counts := counts || jsonb_build_object('match_points', n);
+  delete from applied_ops where true;
+  delete from matches where true;         get diagnostics n = row_count; counts := counts || jsonb_build_object('matches', n);
+  update courts set referee_id = null where referee_id is not null;
+                                          get diagnostics n = row_count; counts := counts || jsonb_build_object('courts', n);
+  delete from teams where true;           get diagnostics n = row_count; counts := counts || jsonb_build_object('teams', n);
+  delete from users where true;           get diagnostics n = row_count; counts := counts || jsonb_build_object('users', n);
+  update award_results_revealed set revealed = false where id = 1;
+  update tournament_state set
+    phase = 'signup', signups_frozen = false, teams_assigned = false,
+    schedule_generated = false, group_stage_complete = false, semifinals_complete = false
+  where id = 1;
+  return jsonb_build_object('counts', counts,
+                            'ms', round((extract(epoch from clock_timestamp() - t0) * 1000)::numeric, 1));
+end $$;
+
+grant execute on function reset_tournament() to anon, authenticated;
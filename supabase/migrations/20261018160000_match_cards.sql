@@ -0,0 +1,26 @@
+-- Flat, denormalized match list for the list views: one row per match with team,
+-- court, winner and player names as plain columns, so PostgREST runs one joined
+-- select instead of nested embeds. app.py _from_card() rebuilds the nested shape.
+create or replace view match_cards with (security_invoker = on) as
+select
+  m.id, m.match_number, m.match_order, m.stage, m.status, m.court_id, m.referee_id,
+  m.team1_id, m.team2_id, m.winner_id, m.score_team1, m.score_team2,
+  t1.name  as team1_name,
+  t2.name  as team2_name,
+  c.name   as court_name,
+  w.name   as winner_name,
+  t1.player1_id as team1_p1_id, u11.name as team1_p1_name,
+  t1.player2_id as team1_p2_id, u12.name as team1_p2_name,
+  t2.player1_id as team2_p1_id, u21.name as team2_p1_name,
+  t2.player2_id as team2_p2_id, u22.name as team2_p2_name
+from matches m
+left join teams  t1  on t1.id  = m.team1_id
+left join teams  t2  on t2.id  = m.team2_id
+left join courts c   on c.id   = m.court_id
+left join teams  w   on w.id   = m.winner_id
+left join users  u11 on u11.id = t1.player1_id
+left join users  u12 on u12.id = t1.player2_id
+left join users  u21 on u21.id = t2.player1_id
+left join users  u22 on u22.id = t2.player2_id;
+
+grant select on match_cards to anon, authenticated;
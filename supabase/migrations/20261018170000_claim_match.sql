@@ -0,0 +1,22 @@
+-- Dynamic court dispatch: start a pending match on the court that asked for it
+-- (app.py claim_match). Returns false if another court started it first or one of
+-- its teams is already live. The advisory lock serialises claims, so two courts
+-- can't both pass the live check for the same team.
+create or replace function claim_match(p_match_id uuid, p_court_id uuid, p_referee_id uuid)
+returns boolean language plpgsql as $$
+declare
+  m matches;
+begin
+  perform pg_advisory_xact_lock(hashtext('claim_match'));
+  select * into m from matches where id = p_match_id and status = 'pending' for update;
+  if not found then return false; end if;
+  if exists (select 1 from matches l
+             where l.status = 'live'
+               and (l.team1_id in (m.team1_id, m.team2_id) or l.team2_id in (m.team1_id, m.team2_id))) then
+    return false;
+  end if;
+  update matches set status = 'live', court_id = p_court_id, referee_id = p_referee_id where id = p_match_id;
+  return true;
+end $$;
+
+grant execute on function claim_match(uuid, uuid, uuid) to anon, authenticated;
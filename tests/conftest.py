@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("DB_BACKEND","memory"); os.environ.setdefault("STREAMLIT_LOGGER_LEVEL","error")
+os.environ.setdefault("REFEREE_JOURNAL",os.path.join(tempfile.mkdtemp(),"journal.sqlite3"))
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import backends
+
+class Seed:
+    """Rows for a test: players, teams and matches on the seeded courts."""
+    def __init__(self, db):
+        self.db=db; self.n=0
+    def ins(self, table, rows):
+        return self.db.table(table).insert(rows).execute().data
+    def courts(self):
+        return sorted(self.db.table("courts").select("*").execute().data,key=lambda c:(len(c["name"]),c["name"]))
+    def teams(self, n):
+        ps=self.ins("users",[{"name":f"P{self.n+i}","mobile":f"p{self.n+i}","role":"player","password_hash":"x"} for i in range(2*n)])
+        self.n+=2*n
+        return self.ins("teams",[{"name":f"T{self.n+i}","player1_id":ps[2*i]["id"],"player2_id":ps[2*i+1]["id"]} for i in range(n)])
+    def match(self, t1, t2, court, num=1, stage="group", status="pending", **kw):
+        return self.ins("matches",{"match_number":num,"match_order":num,"stage":stage,"status":status,"court_id":court["id"],
+                                   "team1_id":t1["id"],"team2_id":t2["id"],**kw})[0]
+
+@pytest.fixture
+def db():
+    return backends.open_backend("memory").acquire()
+
+@pytest.fixture
+def seed(db):
+    return Seed(db)
+
+@pytest.fixture
+def match(seed):
+    """A live group match between two fresh teams on the first seeded court."""
+    t=seed.teams(2)
+    return seed.match(t[0],t[1],seed.courts()[0],status="live")
+
+@pytest.fixture
+def app_db():
+    """app.py on its process-wide memory backend, reset: no rows, no cached state."""
+    import app
+    app.reset_all_data(); app._invalidate()
+    return app.get_db()
+
+@pytest.fixture
+def app_seed(app_db):
+    return Seed(app_db)
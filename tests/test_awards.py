@@ -0,0 +1,20 @@
+"""Award results: per-(category, team) tallies, most votes first."""
+import app
+
+def test_vote_results_rank_and_reject_a_second_vote(app_seed):
+    t=app_seed.teams(3); voters=app_seed.ins("users",[{"name":f"V{i}","mobile":f"v{i}","role":"player"} for i in range(4)])
+    cat=app.get_award_categories()[0]["id"]
+    for v,team in zip(voters,(1,1,2,0)): assert app.cast_vote(v["id"],cat,t[team]["id"])
+    assert not app.cast_vote(voters[0]["id"],cat,t[2]["id"])   # one vote per voter and category
+    r=app.get_vote_results()[cat]
+    assert r["ranked"]==[(t[1]["name"],2),(t[0]["name"],1),(t[2]["name"],1)] and r["winner"]==t[1]["name"]
+    assert all(not x["ranked"] for c,x in app.get_vote_results().items() if c!=cat)
+
+def test_tallies_fall_back_once_without_the_table(app_seed, monkeypatch):
+    """No award_tallies on the memory backend: one PGRST205, then straight to the count."""
+    app._undeployed().discard("award_tallies"); calls=[]
+    real=app.get_db
+    monkeypatch.setattr(app,"get_db",lambda: calls.append(1) or real())
+    app._invalidate("vote_tallies"); app._load_vote_tallies()
+    app._invalidate("vote_tallies"); app._load_vote_tallies()
+    assert "award_tallies" in app._undeployed() and len(calls)==3
@@ -0,0 +1,35 @@
+"""Local backends: key and unique checks stay correct as rows change."""
+import pytest
+import backends
+
+@pytest.fixture(params=["memory","sqlite"])
+def any_db(request, tmp_path):
+    return backends.open_backend("memory" if request.param=="memory" else f"sqlite:{tmp_path/'t.sqlite3'}").acquire()
+
+def _dup(call):
+    with pytest.raises(backends.APIError) as e: call()
+    return e.value.code
+
+def test_primary_and_unique_keys(any_db):
+    users=lambda: any_db.table("users")
+    u=users().insert([{"name":f"U{i}","mobile":f"m{i}","role":"player"} for i in range(200)]).execute().data
+    assert _dup(lambda: users().insert({"id":u[0]["id"],"name":"x","mobile":"fresh"}).execute())=="23505"
+    assert _dup(lambda: users().insert({"name":"x","mobile":"m5"}).execute())=="23505"
+    assert _dup(lambda: users().insert([{"name":"a","mobile":"same"},{"name":"b","mobile":"same"}]).execute())=="23505"
+    assert len(users().select("id").execute().data)==200   # failed inserts left nothing behind
+
+def test_unique_index_follows_updates_and_deletes(any_db):
+    q=lambda: any_db.table("users")
+    u=q().insert({"name":"A","mobile":"111"}).execute().data[0]
+    q().update({"mobile":"222"}).eq("id",u["id"]).execute()
+    q().insert({"name":"B","mobile":"111"}).execute()   # freed by the update
+    assert _dup(lambda: q().insert({"name":"C","mobile":"222"}).execute())=="23505"
+    q().delete().eq("id",u["id"]).execute()
+    q().insert({"name":"C","mobile":"222"}).execute()   # freed by the delete
+    assert sorted(r["mobile"] for r in q().select("mobile").execute().data)==["111","222"]
+
+def test_partial_unique_index_only_covers_its_rows(any_db, seed):
+    s=type(seed)(any_db); t=s.teams(2); c=s.courts()[0]
+    for i in range(3): s.match(t[0],t[1],c,num=i+1)   # group rows are not covered
+    s.match(t[0],t[1],c,num=4,stage="final")
+    assert _dup(lambda: s.match(t[0],t[1],c,num=5,stage="final"))=="23505"
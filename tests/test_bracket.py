@@ -0,0 +1,31 @@
+"""Knockout progression: each stage is due once everything in its "after" is done."""
+import app
+
+def _m(stage, t1, t2, status="completed", winner=None):
+    return {"stage":stage,"team1_id":t1,"team2_id":t2,"status":status,"winner_id":winner}
+
+RANKED=[{"id":t} for t in "ABCDE"]
+stages=lambda due: [(s["stage"],t1,t2) for s,t1,t2 in due]
+
+def test_waits_for_the_group_stage():
+    assert app.bracket_next([_m("group","A","B"),_m("group","C","D",status="live")],RANKED)==[]
+
+def test_semis_after_group():
+    assert stages(app.bracket_next([_m("group","A","B",winner="A")],RANKED))==[("semifinal","A","B"),("third_place","C","D")]
+
+def test_qualifier_then_final():
+    ms=[_m("group","A","B",winner="A"),_m("semifinal","A","B",winner="B"),_m("third_place","C","D",winner="D")]
+    assert stages(app.bracket_next(ms,RANKED))==[("qualifier","A","D")]
+    ms.append(_m("qualifier","A","D",winner="A"))
+    assert stages(app.bracket_next(ms,RANKED))==[("final","B","A")]
+    ms.append(_m("final","B","A",status="pending"))
+    assert app.bracket_next(ms,RANKED)==[]
+
+def test_a_stage_without_both_seeds_is_not_created():
+    assert stages(app.bracket_next([_m("group","A","B",winner="A")],RANKED[:3]))==[("semifinal","A","B")]
+
+def test_bracket_court_prefers_refereed_courts():
+    courts=[{"id":"2","name":"Court 2","referee_id":"r"},{"id":"3","name":"Court 3"},{"id":"10","name":"Court 10","referee_id":"r"}]
+    by={s["stage"]:app.bracket_court(s,courts)["name"] for s in app.BRACKET}
+    assert by=={"semifinal":"Court 10","third_place":"Court 2","qualifier":"Court 10","final":"Court 10"}
+    assert {app.bracket_court(s,courts[:1])["name"] for s in app.BRACKET}=={"Court 2"}
@@ -0,0 +1,28 @@
+"""Count helpers answer with head-only count requests: no rows come back."""
+import app
+
+def _observe(monkeypatch):
+    seen=[]; monkeypatch.setattr(app._db_pool(),"observer",lambda table,rows,n: seen.append((table,rows)))
+    return seen
+
+def test_counts_transfer_no_rows(app_seed, monkeypatch):
+    t=app_seed.teams(4); c=app_seed.courts()[0]
+    app_seed.ins("users",{"name":"R","mobile":"r0","role":"referee"})
+    app_seed.match(t[0],t[1],c,num=1,status="completed"); app_seed.match(t[2],t[3],c,num=2)
+    app._invalidate(); seen=_observe(monkeypatch)
+    assert app.count_by_role()=={"player":8,"referee":1,"admin":0}
+    assert app.count_all_matches()==(2,1) and app.check_group_done() is False
+    assert len(seen)==6 and all(rows==0 for _,rows in seen)
+
+def test_counts_reuse_the_runs_match_snapshot(app_seed, monkeypatch):
+    t=app_seed.teams(2); app_seed.match(t[0],t[1],app_seed.courts()[0],status="completed")
+    app._invalidate(); app.get_matches(); seen=_observe(monkeypatch)
+    assert app.count_all_matches()==(1,1) and app.check_group_done() is True and seen==[]
+
+def test_tournament_complete_needs_round_robin_and_bracket(app_seed):
+    t=app_seed.teams(4); c=app_seed.courts()[0]
+    pairs=[(a,b) for i,a in enumerate(t) for b in t[i+1:]]
+    for i,(a,b) in enumerate(pairs): app_seed.match(a,b,c,num=i+1,status="completed")
+    app._invalidate(); assert not app.is_tournament_complete()
+    for j,spec in enumerate(app.BRACKET): app_seed.match(t[0],t[1],c,num=len(pairs)+j+1,stage=spec["stage"],status="completed")
+    app._invalidate(); assert app.is_tournament_complete()
@@ -0,0 +1,63 @@
+"""Court dispatch: ready_queue ordering and claim_match, which lets one court start a match."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import app
+
+def _g(mid, court, order, t1, t2, status="pending", stage="group"):
+    return {"id":mid,"court_id":court,"match_order":order,"stage":stage,"status":status,"team1_id":t1,"team2_id":t2}
+
+@pytest.fixture
+def disp(monkeypatch):
+    d=app._Dispatcher(); monkeypatch.setattr(app,"dispatcher",lambda: d)
+    return d
+
+@pytest.fixture(params=["rpc","fallback"])
+def path(request):
+    """claim_match via the RPC, or via the conditional update when it isn't deployed."""
+    if request.param=="fallback": app._undeployed().add("claim_match")
+    yield request.param
+    app._undeployed().discard("claim_match")
+
+def _race(n, claim):
+    """claim(0..n-1) on n threads released together; results in order."""
+    go=threading.Barrier(n)
+    def run(i): go.wait(); return claim(i)
+    with ThreadPoolExecutor(n) as ex: return list(ex.map(run,range(n)))
+
+def test_queue_orders_by_plan_slot_then_own_court(disp):
+    ms=[_g("a1","A",1,"t1","t2"),_g("b1","B",2,"t3","t4"),_g("a2","A",3,"t5","t6"),_g("b2","B",4,"t7","t8")]
+    assert [m["id"] for m in app.ready_queue("B",ms)]==["b1","a1","b2","a2"]
+    assert [m["id"] for m in app.ready_queue("A",ms)]==["a1","b1","a2","b2"]
+
+def test_queue_puts_rested_teams_first_then_most_rested(disp):
+    now=time.time(); disp.finished.update({"t1":now-10,"t5":now-60})
+    ms=[_g("a1","A",1,"t1","t2"),_g("a2","A",2,"t5","t6"),_g("a3","A",3,"t7","t8")]
+    assert [m["id"] for m in app.ready_queue("A",ms)]==["a3","a2","a1"]
+
+def test_queue_skips_busy_teams_and_other_courts_knockouts(disp):
+    ms=[_g("l","B",1,"t1","t2",status="live"),_g("a1","A",2,"t1","t3"),_g("a2","A",3,"t4","t5"),
+        _g("sf","A",9,"t4","t6",stage="semifinal"),_g("fin","B",10,"t7","t8",stage="final")]
+    assert [m["id"] for m in app.ready_queue("A",ms)]==["sf","a2"]
+    assert [m["id"] for m in app.ready_queue("B",ms)]==["fin","a2"]
+
+def test_backend_claim_race_has_one_winner(db, seed):
+    t=seed.teams(2); cs=seed.courts(); m=seed.match(t[0],t[1],cs[0])
+    won=_race(len(cs),lambda i: db.rpc("claim_match",{"p_match_id":m["id"],"p_court_id":cs[i]["id"],"p_referee_id":None}).execute().data)
+    assert won.count(True)==1
+    row=db.table("matches").select("*").eq("id",m["id"]).execute().data[0]
+    assert row["status"]=="live" and row["court_id"]==cs[won.index(True)]["id"]
+
+def test_two_referees_claim_the_same_match(app_seed, path):
+    t=app_seed.teams(2); cs=app_seed.courts()[:2]; m=app_seed.match(t[0],t[1],cs[0])
+    won=_race(2,lambda i: app.claim_match(m["id"],cs[i]))
+    assert sorted(won)==[False,True]
+    assert app.get_db().table("matches").select("court_id").eq("id",m["id"]).execute().data[0]["court_id"]==cs[won.index(True)]["id"]
+
+def test_claim_refused_while_a_team_is_on_another_court(app_seed, path):
+    t=app_seed.teams(3); cs=app_seed.courts()[:2]
+    app_seed.match(t[0],t[1],cs[0],num=1,status="live"); m=app_seed.match(t[1],t[2],cs[1],num=2)
+    assert app.claim_match(m["id"],cs[1]) is False
+    assert app.get_db().table("matches").select("status").eq("id",m["id"]).execute().data[0]["status"]=="pending"
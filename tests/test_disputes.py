@@ -0,0 +1,15 @@
+"""A court's open dispute: one filtered query, cached until a dispute changes."""
+import app
+
+def test_open_dispute_is_per_court_and_cached(app_seed, monkeypatch):
+    t=app_seed.teams(4); c2,c3=app_seed.courts()
+    m1=app_seed.match(t[0],t[1],c2,num=1,status="completed"); app_seed.match(t[2],t[3],c3,num=2,status="live")
+    assert app.get_referee_open_dispute(c2["id"]) is None
+    app.flag_dispute(m1["id"],None,"line call")
+    d=app.get_referee_open_dispute(c2["id"])
+    assert (d["match_id"],d["note"],d["status"])==(m1["id"],"line call","open")
+    assert app.get_referee_open_dispute(c3["id"]) is None
+    seen=[]; monkeypatch.setattr(app._db_pool(),"observer",lambda table,rows,n: seen.append(table))
+    assert app.get_referee_open_dispute(c2["id"])["id"]==d["id"] and seen==[]   # cached
+    app.resolve_dispute(d["id"],m1["id"],undo=False)
+    assert app.get_referee_open_dispute(c2["id"]) is None
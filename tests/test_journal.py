@@ -0,0 +1,77 @@
+"""Referee journal: durable, ordered, idempotent replay, and what it gives up on."""
+import time
+import httpx
+import pytest
+import app
+import backends
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(app,"JOURNAL_RETRY_S",0.001); monkeypatch.setattr(app,"JOURNAL_MAX_WAIT",0.01)
+
+def _wait(cond, timeout=5):
+    end=time.monotonic()+timeout
+    while not cond():
+        if time.monotonic()>end: raise AssertionError("timed out")
+        time.sleep(0.01)
+
+def _recorder(score=(0,0)):
+    sent=[]
+    def points(mid, ops): sent.append((mid,[(kind,a) for _,kind,a in ops])); return score
+    return sent, {"points":points,"moment":lambda mid,op_key,**a: sent.append((mid,"moment",a))}
+
+def test_ops_survive_a_restart_and_replay_in_order(tmp_path):
+    path=str(tmp_path/"j.sqlite3")
+    j=app._RefJournal(path)   # nothing bound yet: ops only reach the file
+    j.submit("m1","point",{"team":1}); j.submit("m1","undo",{"team":1}); j.submit("m1","moment",{"mtype":"good_shot"})
+    assert j.pending("m1")==3
+    sent,ops=_recorder(); j2=app._RefJournal(path); j2.bind(ops)
+    _wait(lambda: not j2.pending())
+    assert sent==[("m1",[("point",{"team":1}),("undo",{"team":1})]),("m1","moment",{"mtype":"good_shot"})]
+
+def test_lost_response_is_replayed_once(tmp_path, app_seed):
+    t=app_seed.teams(2); m=app_seed.match(t[0],t[1],app_seed.courts()[0],status="live")
+    lost=[]
+    def points(mid, ops):
+        got=app.apply_points(mid,ops)
+        if not lost: lost.append(1); raise httpx.ReadTimeout("response lost")   # applied, but we never hear back
+        return got
+    j=app._RefJournal(str(tmp_path/"j.sqlite3")); j.bind({"points":points})
+    j.submit(m["id"],"point",{"team":1},(1,0)); j.submit(m["id"],"point",{"team":1},(2,0))
+    _wait(lambda: not j.pending())
+    assert lost and j.take_conflict(m["id"]) is None
+    assert app_seed.db.table("matches").select("score_team1").eq("id",m["id"]).execute().data[0]["score_team1"]==2
+
+def test_other_device_score_is_a_conflict(tmp_path):
+    sent,ops=_recorder(score=(5,3))
+    j=app._RefJournal(str(tmp_path/"j.sqlite3")); j.submit("m1","point",{"team":1},(1,0)); j.submit("m1","point",{"team":2},(1,1))
+    j.bind(ops); _wait(lambda: not j.pending())
+    assert j.take_conflict("m1")==(5,3) and j.take_conflict("m1") is None
+
+@pytest.mark.parametrize("err",[backends.APIError("503","Service Unavailable"),backends.APIError("PGRST001","db down"),
+                                backends.APIError("57P01","admin shutdown"),httpx.ConnectError("refused")])
+def test_outage_errors_stay_queued(tmp_path, err):
+    fail=[0]
+    def points(mid, ops):
+        fail[0]+=1
+        if fail[0]<=3*app.JOURNAL_MAX_TRIES: raise err
+        return (1,0)
+    j=app._RefJournal(str(tmp_path/"j.sqlite3")); j.submit("m1","point",{"team":1},(1,0)); j.bind({"points":points})
+    _wait(lambda: fail[0]>2*app.JOURNAL_MAX_TRIES)
+    assert j.pending("m1")==1 and j.error.get("m1")
+    _wait(lambda: not j.pending())
+    assert j.take_conflict("m1") is None and fail[0]==3*app.JOURNAL_MAX_TRIES+1
+
+@pytest.mark.parametrize("err",[backends.APIError("400","Bad Request"),backends.APIError("23503","fk violation"),
+                                backends.APIError("PGRST116","no rows"),KeyError("team")])
+def test_a_refusal_drops_the_queue_and_reports_it(tmp_path, err):
+    calls=[]
+    def points(mid, ops): calls.append(1); raise err
+    j=app._RefJournal(str(tmp_path/"j.sqlite3")); j.submit("m1","point",{"team":1},(1,0)); j.submit("m1","point",{"team":1},(2,0))
+    j.bind({"points":points}); _wait(lambda: not j.pending())
+    assert len(calls)==app.JOURNAL_MAX_TRIES and j.take_conflict("m1")==() and j.error["m1"]
+
+def test_same_op_key_flag_files_once(app_seed):
+    t=app_seed.teams(2); m=app_seed.match(t[0],t[1],app_seed.courts()[0],status="live")
+    for _ in range(2): app.flag_dispute(m["id"],None,"again",op_key="k1")
+    assert len(app.get_all_disputes())==1
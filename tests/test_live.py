@@ -0,0 +1,40 @@
+"""Process-wide live feed: one fetch however many sessions read it."""
+import threading
+import time
+import app
+
+def _feed(monkeypatch, delay=0.2):
+    calls=[]
+    def live():
+        calls.append(1); time.sleep(delay); return [{"n":len(calls)}]
+    monkeypatch.setattr(app,"get_live_matches",live); monkeypatch.setattr(app,"get_all_moments",lambda: [])
+    monkeypatch.setattr(app,"LIVE_MIN_GAP_S",0)
+    return app._LiveFeed(app._LiveBus()), calls
+
+def _read_all(feed, n):
+    go=threading.Barrier(n); out=[None]*n
+    def read(i): go.wait(); out[i]=feed.get()
+    ts=[threading.Thread(target=read,args=(i,)) for i in range(n)]
+    for t in ts: t.start()
+    for t in ts: t.join(5)
+    return out
+
+def test_concurrent_readers_share_one_fetch(monkeypatch):
+    feed,calls=_feed(monkeypatch)
+    out=_read_all(feed,20)
+    assert len(calls)==1 and all(d is out[0] for d in out)
+
+def test_warm_feed_is_served_without_a_query(monkeypatch):
+    feed,calls=_feed(monkeypatch,delay=0)
+    feed.get(); time.sleep(0.1)
+    for _ in range(50): feed.get()
+    assert len(calls)==1
+
+def test_publish_triggers_one_refetch(monkeypatch):
+    feed,calls=_feed(monkeypatch,delay=0)
+    first=feed.get(); feed.bus.publish()
+    for _ in range(100):
+        if feed.data["v"]==1: break
+        time.sleep(0.02)
+    out=_read_all(feed,10)
+    assert len(calls)==2 and first["v"]==0 and all(d["v"]==1 for d in out)
@@ -0,0 +1,34 @@
+"""match_cards rows rebuild exactly the nested shape of the embedded-join select."""
+import pytest
+import app
+
+def _card(m, cols):
+    """What the match_cards view returns for this match (see the migration)."""
+    name=lambda x: (x or {}).get("name")
+    flat={"team1_name":name(m["team1"]),"team2_name":name(m["team2"]),"court_name":name(m["court"]),"winner_name":name(m["winner"])}
+    for t in ("team1","team2"):
+        for p in ("p1","p2"):
+            flat[f"{t}_{p}_id"]=((m[t] or {}).get(p) or {}).get("id"); flat[f"{t}_{p}_name"]=name((m[t] or {}).get(p))
+    return {c:(m[c] if c in m and c not in flat else flat[c]) for c in cols.split(",")}
+
+@pytest.mark.parametrize("proj",["minimal","with_players"])
+def test_card_round_trip(app_seed, proj):
+    t=app_seed.teams(4); c=app_seed.courts()
+    app_seed.match(t[0],t[1],c[0],num=1,status="completed",winner_id=t[0]["id"],score_team1=15,score_team2=9)
+    app_seed.match(t[2],t[3],c[1],num=2,status="live")
+    nested=app_seed.db.table("matches").select(app._ms(proj)).order("match_order").execute().data
+    assert [app._from_card(_card(m,app._CARD_COLS[proj])) for m in nested]==nested
+    assert nested[0]["winner"]=={"id":t[0]["id"],"name":t[0]["name"]} and nested[1]["winner"] is None
+
+def test_list_views_load_without_the_view(app_seed):
+    """The memory backend has no match_cards: the embedded select serves, same shape."""
+    t=app_seed.teams(2); app_seed.match(t[0],t[1],app_seed.courts()[0],status="live")
+    live=app.get_live_matches()
+    assert "match_cards" in app._undeployed()
+    assert live[0]["team1"]["p1"]["name"].startswith("P") and live[0]["court"]["name"]=="Court 2"
+
+def test_snapshot_serves_a_narrower_projection_from_a_wider_one(app_seed, monkeypatch):
+    t=app_seed.teams(2); app_seed.match(t[0],t[1],app_seed.courts()[0])
+    app._invalidate(); full=app.get_matches(proj="full")
+    monkeypatch.setattr(app,"_load_matches",lambda *a,**k: pytest.fail("queried again"))
+    assert app.get_matches(proj="minimal")==full and app.get_matches(proj="with_players")==full
@@ -0,0 +1,32 @@
+"""Knockout match numbers come from the in-process counter: no gaps, no repeats."""
+import threading
+import pytest
+import app
+import backends
+
+def _numbers(db):
+    rows=db.table("matches").select("match_number,match_order").execute().data
+    return sorted(r["match_number"] for r in rows), sorted(r["match_order"] for r in rows)
+
+def test_concurrent_creates_get_distinct_consecutive_numbers(app_seed):
+    t=app_seed.teams(2); app_seed.match(t[0],t[1],app_seed.courts()[0],num=1)
+    spec={"stage":"group","court":0}; go=threading.Barrier(8)
+    def create(): go.wait(); app.create_knockout_matches([(spec,t[0]["id"],t[1]["id"])]*2)
+    ts=[threading.Thread(target=create) for _ in range(8)]
+    for th in ts: th.start()
+    for th in ts: th.join(5)
+    assert _numbers(app_seed.db)==(list(range(1,18)),list(range(1,18)))
+
+def test_failed_insert_gives_its_numbers_back(app_seed):
+    t=app_seed.teams(4); app_seed.match(t[0],t[1],app_seed.courts()[0],num=1)
+    sf,tp=app.BRACKET[0],app.BRACKET[1]
+    app.create_knockout_matches([(sf,t[0]["id"],t[1]["id"])])
+    with pytest.raises(backends.APIError) as e: app.create_knockout_matches([(sf,t[2]["id"],t[3]["id"])])
+    assert e.value.code=="23505"
+    app.create_knockout_matches([(tp,t[2]["id"],t[3]["id"])])
+    assert _numbers(app_seed.db)==([1,2,3],[1,2,3])
+
+def test_give_back_keeps_a_later_allocation():
+    seq=app._MatchSeq(); a=seq.take(2,[]); seq.take(1,[])
+    seq.give_back(a); assert seq.take(1,[])==[(4,4)]
+    seq.give_back([(4,4)]); assert seq.take(1,[])==[(4,4)]
@@ -0,0 +1,18 @@
+"""History moments: one batched query, then only rows newer than the last seen."""
+import app
+
+def test_moment_log_fetches_incrementally(app_seed, monkeypatch):
+    t=app_seed.teams(4); c=app_seed.courts()[0]
+    m1=app_seed.match(t[0],t[1],c,num=1,status="completed"); m2=app_seed.match(t[2],t[3],c,num=2,status="live")
+    app.add_moment(m1["id"],"good_shot",t[0]["id"],"3-2"); app.add_moment(m2["id"],"great_rally",None,"1-0")
+    calls=[]; fetch=app._fetch_moments
+    monkeypatch.setattr(app,"_fetch_moments",lambda ids,since=None: calls.append((sorted(ids),since)) or fetch(ids,since))
+    log=app._MomentLog()
+    got=log.get([m1["id"],m2["id"],m1["id"]])
+    assert len(calls)==1 and calls[0][1] is None
+    assert [len(got[m1["id"]]),len(got[m2["id"]])]==[1,1]
+    log.get([m1["id"],m2["id"]]); assert len(calls)==1   # no write since: no query
+    app.add_moment(m2["id"],"crazy_comeback",t[3]["id"],"5-9")
+    got=log.get([m1["id"],m2["id"]])
+    assert len(calls)==2 and calls[1][1] is not None
+    assert [mm["moment_type"] for mm in got[m2["id"]]]==["great_rally","crazy_comeback"] and len(got[m1["id"]])==1
@@ -0,0 +1,30 @@
+"""Salted scrypt hashes, legacy rehash on login, and the login cache."""
+import hashlib
+import app
+
+def test_scrypt_round_trip_and_fresh_salt():
+    h=app.hp("secret")
+    assert app.check_pw("secret",h)==(True,False) and app.check_pw("wrong",h)==(False,False) and h!=app.hp("secret")
+
+def test_legacy_sha256_needs_rehash():
+    legacy=hashlib.sha256(b"secret").hexdigest()
+    assert app.check_pw("secret",legacy)==(True,True) and app.check_pw("wrong",legacy)==(False,False)
+
+def test_old_scrypt_parameters_need_rehash():
+    salt=b"0"*16; h=hashlib.scrypt(b"secret",salt=salt,n=2**10,r=8,p=1).hex()
+    assert app.check_pw("secret",f"scrypt${2**10}$8$1${salt.hex()}${h}")==(True,True)
+
+def test_login_rehashes_legacy_password(app_db):
+    app_db.table("users").insert({"name":"Old","mobile":"5550001","role":"player",
+                                  "password_hash":hashlib.sha256(b"secret").hexdigest()}).execute()
+    u,err=app.login_user("5550001","secret")
+    assert err is None and u["name"]=="Old"
+    stored=app_db.table("users").select("password_hash").eq("mobile","5550001").execute().data[0]["password_hash"]
+    assert stored.startswith("scrypt$") and app.check_pw("secret",stored)==(True,False)
+    assert app.login_user("5550001","wrong")==(None,"Wrong password.")
+
+def test_login_cache_hits_only_the_same_password_and_hash():
+    c=app._LoginCache(2); c.put("m","h","pw")
+    assert c.hit("m","h","pw") and not c.hit("m","h","other") and not c.hit("m","h2","pw")
+    c.put("a","h","x"); c.put("b","h","y")   # size 2: "m" is evicted
+    assert not c.hit("m","h","pw") and c.hit("b","h","y")
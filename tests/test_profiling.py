@@ -0,0 +1,40 @@
+"""Profiler: which helpers are wrapped, what a call records, and the OpenMetrics export."""
+import re
+import app
+
+def _snap_for(calls):
+    p=app._Profiler()
+    for ms,f in calls: p._charge(("Admin",'Ref "A"\\B',"get_matches"),ms,f)
+    return p.snapshot()
+
+def test_only_db_helpers_are_profiled():
+    assert hasattr(app.get_matches,"__wrapped__") and hasattr(app.claim_match,"__wrapped__")
+    for pure in (app.bracket_next,app.bracket_court,app.build_schedule,app.ready_queue,app.projected_finish):
+        assert not hasattr(pure,"__wrapped__"), pure.__name__
+
+def test_call_is_charged_to_the_innermost_helper():
+    p=app._Profiler()
+    inner=lambda: p.observe("matches",3,120)
+    p.call(("main",""),"outer",lambda: p.call(("main",""),"inner",inner,(),{},None),(),{},None)
+    by={r["helper"]:r for r in p.snapshot()["helpers"]}
+    assert (by["inner"]["requests"],by["inner"]["rows"],by["inner"]["bytes"])==(1,3,120)
+    assert (by["outer"]["requests"],by["outer"]["calls"])==(0,1)
+
+def test_openmetrics_exposition():
+    txt=app.profile_openmetrics(_snap_for([(10.0,(2,5,300)),(30.0,(1,1,50))]))
+    lines=txt.split("\n")
+    assert txt.endswith("# EOF\n") and lines.count("# EOF")==1
+    lbl='page="Admin",section="Ref \\"A\\"\\\\B",helper="get_matches"'
+    assert f'db_helper_latency_seconds{{{lbl},quantile="0.95"}} 0.030000' in lines
+    assert f"db_helper_latency_seconds_sum{{{lbl}}} 0.040000" in lines
+    assert f"db_helper_latency_seconds_count{{{lbl}}} 2" in lines
+    assert [f"db_helper_{m}_total{{{lbl}}} {v}" in lines for m,v in (("requests",3),("rows",6),("bytes",350))]==[True]*3
+    # every metric family is declared (TYPE, then HELP) before its samples, counters sample only _total
+    fams={}
+    for l in lines[:-2]:
+        m=re.match(r"# (TYPE|HELP|UNIT) (\w+) ?(.*)",l)
+        if m: fams.setdefault(m[2],{})[m[1]]=m[3]; continue
+        name=re.match(r"(\w+)\{",l)[1]; fam=next(f for f in fams if name in (f,f+"_sum",f+"_count",f+"_total"))
+        assert {"TYPE","HELP"}<=set(fams[fam]) and (fams[fam]["TYPE"]!="counter" or name==fam+"_total")
+    assert {f:v["TYPE"] for f,v in fams.items()}=={"db_helper_latency_seconds":"summary","db_helper_requests":"counter",
+                                                  "db_helper_rows":"counter","db_helper_bytes":"counter"}
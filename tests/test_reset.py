@@ -0,0 +1,31 @@
+"""reset_tournament(): one transaction, a per-table report, setup rows kept."""
+import app
+
+def test_reset_tournament_clears_play_and_keeps_setup(seed, match):
+    db=seed.db; c=seed.courts()
+    ref=seed.ins("users",{"name":"R","mobile":"r1","role":"referee"})[0]
+    db.table("courts").update({"referee_id":ref["id"]}).eq("id",c[0]["id"]).execute()
+    db.rpc("apply_points",{"p_match_id":match["id"],"p_ops":[{"key":"a","kind":"point","team":1}]}).execute()
+    seed.ins("match_moments",{"match_id":match["id"],"moment_type":"good_shot"})
+    seed.ins("match_disputes",{"match_id":match["id"],"note":"x"})
+    cat=db.table("award_categories").select("id").execute().data[0]["id"]
+    seed.ins("award_votes",{"voter_id":ref["id"],"category_id":cat,"voted_team_id":match["team1_id"]})
+    db.table("tournament_state").update({"phase":"final","teams_assigned":True}).eq("id",1).execute()
+    db.table("award_results_revealed").update({"revealed":True}).eq("id",1).execute()
+    rep=db.rpc("reset_tournament",{}).execute().data
+    assert rep["counts"]=={"award_votes":1,"match_moments":1,"match_disputes":1,"match_points":1,"matches":1,
+                           "courts":1,"teams":2,"users":5} and rep["ms"]>=0
+    for t in ("users","teams","matches","match_points","applied_ops","award_votes","match_moments","match_disputes"):
+        assert db.table(t).select("*").execute().data==[], t
+    assert len(db.table("courts").select("*").execute().data)==2 and all(r["referee_id"] is None for r in db.table("courts").select("*").execute().data)
+    assert len(db.table("award_categories").select("*").execute().data)==3
+    st=db.table("tournament_state").select("*").execute().data[0]
+    assert (st["phase"],st["teams_assigned"])==("signup",False)
+    assert db.table("award_results_revealed").select("revealed").execute().data[0]["revealed"] is False
+
+def test_reset_all_data_reports_and_clears_caches(app_seed):
+    t=app_seed.teams(2); app_seed.match(t[0],t[1],app_seed.courts()[0])
+    assert len(app.get_teams())==2 and len(app.get_matches())==1
+    rep=app.reset_all_data()
+    assert rep["counts"]["teams"]==2 and rep["counts"]["matches"]==1 and rep["total_ms"]>=rep["ms"]
+    assert app.get_teams()==[] and app.get_matches()==[] and app.get_state()["phase"]=="signup"
@@ -0,0 +1,30 @@
+"""Round-robin schedule: every pairing once, spread over the courts without double-booking."""
+import pytest
+import app
+
+SIZES=[(n,k) for n in range(2,17) for k in range(1,7)]+[(32,8),(5,3),(6,4),(4,3),(9,6)]
+
+@pytest.mark.parametrize("n,k",SIZES)
+def test_build_schedule_every_pair_once(n, k):
+    s=app.build_schedule(n,k)
+    assert len(s)==n*(n-1)//2 and {frozenset((a,b)) for a,b,_ in s}=={frozenset((a,b)) for a in range(n) for b in range(a+1,n)}
+    assert all(0<=c<k for _,_,c in s)
+
+@pytest.mark.parametrize("n,k",SIZES)
+def test_build_schedule_never_double_books(n, k):
+    """Each court plays in order, so slot = position on the court: no team twice in one slot."""
+    pos={}; seen=set()
+    for a,b,c in app.build_schedule(n,k):
+        p=pos.get(c,0); pos[c]=p+1
+        for t in (a,b):
+            assert (t,p) not in seen, f"team {t} twice in slot {p}"
+            seen.add((t,p))
+
+def test_schedule_stats_rest_is_never_negative():
+    teams=[{"id":f"t{i}","name":f"T{i}"} for i in range(5)]; courts=[{"id":f"c{j}","name":f"Court {j+2}"} for j in range(3)]
+    assert app.schedule_stats(app.group_schedule(teams,courts))["avg_rest"]>=0
+
+@pytest.mark.parametrize("n",[4,5,7])
+def test_planned_match_count_follows_the_teams(app_seed, n):
+    app_seed.teams(n); app._invalidate()
+    assert app.planned_match_count()==n*(n-1)//2+len(app.BRACKET)
@@ -0,0 +1,48 @@
+"""Scoring RPCs (increment_score, undo_last_point, apply_points) against the memory
+backend — the same contract as supabase/migrations."""
+import pytest
+import backends
+
+rpc=lambda db,name,**p: db.rpc(name,p).execute().data
+score=lambda db,m: (lambda r: (r["score_team1"],r["score_team2"]))(db.table("matches").select("*").eq("id",m["id"]).execute().data[0])
+log=lambda db,m: [(p["seq"],p["team"]) for p in db.table("match_points").select("seq,team").eq("match_id",m["id"]).order("seq").execute().data]
+
+def test_increment_score_logs_each_point(db, match):
+    for team in (1,2,1): rpc(db,"increment_score",p_match_id=match["id"],p_team=team)
+    assert score(db,match)==(2,1) and log(db,match)==[(1,1),(2,2),(3,1)]
+
+def test_increment_score_sets_winner_at_15_but_stays_live(db, match):
+    for _ in range(15): m=rpc(db,"increment_score",p_match_id=match["id"],p_team=2)
+    assert m["winner_id"]==match["team2_id"] and m["status"]=="live"
+
+def test_undo_last_point_drops_the_tail(db, match):
+    for team in (1,2,2): rpc(db,"increment_score",p_match_id=match["id"],p_team=team)
+    m=rpc(db,"undo_last_point",p_match_id=match["id"])
+    assert (m["score_team1"],m["score_team2"])==(1,1) and log(db,match)==[(1,1),(2,2)]
+
+def test_undo_last_point_reopens_and_clears_winner(db, match):
+    for _ in range(15): rpc(db,"increment_score",p_match_id=match["id"],p_team=1)
+    db.table("matches").update({"status":"completed"}).eq("id",match["id"]).execute()
+    m=rpc(db,"undo_last_point",p_match_id=match["id"])
+    assert (m["score_team1"],m["winner_id"],m["status"])==(14,None,"live")
+
+def test_undo_last_point_on_empty_log_is_a_no_op(db, match):
+    assert rpc(db,"undo_last_point",p_match_id=match["id"])["score_team1"]==0 and log(db,match)==[]
+
+def test_apply_points_in_order(db, match):
+    ops=[{"key":"a","kind":"point","team":1},{"key":"b","kind":"point","team":2},{"key":"c","kind":"undo","team":None}]
+    m=rpc(db,"apply_points",p_match_id=match["id"],p_ops=ops)
+    assert (m["score_team1"],m["score_team2"])==(1,0)
+
+def test_apply_points_replayed_op_keys_are_skipped(db, match):
+    ops=[{"key":"a","kind":"point","team":1},{"key":"b","kind":"point","team":1}]
+    rpc(db,"apply_points",p_match_id=match["id"],p_ops=ops)
+    rpc(db,"apply_points",p_match_id=match["id"],p_ops=ops+[{"key":"c","kind":"undo","team":None}])
+    rpc(db,"apply_points",p_match_id=match["id"],p_ops=[{"key":"c","kind":"undo","team":None}])
+    assert score(db,match)==(1,0) and log(db,match)==[(1,1)]
+
+def test_unknown_function_and_table_raise_not_deployed_codes(db):
+    with pytest.raises(backends.APIError) as e: rpc(db,"no_such_fn")
+    assert e.value.code=="PGRST202"
+    with pytest.raises(backends.APIError) as e: db.table("no_such_table")
+    assert e.value.code=="PGRST205"
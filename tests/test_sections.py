@@ -0,0 +1,21 @@
+"""section_nav: only the selected section runs; hidden sections' cost is reported."""
+from streamlit.testing.v1 import AppTest
+
+def _page():
+    import app
+    app._RUN.clear(); app._RUN["queries"]=0
+    if app.section_nav("demo",["Cheap","Costly"])==1:
+        for _ in range(3): app.get_db()
+    app.record_section_cost()
+
+def test_only_the_selected_section_runs(app_db):
+    at=AppTest.from_function(_page).run()
+    assert not at.exception and at.session_state["_section_cost"]=={("demo",0):0} and not at.caption
+    at.radio[0].set_value("Costly").run()
+    assert at.session_state["_section_cost"]=={("demo",0):0,("demo",1):3} and at.query_params["demo"]=="1"
+    at.radio[0].set_value("Cheap").run()
+    assert [c.value for c in at.caption]==["⚡ 3 queries skipped this rerun (hidden sections)"]
+
+def test_query_param_picks_the_section(app_db):
+    at=AppTest.from_function(_page); at.query_params["demo"]="1"; at.run()
+    assert at.radio[0].value=="Costly" and at.session_state["_section_cost"]=={("demo",1):3}
@@ -0,0 +1,27 @@
+"""Group table ranking: wins, head-to-head among the tied, diff, points for."""
+import time
+import app
+
+def _standings(teams, results):
+    s=app._Standings(); s.teams=teams; s.results={i:m for i,m in enumerate(results)}; s.built=time.monotonic()
+    return [r["id"] for r in s.ranked()]
+
+def _g(t1, t2, s1, s2):
+    return {"team1_id":t1,"team2_id":t2,"score_team1":s1,"score_team2":s2,"winner_id":t1 if s1>s2 else t2}
+
+def test_head_to_head_beats_score_diff():
+    # A and B both win once; B has the better diff, but A beat B
+    assert _standings({"A":"A","B":"B","C":"C"},[_g("A","B",15,13),_g("B","C",15,0)])==["A","B","C"]
+
+def test_wins_first_then_diff():
+    assert _standings({"A":"A","B":"B","C":"C","D":"D"},
+                      [_g("A","B",15,0),_g("C","D",15,10),_g("A","C",15,14)])==["A","C","D","B"]
+
+def test_end_game_and_undo_keep_the_table_current(app_seed):
+    t=app_seed.teams(2); m=app_seed.match(t[0],t[1],app_seed.courts()[0],status="live")
+    assert [r["won"] for r in app.get_leaderboard()]==[0,0]
+    app.apply_points(m["id"],[(f"p{i}","point",{"team":2}) for i in range(15)]); app.end_game(m["id"])
+    top=app.get_leaderboard()[0]
+    assert (top["id"],top["won"],top["score_diff"])==(t[1]["id"],1,15)
+    app.apply_points(m["id"],[("u","undo",{})])
+    assert [r["won"] for r in app.get_leaderboard()]==[0,0]